@@ -5,6 +5,8 @@ Equity Analyst agent.
 Purpose:
 - Analyze publicly listed companies and produce investor-focused insights.
 - Uses a finance toolkit for market data and a reasoning toolkit for structured analysis.
+- Takes valuation/profitability ratios from a deterministic fundamentals engine.
+- Receives oversized market-data results as compact summaries (full data by reference).
 - Persists context and user memories across runs via an application database.
 
 Required environment/config:
@@ -24,6 +26,11 @@ from agno.tools.reasoning import ReasoningTools
 from core.prompts import ANALYST_SYSTEM
 from core.memory import build_db
 from core.config import get_settings
+from core.context_compression import compress_member_output_hook
+from tools.fundamentals import FundamentalsTools
+from tools.output_compaction import FullToolOutputTools, compact_toolkit
+from tools.peers import PeerComparisonTools
+from tools.resilience import ResiliencePolicy, harden_toolkit, is_transient_yfinance_error
 
 # Initialize application settings (validates env/config on import)
 _settings = get_settings()  # underscore indicates local use / side-effects only
@@ -38,17 +45,29 @@ _db = build_db()
 # - tools: capabilities the agent can call (market data, reasoning utilities).
 # - instructions: system-level directives that shape analysis style and outputs.
 # - db / enable_user_memories: enables long-term memory across conversations.
+# - post_hooks: condense the output into findings under a token budget for the team coordinator.
 # - markdown: format responses in Markdown for readable output.
 equity_analyst = Agent(
     name="Equity Analyst",
     role="Analyze listed companies and produce investor-grade insights",
     model=OpenAIChat(id="gpt-4o"),
     tools=[
-        YFinanceTools(),                  # Financial data: prices, fundamentals, etc.
+        # Financial data with timeouts, retries, circuit breaker (YFinanceTools returns its
+        # errors as strings; network/rate-limit ones count as failures); oversized JSON is summarized
+        compact_toolkit(
+            harden_toolkit(
+                YFinanceTools(),
+                ResiliencePolicy.from_settings(is_failure=is_transient_yfinance_error),
+            )
+        ),
+        harden_toolkit(FundamentalsTools()),  # Deterministic ratios table (P/E, EV/EBITDA, FCF, ...)
+        harden_toolkit(PeerComparisonTools()),  # One bulk peer valuation/performance table
+        FullToolOutputTools(),  # Raw payload behind a compacted result, on explicit request
         ReasoningTools(add_instructions=True),  # Structured reasoning helpers
     ],
     instructions=ANALYST_SYSTEM,         # Domain-specific analysis directives
     db=_db,                              # Persistent storage for sessions & memories
     enable_user_memories=True,           # Remember user preferences and context
+    post_hooks=[compress_member_output_hook],  # Condense output before the coordinator reads it
     markdown=True,                       # Return nicely formatted Markdown
 )
\ No newline at end of file
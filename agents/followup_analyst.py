@@ -0,0 +1,67 @@
+# agents/followup_analyst.py
+"""
+Follow-up Analyst agent.
+
+Purpose:
+- Answer follow-up questions ("what about FX risk?") on a delivered report in a single
+  targeted model turn, instead of re-running the full team pipeline.
+- Works from the stored report and research notes, passed per call in the system prompt;
+  market-data tools are available but capped, so fresh data is fetched only when the
+  context lacks it.
+- Keeps a short per-session history so consecutive follow-ups stay coherent.
+
+Required environment/config:
+- API keys and app settings are read from environment variables (.env supported).
+"""
+
+from dotenv import load_dotenv
+
+# Load variables from a local .env file (e.g., API keys, DB paths)
+load_dotenv()
+
+from agno.agent import Agent
+from agno.models.openai import OpenAIChat
+from agno.tools.yfinance import YFinanceTools
+
+from core.prompts import FOLLOWUP_SYSTEM
+from core.memory import build_db
+from core.config import get_settings
+from tools.fundamentals import FundamentalsTools
+from tools.output_compaction import FullToolOutputTools, compact_toolkit
+from tools.resilience import ResiliencePolicy, harden_toolkit, is_transient_yfinance_error
+
+_settings = get_settings()
+
+# Same persistent database as the team, so follow-up sessions survive restarts
+_db = build_db()
+
+# Configure the follow-up agent.
+# Notes on key parameters:
+# - tools: the analyst's market-data tools (hardened and compacted), no reasoning toolkit,
+#   so a typical answer is one model call.
+# - tool_call_limit: hard cap on fresh data fetches per follow-up.
+# - instructions: the report context is templated in per call (`report_context` run
+#   dependency), so it reaches the system prompt and is never stored as a user message.
+# - add_history_to_context / num_history_runs: earlier follow-ups in the same session
+#   (questions and answers only).
+followup_analyst = Agent(
+    name="Follow-up Analyst",
+    role="Answer follow-up questions on a delivered equity report",
+    model=OpenAIChat(id="gpt-4o"),
+    tools=[
+        compact_toolkit(
+            harden_toolkit(
+                YFinanceTools(),
+                ResiliencePolicy.from_settings(is_failure=is_transient_yfinance_error),
+            )
+        ),
+        harden_toolkit(FundamentalsTools()),
+        FullToolOutputTools(),
+    ],
+    tool_call_limit=_settings.FOLLOWUP_MAX_TOOL_CALLS,
+    instructions=FOLLOWUP_SYSTEM,
+    db=_db,
+    add_history_to_context=True,
+    num_history_runs=3,
+    markdown=True,
+)
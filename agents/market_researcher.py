@@ -24,6 +24,9 @@ from agno.tools.reasoning import ReasoningTools
 from core.prompts import RESEARCHER_SYSTEM
 from core.memory import build_db
 from core.config import get_settings
+from core.context_compression import compress_member_output_hook
+from tools.dedup import dedupe_toolkit
+from tools.resilience import harden_toolkit
 
 # Initialize and validate global settings for the application
 _settings = get_settings()  # variable kept local, mainly to ensure configuration is loaded
@@ -36,21 +39,25 @@ _db = build_db()
 # - name/role: identifies the purpose of the agent and its scope of analysis.
 # - model: the natural language processing backend.
 # - tools: external resources and logic modules available to the agent.
-#   * DuckDuckGoTools: allows the agent to perform live web searches.
+#   * DuckDuckGoTools: allows the agent to perform live web searches (syndicated copies
+#     of the same story are collapsed into one item with corroborating citations).
 #   * ReasoningTools: supports structured reasoning and critique-based thinking.
 # - instructions: system-level behavior prompts (e.g., tone, depth, structure).
 # - db / enable_user_memories: persist memory and context across sessions.
+# - post_hooks: condense the output into findings under a token budget for the team coordinator.
 # - markdown: ensures outputs are formatted for better readability.
 market_researcher = Agent(
     name="Market Researcher",
     role="Fetch dated, trustworthy market intel and news",
     model=OpenAIChat(id="gpt-4o"),
     tools=[
-        DuckDuckGoTools(),                # Enables web search for current and historical data
+        # Web search with timeouts/retries/circuit breaker; near-duplicate stories collapsed
+        dedupe_toolkit(harden_toolkit(DuckDuckGoTools())),
         ReasoningTools(add_instructions=True),  # Adds reasoning structure for analysis quality
     ],
     instructions=RESEARCHER_SYSTEM,       # Behavior and analytical directives
     db=_db,                               # Persistent database for user context and sessions
     enable_user_memories=True,            # Maintains continuity across user interactions
+    post_hooks=[compress_member_output_hook],  # Condense output before the coordinator reads it
     markdown=True,                        # Formats responses for readable presentation
 )
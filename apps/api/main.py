@@ -1,9 +1,44 @@
 # apps/api/main.py
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from apps.api.routers import analyze, health
+from apps.api.middleware import AdmissionMiddleware
+from apps.api.routers import analyze, debug, health, reports, sessions, tickers
+from agents.followup_analyst import followup_analyst
+from agents.team_orchestrator import team
+from core.config import get_settings
+from core.http_clients import SharedHttpClients, collect_models
+from core.report_export import shutdown_report_exporter
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled keep-alive/HTTP2 client for every model and an owned yfinance session,
+    # warmed before traffic arrives
+    http = SharedHttpClients.from_settings()
+    http.attach(collect_models(team) + collect_models(followup_analyst))
+    http.attach_tools()
+    if get_settings().HTTP_WARMUP_ENABLED:
+        await http.warm_up()
+    app.state.http = http
+    try:
+        yield
+    finally:
+        await http.aclose()
+        shutdown_report_exporter()
+
 
-app = FastAPI(title="Agno Finance Agents", version="1.0")
+app = FastAPI(title="Agno Finance Agents", version="1.0", lifespan=lifespan)
+
+# Per-API-key rate limits + global concurrency ceiling for the LLM-backed endpoints.
+# Registered before CORS so CORS stays outermost and rejections still carry CORS headers.
+app.add_middleware(
+    AdmissionMiddleware,
+    paths=("/v1/analyze", "/v1/sessions"),
+    # The analyze handler takes a slot only for model-backed runs (not cache/stale/snapshot)
+    rate_only_paths=("/v1/analyze",),
+)
 
 # Allow the Django UI origins
 origins = [
@@ -21,3 +56,7 @@ app.add_middleware(
 
 app.include_router(health.router, prefix="/v1")
 app.include_router(analyze.router, prefix="/v1")
+app.include_router(tickers.router, prefix="/v1")
+app.include_router(reports.router, prefix="/v1")
+app.include_router(sessions.router, prefix="/v1")
+app.include_router(debug.router, prefix="/v1")
@@ -0,0 +1,183 @@
+# apps/api/middleware.py
+"""
+ASGI middleware for the public API.
+
+AdmissionMiddleware applies `core.admission` to the expensive endpoints:
+- Clients presenting a configured key (`X-API-Key`, see API_KEYS) are rate-limited per
+  key; everyone else is rate-limited per peer address, so rotating made-up keys gains
+  nothing.
+- Priority comes from the `X-Request-Priority` header: interactive, batch, scheduled.
+  Recognized keys default to interactive; other callers default to (and are capped at)
+  batch.
+- Rejections are immediate JSON responses with a `Retry-After` header.
+- "Rate-only" paths are rate-limited here but take no concurrency slot: their handler
+  acquires one (`AdmissionController.slot`) only for model-backed work, so cheap answers
+  (cache hits, stale fallbacks, snapshots) never queue behind deep runs. The client key
+  and priority are passed on in the request state (`admission_client`,
+  `admission_priority`).
+
+ProfiledRoute is a route class for debugging slow requests:
+- When PROFILING_ENABLED is set and the request carries `X-Debug-Profile: 1`, the whole
+  route (body parsing, validation, endpoint, response serialization) runs under
+  `core.profiling.SamplingProfiler`; the stored profile id is returned in `X-Profile-Id`.
+- Otherwise it costs a single settings check.
+"""
+
+import asyncio
+import hmac
+from typing import Callable, Iterable, Optional
+
+from fastapi import HTTPException, Request, Response
+from fastapi.routing import APIRoute
+from loguru import logger
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from core.admission import (
+    PRIORITIES,
+    AdmissionController,
+    AdmissionRejected,
+    get_admission_controller,
+)
+from core.config import get_settings
+from core.profiling import SamplingProfiler, get_profile_store
+
+API_KEY_HEADER = b"x-api-key"
+PRIORITY_HEADER = b"x-request-priority"
+PROFILE_REQUEST_HEADER = "x-debug-profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+
+class AdmissionMiddleware:
+    """
+    Gate selected HTTP paths behind an AdmissionController.
+
+    Args:
+        app: The wrapped ASGI application.
+        controller: Admission controller; defaults to `get_admission_controller()` (resolved
+            per request).
+        paths: Path prefixes that are subject to admission control.
+        api_keys: Recognized API keys; defaults to the API_KEYS setting (read per request).
+        rate_only_paths: Path prefixes (among `paths`) that are only rate-limited here;
+            their handlers take a concurrency slot themselves when needed.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        controller: Optional[AdmissionController] = None,
+        paths: tuple[str, ...] = (),
+        api_keys: Optional[Iterable[str]] = None,
+        rate_only_paths: tuple[str, ...] = (),
+    ):
+        self.app = app
+        self._controller = controller
+        self.paths = paths
+        self.api_keys = tuple(api_keys) if api_keys is not None else None
+        self.rate_only_paths = rate_only_paths
+
+    @property
+    def controller(self) -> AdmissionController:
+        """The configured controller, else the process-wide one."""
+        if self._controller is not None:
+            return self._controller
+        return get_admission_controller()
+
+    def _known_keys(self) -> tuple[str, ...]:
+        if self.api_keys is not None:
+            return self.api_keys
+        return tuple(k.strip() for k in get_settings().API_KEYS.split(",") if k.strip())
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] == "OPTIONS"  # let CORS preflights through
+            or not scope["path"].startswith(self.paths)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        client_key, authenticated = _client_key(scope, headers, self._known_keys())
+        priority = _priority(headers, authenticated)
+        controller = self.controller
+
+        try:
+            if self.rate_only_paths and scope["path"].startswith(self.rate_only_paths):
+                controller.check_rate(client_key)
+                state = scope.setdefault("state", {})
+                state["admission_client"], state["admission_priority"] = client_key, priority
+                await self.app(scope, receive, send)
+                return
+            async with controller.admit(client_key, priority):
+                await self.app(scope, receive, send)
+        except AdmissionRejected as e:
+            response = JSONResponse(
+                {"detail": e.detail},
+                status_code=e.status_code,
+                headers={"Retry-After": str(e.retry_after)},
+            )
+            await response(scope, receive, send)
+
+
+def _client_key(
+    scope: Scope, headers: dict[bytes, bytes], api_keys: tuple[str, ...]
+) -> tuple[str, bool]:
+    """
+    Identify the caller: a recognized API key, otherwise the client address.
+
+    Returns:
+        tuple[str, bool]: (bucket key, whether the caller presented a recognized key).
+    """
+    api_key = headers.get(API_KEY_HEADER, b"").decode("latin-1").strip()
+    if api_key and any(hmac.compare_digest(api_key, k) for k in api_keys):
+        return f"key:{api_key}", True
+    client = scope.get("client")
+    return (f"ip:{client[0]}" if client else "ip:unknown"), False
+
+
+def _priority(headers: dict[bytes, bytes], authenticated: bool) -> str:
+    """Requested priority; callers without a recognized key never rank above batch."""
+    default = "interactive" if authenticated else "batch"
+    priority = headers.get(PRIORITY_HEADER, default.encode()).decode("latin-1").strip().lower()
+    if priority not in PRIORITIES:
+        priority = default
+    if not authenticated and PRIORITIES.index(priority) < PRIORITIES.index("batch"):
+        priority = "batch"
+    return priority
+
+
+class ProfiledRoute(APIRoute):
+    """
+    APIRoute that samples the request's lifetime when profiling is enabled and requested.
+    """
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def profiled_handler(request: Request) -> Response:
+            settings = get_settings()
+            if not settings.PROFILING_ENABLED or request.headers.get(
+                PROFILE_REQUEST_HEADER, ""
+            ).lower() not in ("1", "true", "yes"):
+                return await handler(request)
+
+            profiler = SamplingProfiler(interval=settings.PROFILING_INTERVAL_MS / 1000)
+            try:
+                with profiler:
+                    response = await handler(request)
+            except HTTPException as e:
+                e.headers = {**(e.headers or {}), PROFILE_ID_HEADER: profiler.profile_id}
+                raise
+            finally:
+                await asyncio.to_thread(
+                    get_profile_store().save, profiler.profile_id, profiler.collapsed()
+                )
+                logger.info(
+                    f"Profiled {request.method} {request.url.path}: {profiler.samples} samples "
+                    f"over {profiler.duration:.2f}s (profile {profiler.profile_id})"
+                )
+            response.headers[PROFILE_ID_HEADER] = profiler.profile_id
+            return response
+
+        return profiled_handler
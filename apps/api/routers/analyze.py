@@ -1,16 +1,34 @@
 # apps/api/routers/analyze.py
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from io import StringIO
+import asyncio
 import contextlib
-from typing import Any
+import time
+from datetime import datetime, timezone
+from typing import Any, Optional
+from uuid import uuid4
 
+from loguru import logger
+from pydantic import ValidationError
+
+from apps.api.middleware import ProfiledRoute
 from apps.api.schemas import AnalyzeIn, AnalyzeOut
-from core.guardrails import AnalyzeRequest
+from core.admission import AdmissionRejected, get_admission_controller
+from core.config import get_settings
+from core.depth import DepthDecision, choose_depth, depth_rank
+from core.guardrails import AnalyzeRequest, resolve_known_ticker
+from core.report_store import StoredReport, get_report_store
+from core.run_stats import current_run, record, start_run
+from core.semantic_cache import adapt_cached_report, get_semantic_cache
+from core.ticker_index import get_ticker_index
 from agents.team_orchestrator import team
 
 from core.markdown_formatter import prettify_report
+from core.prompts import DEPTH_BRIEFS
+from tools.snapshot import build_snapshot
 
-router = APIRouter()
+# Opt-in per-request sampling profiler (PROFILING_ENABLED + `X-Debug-Profile: 1`)
+router = APIRouter(route_class=ProfiledRoute)
 
 
 def _to_text(obj: Any) -> str:
@@ -32,7 +50,34 @@ def _to_text(obj: Any) -> str:
     return str(obj)
 
 
-async def _call_with_variants(fn, message: str) -> str:
+def _coordinator_metrics_recorded() -> bool:
+    stats = current_run()
+    return stats is None or "coordinator_input_tokens" in stats.as_dict()
+
+
+def _record_coordinator_metrics(result: Any) -> None:
+    """
+    Record the coordinator's prompt size (input tokens over all its model calls) on the
+    active run, when the Agno version exposes it. Recorded once per run.
+    """
+    metrics = getattr(result, "metrics", None)
+    input_tokens = getattr(metrics, "input_tokens", None)
+    if isinstance(input_tokens, int) and not _coordinator_metrics_recorded():
+        record("coordinator_input_tokens", input_tokens)
+
+
+def _last_team_run(session_id: Optional[str]) -> Any:
+    """The team's stored last run for `session_id` (for entry points that only return text)."""
+    if not session_id or not hasattr(team, "get_last_run_output"):
+        return None
+    try:
+        return team.get_last_run_output(session_id=session_id)
+    except Exception as e:
+        logger.debug(f"No stored team run for {session_id}: {e}")
+        return None
+
+
+async def _call_with_variants(fn, message: str, **run_kwargs: Any) -> str:
     """
     Try common calling conventions:
     - fn(message=...)
@@ -40,11 +85,14 @@ async def _call_with_variants(fn, message: str) -> str:
     - fn(prompt=...)
     - fn(message)  (positional)
     - fn(input)    (positional)
+
+    `run_kwargs` (e.g., session_id) are passed to the keyword variants.
     """
     # Try keyword variants
     for kwargs in ({"message": message}, {"input": message}, {"prompt": message}):
         try:
-            result = await fn(**kwargs)  # type: ignore[misc]
+            result = await fn(**kwargs, **run_kwargs)  # type: ignore[misc]
+            _record_coordinator_metrics(result)
             return _to_text(result)
         except TypeError:
             pass
@@ -52,12 +100,14 @@ async def _call_with_variants(fn, message: str) -> str:
     # Try positional variants
     try:
         result = await fn(message)  # type: ignore[misc]
+        _record_coordinator_metrics(result)
         return _to_text(result)
     except TypeError:
         pass
 
     try:
         result = await fn(message)  # type: ignore[misc]
+        _record_coordinator_metrics(result)
         return _to_text(result)
     except TypeError:
         pass
@@ -65,33 +115,47 @@ async def _call_with_variants(fn, message: str) -> str:
     raise TypeError("No compatible signature for async team method.")
 
 
-async def _call_team(message: str) -> str:
+async def _call_team(message: str, session_id: Optional[str] = None) -> str:
+    """
+    Run the team and record the coordinator's prompt size on the active run, whichever
+    entry point the Agno version offers (see `_run_team`).
+    """
+    text = await _run_team(message, session_id)
+    if not _coordinator_metrics_recorded():
+        # Text-only entry points (e.g., the stdout capture): read the stored run instead
+        _record_coordinator_metrics(await asyncio.to_thread(_last_team_run, session_id))
+    return text
+
+
+async def _run_team(message: str, session_id: Optional[str] = None) -> str:
     """
     Compatible execution across Agno versions.
     Tries several async methods and finally captures stdout from streaming.
+    Each analysis gets its own `session_id` where the entry point accepts one.
     """
+    run_kwargs = {"session_id": session_id} if session_id else {}
     # Newer/common async entry points (try in order)
     if hasattr(team, "aresponse"):
         try:
-            return await _call_with_variants(team.aresponse, message)  # type: ignore[attr-defined]
+            return await _call_with_variants(team.aresponse, message, **run_kwargs)  # type: ignore[attr-defined]
         except TypeError:
             pass
 
     if hasattr(team, "arun"):
         try:
-            return await _call_with_variants(team.arun, message)  # type: ignore[attr-defined]
+            return await _call_with_variants(team.arun, message, **run_kwargs)  # type: ignore[attr-defined]
         except TypeError:
             pass
 
     if hasattr(team, "achat"):
         try:
-            return await _call_with_variants(team.achat, message)  # type: ignore[attr-defined]
+            return await _call_with_variants(team.achat, message, **run_kwargs)  # type: ignore[attr-defined]
         except TypeError:
             pass
 
     if hasattr(team, "aplan"):
         try:
-            return await _call_with_variants(team.aplan, message)  # type: ignore[attr-defined]
+            return await _call_with_variants(team.aplan, message, **run_kwargs)  # type: ignore[attr-defined]
         except TypeError:
             pass
 
@@ -122,12 +186,14 @@ async def _call_team(message: str) -> str:
             for kwargs in ({"message": message}, {"input": message}, {"prompt": message}):
                 try:
                     result = fn(**kwargs)
+                    _record_coordinator_metrics(result)
                     return _to_text(result)
                 except TypeError:
                     pass
             # Positional fallback
             try:
                 result = fn(message)
+                _record_coordinator_metrics(result)
                 return _to_text(result)
             except TypeError:
                 pass
@@ -135,22 +201,158 @@ async def _call_team(message: str) -> str:
     raise RuntimeError("No compatible Team execution method found on this Agno version.")
 
 
-@router.post("/analyze", response_model=AnalyzeOut)
-async def analyze(body: AnalyzeIn):
-    # Guardrails + normalization
-    req = AnalyzeRequest(**body.model_dump())
-    message = (
-        f"Target: {req.ticker}\n\n"
-        f"User goal: {req.prompt}\n\n"
-        f"Deliver the orchestrated, sourced equity report."
+def _stale_note(created_at: float, reason: Optional[str]) -> str:
+    generated = datetime.fromtimestamp(created_at, tz=timezone.utc)
+    return (
+        f"> ⏳ **Stale report** generated {generated:%Y-%m-%d %H:%M} UTC, served because the "
+        f"service is under heavy load ({reason}). Request again later for a fresh analysis.\n\n"
+    )
+
+
+def _degraded_note(decision: DepthDecision) -> str:
+    return (
+        f"> ⚡ Served at **{decision.depth}** depth (requested {decision.requested}) "
+        f"because of high load ({decision.reason}).\n\n"
+    )
+
+
+async def _serve_stored(
+    source: StoredReport, req: AnalyzeRequest, content_markdown: str, **flags: Any
+) -> AnalyzeOut:
+    """
+    Serve an existing report under a fresh session.
+
+    The report was produced for another client: its session (and the follow-up history
+    keyed on it) must not be handed out. A copy of what is served is stored under a new
+    session id, so follow-ups on this response see exactly this content.
+    """
+    session_id = str(uuid4())
+    copy = await asyncio.to_thread(
+        get_report_store().save,
+        ticker=req.ticker,
+        prompt=req.prompt,
+        content_markdown=content_markdown,
+        session_id=session_id,
+        meta={
+            "research": source.meta.get("research") or {},
+            "depth": source.meta.get("depth", "deep"),
+            "served_from": source.report_id,
+        },
+    )
+    return AnalyzeOut(
+        session_id=session_id,
+        report_id=copy.report_id,
+        content_markdown=content_markdown,
+        cached=True,
+        depth=source.meta.get("depth", "deep"),
+        **flags,
+    )
+
+
+def _model_slot(request: Request, decision: DepthDecision) -> contextlib.AbstractAsyncContextManager:
+    """
+    Concurrency slot for a model-backed run (the middleware only rate-limits this route).
+
+    Snapshots make no model call and run without one; service time is tracked per depth,
+    so the latency signal feeding `choose_depth` only reflects runs of that depth.
+    """
+    if decision.depth == "snapshot":
+        return contextlib.nullcontext()
+    return get_admission_controller().slot(
+        getattr(request.state, "admission_priority", "interactive"),
+        tier=decision.depth,
+        client_key=getattr(request.state, "admission_client", None),
     )
+
+
+@router.post("/analyze", response_model=AnalyzeOut)
+async def analyze(body: AnalyzeIn, request: Request):
+    # Guardrails + normalization (unknown tickers are rejected here, before any LLM call)
     try:
-        content_text = await _call_team(message)
+        req = AnalyzeRequest(**body.model_dump())
+        req.ticker = await resolve_known_ticker(req.ticker)
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=422, detail=e.errors(include_url=False, include_context=False)
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=422, detail=[{"type": "value_error", "loc": ["body", "ticker"], "msg": str(e)}]
+        )
+    # Load-aware depth: degrade (or fall back to a stale report) instead of timing out
+    admission = get_admission_controller()
+    decision = choose_depth(body.depth, admission.queue_depth, admission.avg_service_for(body.depth))
+    if decision.degraded:
+        logger.warning(f"Degrading analysis of {req.ticker}: {decision}")
+
+    # Reuse a recent report for the same ticker when the goal is semantically the same
+    # (only reports at least as deep as what will be served)
+    if get_settings().SEMANTIC_CACHE_ENABLED:
+        hit = await asyncio.to_thread(
+            get_semantic_cache().lookup,
+            req.ticker,
+            req.prompt,
+            lambda r: depth_rank(r.meta.get("depth", "deep")) >= depth_rank(decision.depth),
+        )
+        if hit is not None:
+            logger.info(
+                f"Semantic cache hit for {req.ticker} (similarity {hit.similarity:.2f}, "
+                f"report {hit.report.report_id})"
+            )
+            return await _serve_stored(hit.report, req, adapt_cached_report(hit))
+    if decision.serve_stale:
+        latest = await asyncio.to_thread(get_report_store().latest_for_ticker, req.ticker)
+        if latest is not None:
+            content = _stale_note(latest.created_at, decision.reason) + latest.content_markdown
+            return await _serve_stored(latest, req, content, stale=True)
+
+    # Per-run counters (e.g., tokens saved by news dedup), filled in by tools during the run
+    stats = start_run()
+    session_id = str(uuid4())
+    try:
+        async with _model_slot(request, decision):
+            started = time.perf_counter()
+            if decision.depth == "snapshot":
+                # Metrics only: deterministic tables, no model call
+                content_text = await asyncio.to_thread(build_snapshot, req.ticker)
+                record("snapshot_seconds", time.perf_counter() - started)
+            else:
+                # Listing / ADR mapping from the local index, so agents don't spend tool calls on it
+                listing = get_ticker_index().context_for(req.ticker)
+                message = (
+                    f"Target: {req.ticker}\n\n"
+                    + (f"Listing reference: {listing}\n\n" if listing else "")
+                    + f"User goal: {req.prompt}\n\n"
+                    + (f"{DEPTH_BRIEFS[decision.depth]}\n\n" if DEPTH_BRIEFS.get(decision.depth) else "")
+                    + "Deliver the orchestrated, sourced equity report."
+                )
+                # Tag the run so coordinator size/latency can be compared with compaction on/off
+                record("member_compaction_enabled", int(get_settings().MEMBER_COMPACTION_ENABLED))
+                content_text = await _call_team(message, session_id=session_id)
+                record("team_seconds", time.perf_counter() - started)
+        logger.info(f"Analysis run for {req.ticker} ({decision.depth}): {stats.as_dict()}")
         # 🎨 Enhance markdown for readability
-        content_text = prettify_report(content_text)
+        content_text = prettify_report(content_text) or "(no content returned)"
+        # Persist the report (with members' research notes) for exports, reuse and follow-ups
+        report = await asyncio.to_thread(
+            get_report_store().save,
+            ticker=req.ticker,
+            prompt=req.prompt,
+            content_markdown=content_text,
+            session_id=session_id,
+            meta={"research": stats.artifacts(), "depth": decision.depth, "metrics": stats.as_dict()},
+        )
+        if get_settings().SEMANTIC_CACHE_ENABLED:
+            get_semantic_cache().add(report)
         return AnalyzeOut(
-            session_id=str(getattr(team, "session_id", None)),
-            content_markdown=content_text or "(no content returned)",
+            session_id=session_id,
+            report_id=report.report_id,
+            content_markdown=(_degraded_note(decision) if decision.degraded else "") + content_text,
+            depth=decision.depth,
+        )
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=e.status_code, detail=e.detail, headers={"Retry-After": str(e.retry_after)}
         )
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Analysis failed: {e}")
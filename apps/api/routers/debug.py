@@ -0,0 +1,20 @@
+# apps/api/routers/debug.py
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from core.config import get_settings
+from core.profiling import get_profile_store
+
+router = APIRouter()
+
+
+@router.get("/debug/profiles/{profile_id}", response_class=PlainTextResponse)
+def get_profile(profile_id: str):
+    """
+    Collapsed-stack profile of a request (feed to flamegraph.pl, speedscope or inferno).
+    Only available while PROFILING_ENABLED is set.
+    """
+    profile = get_profile_store().get(profile_id) if get_settings().PROFILING_ENABLED else None
+    if profile is None:
+        raise HTTPException(status_code=404, detail=f"Unknown profile: {profile_id}")
+    return PlainTextResponse(profile)
@@ -0,0 +1,41 @@
+# apps/api/routers/reports.py
+import asyncio
+import re
+from typing import Literal
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import FileResponse
+
+from core.report_export import EXPORT_FORMATS, ExportBusy, get_report_exporter
+from core.report_store import get_report_store
+
+router = APIRouter()
+
+
+@router.get("/reports/{report_id}/export")
+async def export_report(
+    report_id: str,
+    format: Literal["pdf", "html", "docx"] = Query("pdf", description="Export format."),
+):
+    """
+    Export a stored report as PDF, HTML or DOCX.
+
+    Rendering runs in a bounded process pool (never on the event loop) and is cached by
+    report content hash; the file is streamed from disk.
+    """
+    report = await asyncio.to_thread(get_report_store().get, report_id)
+    if report is None:
+        raise HTTPException(status_code=404, detail=f"Unknown report: {report_id}")
+
+    title = f"{report.ticker} Equity Report"
+    try:
+        path = await get_report_exporter().export(
+            report.content_hash, report.content_markdown, format, title
+        )
+    except ExportBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Export failed: {e}")
+
+    filename = f"{re.sub(r'[^A-Za-z0-9._-]', '_', report.ticker)}-{report_id[:8]}.{format}"
+    return FileResponse(path, media_type=EXPORT_FORMATS[format], filename=filename)
@@ -0,0 +1,92 @@
+# apps/api/routers/sessions.py
+import asyncio
+import time
+
+from fastapi import APIRouter, HTTPException
+from loguru import logger
+from pydantic import ValidationError
+
+from agents.followup_analyst import followup_analyst
+from apps.api.schemas import FollowupIn, FollowupOut
+from core.config import get_settings
+from core.guardrails import CHARS_PER_TOKEN, FollowupRequest, estimate_tokens
+from core.report_store import StoredReport, get_report_store
+from core.run_stats import record, start_run
+
+router = APIRouter()
+
+
+def _followup_context(report: StoredReport, budget_tokens: int) -> str:
+    """
+    Context for a follow-up: the delivered report plus members' research notes, trimmed
+    (notes first) to `budget_tokens`.
+    """
+    notes = "\n\n".join(
+        f"#### {name}\n{text}" for name, text in (report.meta.get("research") or {}).items()
+    )
+    report_md = report.content_markdown
+    if estimate_tokens(report_md) > budget_tokens:
+        report_md = report_md[: budget_tokens * CHARS_PER_TOKEN] + "\n[... report truncated]"
+        notes = ""
+    room = (budget_tokens - estimate_tokens(report_md)) * CHARS_PER_TOKEN
+    if len(notes) > room:
+        notes = (notes[:room] + "\n[... notes truncated]") if room > 200 else ""
+    return (
+        f"Target: {report.ticker}\n"
+        f"Original goal: {report.prompt}\n\n"
+        f"### Delivered report\n{report_md}"
+        + (f"\n\n### Research notes\n{notes}" if notes else "")
+    )
+
+
+async def _call_followup(question: str, context: str, session_id: str) -> str:
+    """
+    One targeted agent turn; history is kept under a follow-up session derived from the analysis.
+
+    Only the question is the user message (and so the history). The report context goes in
+    as a run dependency rendered into the system prompt, which history never replays, so
+    each follow-up costs one copy of the report rather than one per earlier question.
+    """
+    result = await followup_analyst.arun(
+        input=question,
+        session_id=f"{session_id}:followup",
+        dependencies={"report_context": context},
+    )
+    content = getattr(result, "content", None)
+    return content if isinstance(content, str) else str(result)
+
+
+@router.post("/sessions/{session_id}/followup", response_model=FollowupOut)
+async def followup(session_id: str, body: FollowupIn):
+    """
+    Answer a follow-up question on the session's latest report with one agent call,
+    instead of another full `/v1/analyze` run.
+
+    The session id acts as the capability for its follow-up history: it is a random
+    UUID handed to exactly one client (cached and stale responses get a fresh one).
+    """
+    try:
+        req = FollowupRequest(**body.model_dump())
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=422, detail=e.errors(include_url=False, include_context=False)
+        )
+    reports = await asyncio.to_thread(get_report_store().by_session, session_id)
+    if not reports:
+        raise HTTPException(status_code=404, detail=f"Unknown session: {session_id}")
+    report = reports[-1]
+
+    context = _followup_context(report, get_settings().FOLLOWUP_CONTEXT_TOKEN_BUDGET)
+    stats = start_run()
+    try:
+        started = time.perf_counter()
+        answer = await _call_followup(req.question, context, session_id)
+        record("followup_seconds", time.perf_counter() - started)
+        logger.info(f"Follow-up for {report.ticker} ({session_id}): {stats.as_dict()}")
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Follow-up failed: {e}")
+    return FollowupOut(
+        session_id=session_id,
+        report_id=report.report_id,
+        answer_markdown=answer or "(no content returned)",
+    )
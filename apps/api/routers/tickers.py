@@ -0,0 +1,16 @@
+# apps/api/routers/tickers.py
+from fastapi import APIRouter, Query
+
+from apps.api.schemas import TickerSearchOut
+from core.ticker_index import get_ticker_index
+
+router = APIRouter()
+
+
+@router.get("/tickers/search", response_model=TickerSearchOut)
+def search_tickers(
+    q: str = Query(..., min_length=1, max_length=64, description="Symbol, partial symbol or company name."),
+    limit: int = Query(10, ge=1, le=50),
+):
+    """Prefix + fuzzy ticker autocomplete backed by the local reference index."""
+    return TickerSearchOut(query=q, results=get_ticker_index().search(q, limit=limit))
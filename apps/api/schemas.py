@@ -1,5 +1,9 @@
+from typing import Literal
+
 from pydantic import BaseModel, Field, ConfigDict
 
+from core.ticker_index import TickerRecord
+
 class AnalyzeIn(BaseModel):
     ticker: str = Field(
         ...,
@@ -11,6 +15,13 @@ class AnalyzeIn(BaseModel):
         description="What you want the team to do.",
         examples=["Full deep-dive with catalysts, risks, and valuation hooks."],
     )
+    depth: Literal["snapshot", "standard", "deep"] = Field(
+        default="deep",
+        description=(
+            "snapshot: metrics only, no model call; standard: short brief; deep: full "
+            "multi-agent deep dive. May be lowered automatically under heavy load."
+        ),
+    )
 
     # This example drives the body pre-fill in Swagger UI
     model_config = ConfigDict(
@@ -24,4 +35,24 @@ class AnalyzeIn(BaseModel):
 
 class AnalyzeOut(BaseModel):
     session_id: str | None = None
+    report_id: str | None = None
     content_markdown: str
+    cached: bool = False
+    stale: bool = False
+    depth: str | None = None
+
+class TickerSearchOut(BaseModel):
+    query: str
+    results: list[TickerRecord]
+
+class FollowupIn(BaseModel):
+    question: str = Field(
+        ...,
+        description="Follow-up question about the session's latest report.",
+        examples=["What about FX risk?"],
+    )
+
+class FollowupOut(BaseModel):
+    session_id: str
+    report_id: str
+    answer_markdown: str
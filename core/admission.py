@@ -0,0 +1,365 @@
+# core/admission.py
+"""
+Admission Control Module
+
+Purpose:
+- Protect the expensive analysis pipeline (and the shared OpenAI quota) from being
+  monopolized by a single client.
+- Reject excess traffic quickly with a `Retry-After` hint instead of letting requests
+  pile up and time out.
+
+Key Components:
+- PRIORITIES: Supported request priority classes, highest first.
+- TokenBucket: Per-client rate limiter (steady refill rate + burst capacity).
+- AdmissionRejected: Raised when a request must be turned away (429 / 503).
+- AdmissionController: Per-key token buckets, a global concurrency ceiling and a
+  priority queue so interactive requests are scheduled ahead of batch/scheduled ones.
+- get_admission_controller: Cached, settings-driven controller instance.
+
+Usage:
+    controller = get_admission_controller()
+    async with controller.admit(client_key="api-key-123", priority="interactive"):
+        ...  # run the analysis
+
+    # Or rate-limit up front and take a slot only for the work that needs one
+    controller.check_rate("api-key-123")
+    async with controller.slot("interactive", tier="deep", client_key="api-key-123"):
+        ...  # model-backed run
+"""
+
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import AsyncIterator, Callable
+
+from core.config import get_settings
+
+# Priority classes, highest first. Lower rank = scheduled earlier.
+PRIORITIES = ("interactive", "batch", "scheduled")
+_PRIORITY_RANK = {name: rank for rank, name in enumerate(PRIORITIES)}
+
+
+class TokenBucket:
+    """
+    Classic token bucket.
+
+    Tokens refill continuously at `rate` per second up to `capacity`. Each admitted
+    request consumes one token.
+
+    Attributes:
+        rate: Refill rate in tokens per second.
+        capacity: Maximum number of tokens (burst size).
+    """
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = capacity
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """
+        Try to take `tokens` from the bucket.
+
+        Returns:
+            0.0 if the tokens were taken; otherwise the number of seconds until
+            enough tokens will be available.
+        """
+        self._refill()
+        if self._tokens >= tokens:
+            self._tokens -= tokens
+            return 0.0
+        if self.rate <= 0:
+            return math.inf
+        return (tokens - self._tokens) / self.rate
+
+    def refund(self, tokens: float = 1.0) -> None:
+        """Give back `tokens` taken for a request that was not admitted after all."""
+        self._refill()
+        self._tokens = min(self.capacity, self._tokens + tokens)
+
+    @property
+    def is_full(self) -> bool:
+        """True when the bucket has fully refilled (i.e., the client is idle)."""
+        self._refill()
+        return self._tokens >= self.capacity
+
+
+class AdmissionRejected(Exception):
+    """
+    Raised when a request cannot be admitted.
+
+    Attributes:
+        status_code: HTTP status to return (429 for rate limits, 503 for overload).
+        retry_after: Suggested wait, in whole seconds, before retrying.
+        detail: Human-readable reason.
+    """
+
+    def __init__(self, status_code: int, retry_after: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.detail = detail
+
+
+def _ewma(average: float, sample: float, alpha: float = 0.2) -> float:
+    """Exponentially weighted moving average update (the first sample seeds it)."""
+    return sample if average == 0.0 else (1 - alpha) * average + alpha * sample
+
+
+class AdmissionController:
+    """
+    Per-client rate limiting plus a global, priority-aware concurrency ceiling.
+
+    Behavior:
+        - Each client key owns a TokenBucket (`rate_per_minute`, `burst`). An empty
+          bucket yields an immediate 429.
+        - At most `max_concurrent` requests run at once. Extra requests wait in a
+          priority queue (interactive > batch > scheduled, FIFO within a class).
+        - If the queue already holds `max_queue` requests, or a request waits longer
+          than `queue_timeout` seconds, it is rejected with 503.
+        - Retry-After hints are derived from the bucket refill time or from a moving
+          average of recent service times.
+        - Service times are also averaged per tier (e.g., analysis depth), so a latency
+          signal for deep runs isn't diluted by quick ones. A tier's average decays with
+          `tier_half_life` seconds since its last sample: when slow deep runs make callers
+          stop running deep, no new deep samples arrive, and without the decay one slow run
+          would keep that tier degraded forever.
+    """
+
+    # Cap on remembered client buckets; idle (full) buckets are evicted first.
+    MAX_TRACKED_CLIENTS = 10_000
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        max_queue: int,
+        queue_timeout: float,
+        rate_per_minute: float,
+        burst: int,
+        clock: Callable[[], float] = time.monotonic,
+        tier_half_life: float = 300.0,
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.rate_per_minute = rate_per_minute
+        self.burst = burst
+        self.tier_half_life = tier_half_life
+        self._clock = clock
+
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._seq = itertools.count()
+        self._in_flight = 0
+        # Exponentially weighted moving averages of service time (seconds): all slot
+        # holders, and per tier as (average, time of its last sample)
+        self._avg_service = 0.0
+        self._avg_service_by_tier: dict[str, tuple[float, float]] = {}
+
+    # ------------------------------------------------------------------ metrics
+    @property
+    def in_flight(self) -> int:
+        """Number of requests currently holding a concurrency slot."""
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of requests waiting for a concurrency slot."""
+        return sum(1 for _, _, fut in self._waiters if not fut.done())
+
+    @property
+    def avg_service_seconds(self) -> float:
+        """Moving average of recent request service times, in seconds."""
+        return self._avg_service
+
+    def avg_service_for(self, tier: str) -> float:
+        """
+        Moving average of recent service times of `tier` requests (0.0 if none yet),
+        halved for every `tier_half_life` seconds without a new sample.
+        """
+        average, updated = self._avg_service_by_tier.get(tier, (0.0, 0.0))
+        if average and self.tier_half_life > 0:
+            average *= 0.5 ** (max(0.0, self._clock() - updated) / self.tier_half_life)
+        return average
+
+    # -------------------------------------------------------------- rate limits
+    def _bucket(self, client_key: str) -> TokenBucket:
+        bucket = self._buckets.get(client_key)
+        if bucket is None:
+            if len(self._buckets) >= self.MAX_TRACKED_CLIENTS:
+                self._evict_idle_buckets()
+            bucket = TokenBucket(self.rate_per_minute / 60.0, self.burst, clock=self._clock)
+            self._buckets[client_key] = bucket
+        else:
+            self._buckets.move_to_end(client_key)
+        return bucket
+
+    def _evict_idle_buckets(self) -> None:
+        for key in [k for k, b in self._buckets.items() if b.is_full]:
+            del self._buckets[key]
+        # Still too many active clients: drop the least recently seen ones.
+        while len(self._buckets) >= self.MAX_TRACKED_CLIENTS:
+            self._buckets.popitem(last=False)
+
+    def check_rate(self, client_key: str) -> None:
+        """
+        Consume one token from the client's bucket.
+
+        Raises:
+            AdmissionRejected: 429 when the client exceeded its rate limit.
+        """
+        wait = self._bucket(client_key).try_acquire()
+        if wait > 0:
+            raise AdmissionRejected(
+                status_code=429,
+                retry_after=max(1, math.ceil(wait)) if math.isfinite(wait) else 60,
+                detail="Rate limit exceeded for this API key.",
+            )
+
+    def refund_rate(self, client_key: str) -> None:
+        """Give back the token taken by `check_rate` for a request that was not admitted."""
+        self._bucket(client_key).refund()
+
+    # -------------------------------------------------------------- concurrency
+    def _overload_retry_after(self) -> int:
+        waves = (self.queue_depth + 1) / max(1, self.max_concurrent)
+        return max(1, math.ceil(self._avg_service * waves))
+
+    async def acquire(self, priority: str = "interactive") -> None:
+        """
+        Wait for a concurrency slot, honoring priority order.
+
+        Raises:
+            AdmissionRejected: 503 when the queue is full or the wait timed out.
+        """
+        if self._in_flight < self.max_concurrent and self.queue_depth == 0:
+            self._in_flight += 1
+            return
+
+        if self.queue_depth >= self.max_queue:
+            raise AdmissionRejected(
+                status_code=503,
+                retry_after=self._overload_retry_after(),
+                detail="Server is at capacity; please retry later.",
+            )
+
+        rank = _PRIORITY_RANK.get(priority, _PRIORITY_RANK["interactive"])
+        fut: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (rank, next(self._seq), fut))
+        try:
+            # shield: a timeout must not cancel a slot that was just handed over
+            await asyncio.wait_for(asyncio.shield(fut), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            if fut.done() and not fut.cancelled():
+                # Slot was granted right as the timeout fired: keep it.
+                return
+            fut.cancel()
+            raise AdmissionRejected(
+                status_code=503,
+                retry_after=self._overload_retry_after(),
+                detail="Timed out waiting in the admission queue.",
+            )
+        except asyncio.CancelledError:
+            # Client went away while queued; give back a slot if we got one.
+            if fut.done() and not fut.cancelled():
+                self.release()
+            else:
+                fut.cancel()
+            raise
+
+    def release(self, service_seconds: float | None = None, tier: str | None = None) -> None:
+        """
+        Return a concurrency slot, handing it directly to the best waiter if any.
+
+        Args:
+            service_seconds: Optional duration of the finished request, used to keep
+                the Retry-After estimate realistic.
+            tier: Optional request tier whose own service-time average is updated too.
+        """
+        if service_seconds is not None:
+            self._avg_service = _ewma(self._avg_service, service_seconds)
+            if tier is not None:
+                average = _ewma(self.avg_service_for(tier), service_seconds)
+                self._avg_service_by_tier[tier] = (average, self._clock())
+
+        while self._waiters:
+            _, _, fut = heapq.heappop(self._waiters)
+            if not fut.done():
+                fut.set_result(None)  # slot ownership moves to the waiter
+                return
+        self._in_flight -= 1
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        priority: str = "interactive",
+        tier: str | None = None,
+        client_key: str | None = None,
+    ) -> AsyncIterator[None]:
+        """
+        Queue for and hold a concurrency slot (no rate check).
+
+        Args:
+            priority: Scheduling class while queued.
+            tier: Request tier for the per-tier service-time average.
+            client_key: Client charged by `check_rate`; refunded when the slot is refused.
+
+        Raises:
+            AdmissionRejected: 503 when the server is saturated.
+        """
+        try:
+            await self.acquire(priority)
+        except AdmissionRejected:
+            # Overload is not the client's fault: don't charge its rate budget
+            if client_key is not None:
+                self.refund_rate(client_key)
+            raise
+        started = self._clock()
+        try:
+            yield
+        finally:
+            self.release(self._clock() - started, tier)
+
+    @asynccontextmanager
+    async def admit(self, client_key: str, priority: str = "interactive") -> AsyncIterator[None]:
+        """
+        Rate-limit, queue and run a request while holding a concurrency slot.
+
+        Raises:
+            AdmissionRejected: When the request is rate limited or the server is saturated.
+        """
+        self.check_rate(client_key)
+        async with self.slot(priority, client_key=client_key):
+            yield
+
+
+
+@lru_cache
+def get_admission_controller() -> AdmissionController:
+    """
+    Retrieve the process-wide admission controller configured from settings.
+
+    Returns:
+        AdmissionController: A singleton shared by all API workers in this process.
+    """
+    s = get_settings()
+    return AdmissionController(
+        max_concurrent=s.MAX_CONCURRENT_ANALYSES,
+        max_queue=s.MAX_QUEUED_ANALYSES,
+        queue_timeout=s.QUEUE_TIMEOUT_SECONDS,
+        rate_per_minute=s.RATE_LIMIT_PER_MINUTE,
+        burst=s.RATE_LIMIT_BURST,
+        tier_half_life=s.DEPTH_LATENCY_HALF_LIFE_SECONDS,
+    )
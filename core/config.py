@@ -35,6 +35,65 @@ class Settings(BaseSettings):
         MAX_INPUT_TOKENS (int): Token limit for user inputs.
         MAX_STEPS (int): Maximum reasoning or operation steps per agent.
         MAX_SECONDS (int): Execution time limit (seconds) for each process.
+        API_KEYS (str): Comma-separated API keys recognized by admission control; callers
+            without a recognized key are limited per client address at batch priority.
+        RATE_LIMIT_PER_MINUTE (float): Sustained analysis requests per minute per client.
+        RATE_LIMIT_BURST (int): Token-bucket capacity, i.e. the most requests a client
+            may make back-to-back after being idle.
+        MAX_CONCURRENT_ANALYSES (int): Global ceiling on analyses running at once.
+        MAX_QUEUED_ANALYSES (int): Requests allowed to wait for a slot before rejecting.
+        QUEUE_TIMEOUT_SECONDS (float): Maximum time a request may wait in the queue.
+        TOOL_TIMEOUT_SECONDS (float): Hard timeout for a single external tool call.
+        TOOL_MAX_RETRIES (int): Retries (with jittered backoff) after a transient tool error.
+        TOOL_CALL_BUDGET_SECONDS (float): Total time for one tool call, retries included
+            (kept below MAX_SECONDS).
+        TOOL_BACKOFF_BASE_SECONDS (float): Base delay for exponential retry backoff.
+        TOOL_BACKOFF_MAX_SECONDS (float): Upper bound for a single backoff delay.
+        TOOL_HEDGE_AFTER_SECONDS (float): Send a hedged duplicate read after this delay (0 = off).
+        TOOL_BREAKER_FAILURE_THRESHOLD (int): Consecutive failures that open a provider's circuit.
+        TOOL_BREAKER_RESET_SECONDS (float): Cooldown before a half-open probe is allowed.
+        STATEMENT_FETCH_TIMEOUT_SECONDS (float): Per-ticker deadline for statement fetches in the
+            bulk fundamentals/peer tools; late tickers are reported as data gaps.
+        TICKER_INDEX_PATH (str): CSV ticker reference file (empty = bundled core/data/tickers.csv).
+        TICKER_INDEX_STRICT (bool): Reject tickers that are not in the reference index.
+        TICKER_INDEX_VERIFY_ONLINE (bool): On an index miss, check the symbol once with
+            Yahoo Finance before rejecting it.
+        TICKER_VERIFY_TIMEOUT_SECONDS (float): Time limit for that check; past it the
+            ticker is accepted unverified.
+        TICKER_VERIFY_NEGATIVE_TTL_SECONDS (float): How long a "not listed" answer is cached.
+        DEDUP_SIMILARITY_THRESHOLD (float): Estimated Jaccard above which news items are merged.
+        MEMBER_COMPACTION_ENABLED (bool): Condense member outputs before the coordinator sees them.
+        MEMBER_OUTPUT_TOKEN_BUDGET (int): Token budget for each condensed member output.
+        HTTP_MAX_CONNECTIONS (int): Connection ceiling of the shared HTTP pool.
+        HTTP_MAX_KEEPALIVE_CONNECTIONS (int): Idle keep-alive connections kept in the pool.
+        HTTP_KEEPALIVE_EXPIRY_SECONDS (float): How long idle pooled connections are kept.
+        HTTP_TIMEOUT_SECONDS (float): Default timeout for pooled HTTP requests.
+        HTTP_WARMUP_ENABLED (bool): Open upstream connections at API startup.
+        HTTP_WARMUP_TIMEOUT_SECONDS (float): Time limit for each warm-up target.
+        EXPORT_CACHE_DIR (str): Directory for rendered report exports (PDF/HTML/DOCX).
+        EXPORT_WORKERS (int): Worker processes used to render exports.
+        EXPORT_MAX_PENDING (int): Renders allowed in flight before exports return 503.
+        EXPORT_CACHE_MAX_FILES (int): Rendered exports kept on disk (least recently used evicted).
+        EXPORT_CACHE_MAX_AGE_SECONDS (float): Rendered exports unused for longer than this are evicted.
+        SEMANTIC_CACHE_ENABLED (bool): Serve recent reports for similar prompts on the same ticker.
+        SEMANTIC_CACHE_THRESHOLD (float): Minimum prompt cosine similarity for a cache hit.
+        SEMANTIC_CACHE_TTL_SECONDS (float): Maximum age of a report served from the cache.
+        PROFILING_ENABLED (bool): Allow per-request sampling profiles (debug only).
+        PROFILING_INTERVAL_MS (float): Sampling interval of the request profiler.
+        PROFILE_DIR (str): Directory where collapsed-stack profiles are stored.
+        PROFILE_MAX_FILES (int): Most recent profiles kept on disk.
+        TOOL_OUTPUT_COMPACTION_ENABLED (bool): Summarize oversized market-data tool results.
+        TOOL_OUTPUT_TOKEN_BUDGET (int): Token cap for a single market-data tool result.
+        TOOL_OUTPUT_REF_CACHE_SIZE (int): Full tool payloads kept for retrieval by reference.
+        FOLLOWUP_MAX_TOOL_CALLS (int): Tool calls a follow-up answer may make for fresh data.
+        FOLLOWUP_CONTEXT_TOKEN_BUDGET (int): Token budget for the report + notes sent with a follow-up.
+        DEPTH_DEGRADE_ENABLED (bool): Lower analysis depth automatically under load.
+        DEPTH_STANDARD_QUEUE_DEPTH (int): Queued analyses at which deep runs become standard (0 = off).
+        DEPTH_SNAPSHOT_QUEUE_DEPTH (int): Queued analyses at which runs become snapshots (0 = off).
+        DEPTH_STALE_QUEUE_DEPTH (int): Queued analyses at which the latest stored report is served stale (0 = off).
+        DEPTH_LATENCY_SECONDS (float): Average analysis time at which depth drops one level (0 = off).
+        DEPTH_LATENCY_HALF_LIFE_SECONDS (float): Half-life of a depth's average analysis time
+            while no run of that depth finishes, so a degraded depth is retried (0 = no decay).
     """
 
     OPENAI_API_KEY: str = Field(default="", repr=False)
@@ -47,6 +106,58 @@ class Settings(BaseSettings):
     MAX_INPUT_TOKENS: int = 1800
     MAX_STEPS: int = 8
     MAX_SECONDS: int = 45
+    API_KEYS: str = Field(default="", repr=False)
+    RATE_LIMIT_PER_MINUTE: float = 6
+    RATE_LIMIT_BURST: int = 3
+    MAX_CONCURRENT_ANALYSES: int = 4
+    MAX_QUEUED_ANALYSES: int = 16
+    QUEUE_TIMEOUT_SECONDS: float = 30
+    TOOL_TIMEOUT_SECONDS: float = 15
+    TOOL_MAX_RETRIES: int = 2
+    TOOL_CALL_BUDGET_SECONDS: float = 30
+    TOOL_BACKOFF_BASE_SECONDS: float = 0.5
+    TOOL_BACKOFF_MAX_SECONDS: float = 4
+    TOOL_HEDGE_AFTER_SECONDS: float = 0
+    TOOL_BREAKER_FAILURE_THRESHOLD: int = 5
+    TOOL_BREAKER_RESET_SECONDS: float = 30
+    STATEMENT_FETCH_TIMEOUT_SECONDS: float = 10
+    TICKER_INDEX_PATH: str = ""
+    TICKER_INDEX_STRICT: bool = True
+    TICKER_INDEX_VERIFY_ONLINE: bool = True
+    TICKER_VERIFY_TIMEOUT_SECONDS: float = 3.0
+    TICKER_VERIFY_NEGATIVE_TTL_SECONDS: float = 900
+    DEDUP_SIMILARITY_THRESHOLD: float = 0.5
+    MEMBER_COMPACTION_ENABLED: bool = True
+    MEMBER_OUTPUT_TOKEN_BUDGET: int = 1200
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 120
+    HTTP_TIMEOUT_SECONDS: float = 120
+    HTTP_WARMUP_ENABLED: bool = True
+    HTTP_WARMUP_TIMEOUT_SECONDS: float = 5
+    EXPORT_CACHE_DIR: str = "./.export_cache"
+    EXPORT_WORKERS: int = 2
+    EXPORT_MAX_PENDING: int = 8
+    EXPORT_CACHE_MAX_FILES: int = 500
+    EXPORT_CACHE_MAX_AGE_SECONDS: float = 604800
+    SEMANTIC_CACHE_ENABLED: bool = True
+    SEMANTIC_CACHE_THRESHOLD: float = 0.8
+    SEMANTIC_CACHE_TTL_SECONDS: float = 21600
+    PROFILING_ENABLED: bool = False
+    PROFILING_INTERVAL_MS: float = 5
+    PROFILE_DIR: str = "./.profiles"
+    PROFILE_MAX_FILES: int = 50
+    TOOL_OUTPUT_COMPACTION_ENABLED: bool = True
+    TOOL_OUTPUT_TOKEN_BUDGET: int = 1500
+    TOOL_OUTPUT_REF_CACHE_SIZE: int = 64
+    FOLLOWUP_MAX_TOOL_CALLS: int = 2
+    FOLLOWUP_CONTEXT_TOKEN_BUDGET: int = 6000
+    DEPTH_DEGRADE_ENABLED: bool = True
+    DEPTH_STANDARD_QUEUE_DEPTH: int = 4
+    DEPTH_SNAPSHOT_QUEUE_DEPTH: int = 8
+    DEPTH_STALE_QUEUE_DEPTH: int = 12
+    DEPTH_LATENCY_SECONDS: float = 150
+    DEPTH_LATENCY_HALF_LIFE_SECONDS: float = 300
 
     class Config:
         """Configuration for environment variable loading and validation."""
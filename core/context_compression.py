@@ -0,0 +1,200 @@
+# core/context_compression.py
+"""
+Member → Coordinator Context Compression
+
+Purpose:
+- The Team coordinator receives every member's full output, including ReAct/Reasoning
+  scratch work, so its synthesis prompt grows with every delegation round.
+- This module condenses a member's markdown output into structured findings under a
+  fixed token budget before it is handed back to the coordinator:
+    * Metrics (markdown tables and numeric lines)
+    * Dated facts
+    * Data gaps
+    * Sources (title + URL)
+    * Other key points (only while budget remains)
+- It is deterministic and local (no extra model call), so it adds no LLM latency.
+
+Key Components:
+- compress_member_output: Pure function text → compact findings.
+- compress_member_output_hook: Agno post-hook that rewrites a member run's content,
+  records before/after sizes on the active run (`core.run_stats`) and keeps the findings
+  as research notes for follow-up questions.
+"""
+
+import re
+import time
+from typing import Any, Optional
+
+from core.config import get_settings
+from core.guardrails import estimate_tokens
+from core.run_stats import attach, record
+
+# ReAct scratch lines that never need to reach the coordinator. Only the exact scaffolding
+# is matched — the protocol tags from `core.prompts` (THINK:/ACT:/OBSERVE:/REFLECT:) and the
+# classic "Thought:/Action: tool/Action Input:/Observation:" trace — case-sensitively, so
+# prose such as "Planned capex ..." or "I will note ..." is kept.
+_SCRATCH_RE = re.compile(
+    r"^\s*(?:[-*]\s*)?(?:\*\*)?"
+    r"(?:(?:THINK|ACT|OBSERVE|REFLECT|Thought|Observation|Action Input)(?:\*\*)?\s*:"
+    r"|Action(?:\*\*)?\s*:\s*`?[A-Za-z_][\w.]*`?\s*(?:\(|$))"
+)
+_DATE_RE = re.compile(
+    r"\b(?:\d{4}-\d{2}-\d{2}|Q[1-4]\s?\d{4}|(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\.?\s+(?:\d{1,2},\s+)?\d{4})\b"
+)
+_METRIC_RE = re.compile(r"\d[\d,.]*\s?(?:%|x\b|bn\b|[BMK]\b|bps\b)|(?:R\$|US\$|\$|€|£)\s?\d")
+_LINK_RE = re.compile(r"\[([^\]]+)\]\((https?://[^)\s]+)\)")
+_URL_RE = re.compile(r"https?://[^\s)\]>]+")
+_GAP_RE = re.compile(r"data gap|DATA UNAVAILABLE|not available|unavailable|missing|could not", re.IGNORECASE)
+_HEADING_RE = re.compile(r"^\s*#{1,6}\s+(.*)$")
+
+
+def _clean(line: str) -> str:
+    return re.sub(r"^\s*(?:[-*+]|\d+[.)])\s+", "", line).strip()
+
+
+def _sources(text: str) -> list[str]:
+    seen: set[str] = set()
+    out = []
+    for title, url in _LINK_RE.findall(text):
+        if url not in seen:
+            seen.add(url)
+            out.append(f"[{title.strip()}]({url})")
+    for url in _URL_RE.findall(_LINK_RE.sub("", text)):
+        url = url.rstrip(".,;")
+        if url not in seen:
+            seen.add(url)
+            out.append(url)
+    return out
+
+
+def extract_findings(text: str) -> dict[str, list[str]]:
+    """
+    Classify a member's markdown into finding buckets.
+
+    Returns:
+        dict: Keys "metrics", "facts", "gaps", "sources", "other" → lists of markdown items.
+    """
+    buckets: dict[str, list[str]] = {"metrics": [], "facts": [], "gaps": [], "sources": [], "other": []}
+    buckets["sources"] = _sources(text)
+
+    heading = ""
+    table: list[str] = []
+    lines = text.splitlines() + [""]  # sentinel flushes a trailing table
+    for raw in lines:
+        if raw.lstrip().startswith("|"):
+            table.append(raw.strip())
+            continue
+        if table:
+            if len(table) > 2:  # header + separator + at least one row
+                buckets["metrics"].append("\n".join(table))
+            table = []
+
+        m = _HEADING_RE.match(raw)
+        if m:
+            heading = m.group(1).lower()
+            continue
+        if not raw.strip() or _SCRATCH_RE.match(raw) or set(raw.strip()) <= set("-*_="):
+            continue
+
+        line = _clean(raw)
+        # Pure source lines are already captured in the sources bucket
+        if not _LINK_RE.sub("", _URL_RE.sub("", line)).strip(" -–:()"):
+            continue
+        if "gap" in heading or _GAP_RE.search(line):
+            buckets["gaps"].append(line)
+        elif "source" in heading or "reference" in heading:
+            continue
+        elif _DATE_RE.search(line):
+            buckets["facts"].append(line)
+        elif _METRIC_RE.search(line):
+            buckets["metrics"].append(line)
+        else:
+            buckets["other"].append(line)
+    return buckets
+
+
+_SECTIONS = (
+    ("metrics", "Metrics"),
+    ("facts", "Dated facts"),
+    ("gaps", "Data gaps"),
+    ("sources", "Sources"),
+    ("other", "Other key points"),
+)
+
+
+def compress_member_output(text: str, budget_tokens: int, member_name: Optional[str] = None) -> str:
+    """
+    Condense a member's output into structured findings within `budget_tokens`.
+
+    Items are admitted bucket by bucket in priority order (metrics, dated facts, data
+    gaps, sources, other points) until the budget is spent; anything dropped is counted
+    in a trailing note so the coordinator knows the summary is partial.
+
+    Args:
+        text: Raw member output (markdown).
+        budget_tokens: Approximate token ceiling for the result.
+        member_name: Optional label for the findings header.
+
+    Returns:
+        str: Compact markdown findings.
+    """
+    if not text or not text.strip():
+        return text
+    findings = extract_findings(text)
+    title = f"### Findings from {member_name}" if member_name else "### Findings"
+
+    parts = [title]
+    used = estimate_tokens(title)
+    dropped = 0
+    for key, label in _SECTIONS:
+        items = findings[key]
+        if not items:
+            continue
+        header = f"\n**{label}**"
+        section: list[str] = []
+        cost = estimate_tokens(header)
+        for item in items:
+            rendered = item if item.startswith("|") else f"- {item}"
+            item_cost = estimate_tokens(rendered) + 1
+            if used + cost + item_cost > budget_tokens:
+                dropped += 1
+                continue
+            section.append(rendered)
+            cost += item_cost
+        if section:
+            parts.append(header)
+            parts.extend(section)
+            used += cost
+
+    if dropped:
+        parts.append(f"\n_({dropped} lower-priority item(s) omitted to fit the context budget.)_")
+    return "\n".join(parts)
+
+
+def compress_member_output_hook(run_output: Any, agent: Any = None) -> None:
+    """
+    Agno post-hook: replace a member run's text content with compact findings.
+
+    Records `member_tokens_raw`, `member_tokens_compacted` and `compaction_ms` on the
+    active run so coordinator prompt savings can be compared with compaction on and off,
+    and attaches the (condensed) output as the member's research notes for follow-ups.
+    """
+    settings = get_settings()
+    content = getattr(run_output, "content", None)
+    if not isinstance(content, str) or not content.strip():
+        return
+    member = getattr(agent, "name", None)
+    if not settings.MEMBER_COMPACTION_ENABLED:
+        attach(member or "member", content)
+        return
+
+    started = time.perf_counter()
+    compact = compress_member_output(content, settings.MEMBER_OUTPUT_TOKEN_BUDGET, member)
+    raw_tokens, compact_tokens = estimate_tokens(content), estimate_tokens(compact)
+    if compact_tokens >= raw_tokens:
+        compact, compact_tokens = content, raw_tokens  # short outputs are passed through
+    record("member_tokens_raw", raw_tokens)
+    record("member_tokens_compacted", compact_tokens)
+    record("compaction_ms", (time.perf_counter() - started) * 1000)
+    attach(member or "member", compact)
+    run_output.content = compact
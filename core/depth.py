@@ -0,0 +1,92 @@
+# core/depth.py
+"""
+Analysis Depth Policy
+
+Purpose:
+- Let callers choose how much work an analysis does:
+    * snapshot: metrics only, no model call (see `tools.snapshot`).
+    * standard: the team with a short brief (summary, snapshot, fundamentals, risks, thesis).
+    * deep: the full seven-section, multi-agent deep dive.
+- Under load, keep serving instead of timing out: when the admission queue grows or
+  recent analyses get slow, requested depth is lowered, and past a last threshold the
+  latest stored report is served marked as stale.
+
+Key Components:
+- DEPTHS / depth_rank: Ordered depth levels.
+- DepthDecision: What to serve for one request and why.
+- choose_depth: Pure policy over load signals (queue depth, average service time).
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+from core.config import get_settings
+
+DEPTHS = ("snapshot", "standard", "deep")
+
+
+def depth_rank(depth: str) -> int:
+    """Position of `depth` in DEPTHS (unknown values rank as deep, the historical default)."""
+    return DEPTHS.index(depth) if depth in DEPTHS else len(DEPTHS) - 1
+
+
+@dataclass
+class DepthDecision:
+    """
+    Outcome of the depth policy.
+
+    Attributes:
+        requested: Depth asked for by the client.
+        depth: Depth to run (never deeper than requested).
+        serve_stale: Serve the latest stored report instead of running anything.
+        reason: Why the request was degraded (None when served as requested).
+    """
+
+    requested: str
+    depth: str
+    serve_stale: bool = False
+    reason: Optional[str] = None
+
+    @property
+    def degraded(self) -> bool:
+        return self.serve_stale or self.depth != self.requested
+
+
+def choose_depth(requested: str, queue_depth: int, avg_service_seconds: float) -> DepthDecision:
+    """
+    Apply the load-aware degradation policy.
+
+    Rules (each threshold is a setting; 0 disables it):
+        - queue ≥ DEPTH_STALE_QUEUE_DEPTH → serve the latest stored report (stale).
+        - queue ≥ DEPTH_SNAPSHOT_QUEUE_DEPTH → snapshot.
+        - queue ≥ DEPTH_STANDARD_QUEUE_DEPTH → at most standard.
+        - average service time of the requested depth ≥ DEPTH_LATENCY_SECONDS → one level shallower.
+    """
+    s = get_settings()
+    decision = DepthDecision(requested=requested, depth=requested)
+    if not s.DEPTH_DEGRADE_ENABLED:
+        return decision
+
+    def over(threshold: float, value: float) -> bool:
+        return bool(threshold) and value >= threshold
+
+    if over(s.DEPTH_STALE_QUEUE_DEPTH, queue_depth):
+        decision.serve_stale = True
+        decision.depth = "snapshot"  # fallback when no stored report exists
+        decision.reason = f"queue depth {queue_depth}"
+        return decision
+
+    cap = len(DEPTHS) - 1
+    if over(s.DEPTH_SNAPSHOT_QUEUE_DEPTH, queue_depth):
+        cap, decision.reason = 0, f"queue depth {queue_depth}"
+    elif over(s.DEPTH_STANDARD_QUEUE_DEPTH, queue_depth):
+        cap, decision.reason = 1, f"queue depth {queue_depth}"
+    if over(s.DEPTH_LATENCY_SECONDS, avg_service_seconds) and depth_rank(requested) > 0:
+        latency_cap = depth_rank(requested) - 1
+        if latency_cap < cap:
+            cap, decision.reason = latency_cap, f"average analysis time {avg_service_seconds:.0f}s"
+
+    decision.depth = DEPTHS[min(depth_rank(requested), cap)]
+    if decision.depth == requested:
+        decision.reason = None
+    return decision
@@ -12,18 +12,27 @@ Key Components:
 - TICKER_RE: Regex to validate common stock ticker formats (with optional suffix).
 - sanitize_user_input: Redacts unsafe phrases and trims input.
 - validate_ticker: Normalizes and validates ticker symbols.
+- ensure_known_ticker: Rejects tickers unknown to the reference index and to the provider.
+- resolve_known_ticker: Async `ensure_known_ticker` for request handlers (provider check
+  off the event loop, time-limited).
 - domain_allowed: Checks if all provided URLs are within an allowlist.
+- estimate_tokens: Rough token count (~4 chars/token) used for budgets and savings.
 - RateLimiter: Enforces a soft execution deadline (wall-clock based).
+- guard_prompt: Sanitizes free-form text and enforces the input size limit.
 - AnalyzeRequest: Pydantic model that validates inbound analysis requests.
+- FollowupRequest: Pydantic model that validates follow-up questions on a report.
 """
 
+import asyncio
 import re
 import time
 from typing import Iterable
 
+from loguru import logger
 from pydantic import BaseModel, field_validator
 
 from core.config import get_settings
+from core.ticker_index import get_ticker_index, provider_listing
 
 # Basic patterns that should be redacted from user-controlled text.
 # Notes:
@@ -39,7 +48,11 @@ DANGEROUS_PATTERNS = [
 # Accepts common ticker formats:
 #   - Pure alphanumeric (1–6 chars), e.g., "AAPL", "MSFT", "PETR4"
 #   - Optional market suffix after a dot, e.g., "BBAS3.SA", "BRK.B"
-TICKER_RE = re.compile(r"^[A-Z0-9]{1,6}(?:\.[A-Z]{1,4})?$")
+#   - Optional share class after a dash (Yahoo style), e.g., "BRK-B"
+TICKER_RE = re.compile(r"^[A-Z0-9]{1,6}(?:\.[A-Z]{1,4}|-[A-Z])?$")
+
+# Conservative characters-per-token approximation used across budgets and metrics.
+CHARS_PER_TOKEN = 4
 
 
 def sanitize_user_input(text: str) -> str:
@@ -71,7 +84,7 @@ def validate_ticker(ticker: str) -> str:
         - Converts to uppercase.
 
     Validation:
-        - Must match TICKER_RE (e.g., "AAPL", "BBAS3.SA", "BRK.B").
+        - Must match TICKER_RE (e.g., "AAPL", "BBAS3.SA", "BRK.B", "BRK-B").
 
     Args:
         ticker: The input ticker symbol.
@@ -88,6 +101,68 @@ def validate_ticker(ticker: str) -> str:
     return t
 
 
+def ensure_known_ticker(ticker: str) -> str:
+    """
+    Reject tickers that neither the local reference index nor the provider knows.
+
+    This runs before any agent is invoked, so typos and delisted symbols never
+    trigger an expensive team run. The bundled index is a curated subset: on a miss
+    the symbol is checked against Yahoo Finance (cached) before rejecting it. That check
+    blocks on the network; request handlers use `resolve_known_ticker` instead.
+
+    Args:
+        ticker: A ticker already normalized by `validate_ticker`.
+
+    Returns:
+        The ticker, rewritten to the provider's spelling when only that one is listed
+        (e.g., "BRK.B" → "BRK-B").
+
+    Raises:
+        ValueError: If strict mode is enabled and the ticker is unknown.
+    """
+    s = get_settings()
+    if not s.TICKER_INDEX_STRICT:
+        return ticker
+    index = get_ticker_index()
+    if ticker in index:
+        return ticker
+    if s.TICKER_INDEX_VERIFY_ONLINE:
+        try:
+            listed = provider_listing(ticker)
+        except Exception as e:
+            # Can't verify right now; don't turn away a possibly valid symbol
+            logger.warning(f"Could not verify ticker {ticker} with the provider: {e}")
+            return ticker
+        if listed:
+            return listed
+    index.require(ticker)  # raises with suggestions
+    return ticker
+
+
+async def resolve_known_ticker(ticker: str) -> str:
+    """
+    `ensure_known_ticker` for async callers.
+
+    Index hits are answered inline. The provider check runs in a worker thread, bounded by
+    TICKER_VERIFY_TIMEOUT_SECONDS; past that the ticker is accepted unverified, as during
+    a provider outage (the lookup finishes in the background and fills the cache).
+
+    Raises:
+        ValueError: If strict mode is enabled and the ticker is unknown.
+    """
+    s = get_settings()
+    needs_provider = s.TICKER_INDEX_STRICT and s.TICKER_INDEX_VERIFY_ONLINE
+    if not needs_provider or ticker in get_ticker_index():
+        return ensure_known_ticker(ticker)
+    try:
+        return await asyncio.wait_for(
+            asyncio.to_thread(ensure_known_ticker, ticker), timeout=s.TICKER_VERIFY_TIMEOUT_SECONDS
+        )
+    except asyncio.TimeoutError:
+        logger.warning(f"Ticker check for {ticker} timed out; accepting it unverified")
+        return ticker
+
+
 def domain_allowed(urls: Iterable[str]) -> bool:
     """
     Verify that each URL contains an allowed domain substring.
@@ -107,6 +182,15 @@ def domain_allowed(urls: Iterable[str]) -> bool:
     return all(any(dom in u for dom in allowed) for u in urls)
 
 
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the token count of `text` without a tokenizer.
+
+    Uses the same ~4 chars/token approximation as the prompt length guard.
+    """
+    return -(-len(text) // CHARS_PER_TOKEN) if text else 0
+
+
 class RateLimiter:
     """
     Simple wall-clock deadline guard.
@@ -134,12 +218,28 @@ class RateLimiter:
             raise TimeoutError("Time budget exceeded by guardrails")
 
 
+def guard_prompt(text: str) -> str:
+    """
+    Sanitize free-form user text and enforce the MAX_INPUT_TOKENS size limit.
+
+    Raises:
+        ValueError: If the sanitized text exceeds the configured size limit.
+    """
+    s = sanitize_user_input(text)
+    # Rough character cap: ~4 chars/token as a conservative approximation.
+    if len(s) > get_settings().MAX_INPUT_TOKENS * CHARS_PER_TOKEN:
+        raise ValueError("Prompt too long")
+    return s
+
+
 class AnalyzeRequest(BaseModel):
     """
     Input schema for an analysis operation.
 
     Fields:
-        ticker: Stock ticker symbol, validated via `validate_ticker`.
+        ticker: Stock ticker symbol, normalized and format-checked via `validate_ticker`.
+            Whether it exists is checked separately (`resolve_known_ticker`), since that
+            may need the network and validators run on the event loop.
         prompt: Free-form analysis prompt, sanitized and length-checked.
     """
 
@@ -164,8 +264,24 @@ class AnalyzeRequest(BaseModel):
         Raises:
             ValueError: If the sanitized prompt exceeds the configured size limit.
         """
-        s = sanitize_user_input(v)
-        # Rough character cap: ~4 chars/token as a conservative approximation.
-        if len(s) > get_settings().MAX_INPUT_TOKENS * 4:
-            raise ValueError("Prompt too long")
+        return guard_prompt(v)
+
+
+class FollowupRequest(BaseModel):
+    """
+    Input schema for a follow-up question on an existing report.
+
+    Fields:
+        question: Free-form follow-up, sanitized and length-checked like analysis prompts.
+    """
+
+    question: str
+
+    @field_validator("question")
+    @classmethod
+    def _v_question(cls, v: str) -> str:
+        """Sanitize and length-guard the question; empty questions are rejected."""
+        s = guard_prompt(v)
+        if not s:
+            raise ValueError("Question is empty")
         return s
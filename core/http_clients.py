@@ -0,0 +1,168 @@
+# core/http_clients.py
+"""
+Shared HTTP Clients
+
+Purpose:
+- Replace the per-model, lazily created HTTP clients with one process-wide, keep-alive,
+  HTTP/2-capable connection pool (the `h2` package enables HTTP/2 in httpx).
+- Warm connections at startup so the first user request doesn't pay for TLS handshakes
+  and client construction, and close everything cleanly on shutdown.
+
+Key Components:
+- SharedHttpClients: Owns the pooled httpx.AsyncClient, attaches it to Agno models,
+  owns yfinance's session, warms upstream connections and closes them.
+- collect_models: Find every model used by a Team (coordinator + members, recursively).
+
+Tool layer:
+- yfinance (YFinanceTools, FundamentalsTools, PeerComparisonTools) sends every request
+  through one process-wide curl_cffi session. It can't use the httpx pool, so
+  `attach_tools` installs a session owned here instead: it is warmed with the models'
+  pool and closed on shutdown.
+- DuckDuckGo is not shared. agno's DuckDuckGoTools builds a new `DDGS` client (its own
+  primp HTTP client) inside every search call and offers no hook to inject one, so web
+  searches still open their own connections.
+
+Usage (FastAPI lifespan):
+    clients = SharedHttpClients.from_settings()
+    clients.attach(collect_models(team))
+    clients.attach_tools()
+    await clients.warm_up()
+    ...
+    await clients.aclose()
+"""
+
+import asyncio
+from typing import Any, Iterable, Optional
+
+import httpx
+from curl_cffi import requests as curl_requests
+from loguru import logger
+from yfinance.data import YfData
+
+from core.config import get_settings
+
+OPENAI_WARMUP_URL = "https://api.openai.com/v1/models"
+
+
+def collect_models(team: Any) -> list[Any]:
+    """
+    Return the distinct model objects used by `team` and its members (recursively).
+    """
+    models: list[Any] = []
+    stack = [team]
+    while stack:
+        node = stack.pop()
+        model = getattr(node, "model", None)
+        if model is not None and all(model is not m for m in models):
+            models.append(model)
+        stack.extend(getattr(node, "members", None) or [])
+    return models
+
+
+class SharedHttpClients:
+    """
+    Process-wide pooled HTTP clients for model and market-data tool traffic.
+
+    Attributes:
+        async_client: Keep-alive, HTTP/2-capable httpx.AsyncClient shared by all models.
+        yf_session: curl_cffi session installed as yfinance's session by `attach_tools`.
+    """
+
+    def __init__(
+        self,
+        async_client: httpx.AsyncClient,
+        warmup_timeout: float = 5.0,
+        yf_session: Optional[curl_requests.Session] = None,
+    ):
+        self.async_client = async_client
+        self.warmup_timeout = warmup_timeout
+        self.yf_session = yf_session or curl_requests.Session(impersonate="chrome")
+        self._models: list[Any] = []
+        self._previous_yf_session: Any = None
+
+    @classmethod
+    def from_settings(cls) -> "SharedHttpClients":
+        """Build the shared pool from application settings."""
+        s = get_settings()
+        client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=s.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=s.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=s.HTTP_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+            timeout=httpx.Timeout(s.HTTP_TIMEOUT_SECONDS, connect=10.0),
+        )
+        return cls(client, warmup_timeout=s.HTTP_WARMUP_TIMEOUT_SECONDS)
+
+    def attach(self, models: Iterable[Any]) -> None:
+        """
+        Point every model at the shared pool.
+
+        Uses the Agno model's `http_client` field; when an API key is configured the SDK
+        client is built eagerly so that setup cost is paid at startup, not on the first request.
+        """
+        for model in models:
+            if not hasattr(model, "http_client"):
+                continue
+            model.http_client = self.async_client
+            model.async_client = None  # drop any client built before the pool existed
+            self._models.append(model)
+            if get_settings().OPENAI_API_KEY and hasattr(model, "get_async_client"):
+                try:
+                    model.get_async_client()
+                except Exception as e:
+                    logger.warning(f"Could not pre-build client for {model!r}: {e}")
+
+    def attach_tools(self) -> None:
+        """
+        Make `yf_session` the session behind every yfinance call (yfinance keeps a single
+        process-wide session; see the module notes for DuckDuckGo).
+        """
+        data = YfData()
+        self._previous_yf_session = data._session
+        YfData(session=self.yf_session)  # the singleton adopts the given session
+
+    async def _warm_openai(self) -> None:
+        # Any response (even 401) means DNS, TCP, TLS and HTTP/2 setup are done and pooled.
+        headers = {}
+        if get_settings().OPENAI_API_KEY:
+            headers["Authorization"] = f"Bearer {get_settings().OPENAI_API_KEY}"
+        await self.async_client.get(OPENAI_WARMUP_URL, headers=headers)
+
+    @staticmethod
+    def _warm_yfinance() -> None:
+        # One cheap call opens yfinance's session and primes its cookie/crumb handshake,
+        # so the first tool call doesn't pay for it.
+        import yfinance as yf
+
+        yf.Ticker("SPY").fast_info.get("currency")
+
+    async def warm_up(self) -> None:
+        """
+        Open upstream connections concurrently; failures are logged, never raised.
+        """
+
+        async def guarded(name: str, coro: Any) -> None:
+            try:
+                await asyncio.wait_for(coro, timeout=self.warmup_timeout)
+                logger.info(f"Warmed {name} connections")
+            except Exception as e:
+                logger.warning(f"Warm-up of {name} skipped: {e!r}")
+
+        await asyncio.gather(
+            guarded("OpenAI", self._warm_openai()),
+            guarded("yfinance", asyncio.to_thread(self._warm_yfinance)),
+        )
+
+    async def aclose(self) -> None:
+        """Detach from models and yfinance, and close pooled connections."""
+        for model in self._models:
+            model.http_client = None
+            model.async_client = None
+        self._models.clear()
+        if self._previous_yf_session is not None:
+            YfData(session=self._previous_yf_session)
+            self._previous_yf_session = None
+        self.yf_session.close()
+        await self.async_client.aclose()
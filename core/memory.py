@@ -11,24 +11,25 @@ Purpose:
 Usage:
     from core.memory import build_db
     db = build_db()
+
+    # Other local stores (e.g., saved reports) share the same SQLite file:
+    from core.memory import db_file_path
 """
 
 from agno.db.sqlite import SqliteDb
 from core.config import get_settings
 
 
-def build_db() -> SqliteDb:
+def db_file_path() -> str:
     """
-    Build and return a persistent SQLite database instance.
+    Resolve the SQLite file path from application settings.
 
     Behavior:
-        - Reads the database connection URL from application settings.
         - Supports URLs of the form: "sqlite:///./file_name.db".
         - Defaults to "agno_memory.db" if the URL is not SQLite-based.
-        - The resulting database is used to persist agent sessions and user memories.
 
     Returns:
-        SqliteDb: Configured database instance connected to the target file.
+        str: Path of the SQLite database file.
     """
     settings = get_settings()
 
@@ -40,4 +41,18 @@ def build_db() -> SqliteDb:
         # Fallback for unsupported URLs or missing config
         db_file = "agno_memory.db"
 
-    return SqliteDb(db_file=db_file)
+    return db_file
+
+
+def build_db() -> SqliteDb:
+    """
+    Build and return a persistent SQLite database instance.
+
+    Behavior:
+        - Reads the database location via `db_file_path()`.
+        - The resulting database is used to persist agent sessions and user memories.
+
+    Returns:
+        SqliteDb: Configured database instance connected to the target file.
+    """
+    return SqliteDb(db_file=db_file_path())
@@ -0,0 +1,156 @@
+# core/profiling.py
+"""
+Per-Request Sampling Profiler (debug only)
+
+Purpose:
+- Answer "where did the time go?" for a single slow request: Python overhead (Pydantic
+  validation, `prettify_report`, JSON serialization, logging) versus waiting on I/O
+  (event loop idle in the selector, worker threads blocked in sockets).
+- A background thread samples the stacks of every thread at a fixed interval while the
+  request runs; samples are aggregated into the collapsed-stack format understood by
+  flamegraph.pl, speedscope and inferno ("frame;frame;frame count" per line).
+- Stdlib only, and nothing runs unless a request explicitly opts in, so the cost of the
+  feature when it is off is a single settings check.
+
+Key Components:
+- SamplingProfiler: Start/stop sampler producing collapsed stacks.
+- ProfileStore: Bounded on-disk store of profiles, fetched by id.
+- get_profile_store: Process-wide store built from settings.
+
+Notes:
+- All threads are sampled (tool calls run in worker threads), each stack prefixed with
+  the thread name; concurrent requests therefore also appear in the profile.
+"""
+
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from core.config import get_settings
+
+PROFILE_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    path = Path(code.co_filename)
+    location = "/".join(path.parts[-2:]) if len(path.parts) > 1 else path.name
+    return f"{code.co_name} ({location}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """
+    Wall-clock sampling profiler over all threads.
+
+    Attributes:
+        profile_id: Identifier under which the profile is stored.
+        interval: Seconds between samples.
+        samples: Number of sampling passes taken.
+    """
+
+    def __init__(self, interval: float = 0.005, profile_id: Optional[str] = None):
+        self.profile_id = profile_id or uuid.uuid4().hex
+        self.interval = interval
+        self.samples = 0
+        self.started_at = 0.0
+        self.duration = 0.0
+        self._stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self) -> None:
+        own = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            stack.append(names.get(ident, f"thread-{ident}"))
+            self._stacks[";".join(reversed(stack))] += 1
+        self.samples += 1
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self) -> "SamplingProfiler":
+        """Begin sampling in a daemon thread."""
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop sampling and wait for the sampler thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration = time.perf_counter() - self.started_at
+
+    def __enter__(self) -> "SamplingProfiler":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def collapsed(self) -> str:
+        """Profile in collapsed-stack format (one "stack count" line per distinct stack)."""
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self._stacks.items()))
+
+
+class ProfileStore:
+    """
+    Keep the most recent profiles as `{profile_id}.folded` files in a directory.
+
+    Attributes:
+        directory: Storage directory (created on first save).
+        max_files: Older profiles beyond this count are deleted.
+    """
+
+    def __init__(self, directory: str, max_files: int = 50):
+        self.directory = Path(directory)
+        self.max_files = max(1, max_files)
+
+    def _path(self, profile_id: str) -> Path:
+        if not PROFILE_ID_RE.match(profile_id):
+            raise ValueError(f"Invalid profile id: {profile_id}")
+        return self.directory / f"{profile_id}.folded"
+
+    def save(self, profile_id: str, collapsed: str) -> Path:
+        """Write a profile atomically and prune the oldest ones."""
+        path = self._path(profile_id)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            fh.write(collapsed)
+        os.replace(tmp, path)
+
+        profiles = sorted(self.directory.glob("*.folded"), key=lambda p: p.stat().st_mtime)
+        for old in profiles[: -self.max_files]:
+            old.unlink(missing_ok=True)
+        return path
+
+    def get(self, profile_id: str) -> Optional[str]:
+        """Collapsed stacks for `profile_id`, or None when unknown."""
+        try:
+            return self._path(profile_id).read_text(encoding="utf-8")
+        except (ValueError, FileNotFoundError):
+            return None
+
+
+@lru_cache
+def get_profile_store() -> ProfileStore:
+    """Process-wide profile store from settings."""
+    s = get_settings()
+    return ProfileStore(s.PROFILE_DIR, max_files=s.PROFILE_MAX_FILES)
@@ -0,0 +1,404 @@
+# core/report_export.py
+"""
+Report Export (PDF / HTML / DOCX)
+
+Purpose:
+- Turn a stored report's markdown into board-pack friendly documents.
+- Rendering is CPU-bound, so it never runs on the API event loop: jobs go to a small,
+  bounded ProcessPoolExecutor and the event loop only awaits the result.
+- Rendered files are cached on disk by report content hash, so repeated exports of the
+  same report are served straight from disk; concurrent requests for the same file
+  share one render (single flight).
+- The cache is bounded: files unused for `max_age_seconds` and the least recently used
+  files beyond `max_files` are evicted after each render. Files used within the last
+  `in_use_seconds` are never evicted, since another request may be about to stream them.
+- A crashed worker breaks a ProcessPoolExecutor for good; the broken pool is dropped and
+  the render is retried once on a fresh pool.
+- Report markdown embeds model and web-sourced text, so raw HTML in it is escaped
+  (markdown2 `safe_mode`), never rendered.
+
+Key Components:
+- render_report: Pure markdown → bytes renderer (runs inside worker processes).
+- ReportExporter: Cache lookup, single flight, pending-job bound and pool dispatch.
+- get_report_exporter / shutdown_report_exporter: Process-wide exporter lifecycle.
+
+Usage:
+    path = await get_report_exporter().export(report.content_hash, report.content_markdown, "pdf", title)
+"""
+
+import asyncio
+import io
+import multiprocessing
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Optional
+
+from loguru import logger
+
+EXPORT_FORMATS: dict[str, str] = {
+    "pdf": "application/pdf",
+    "html": "text/html; charset=utf-8",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
+
+_MARKDOWN_EXTRAS = ["tables", "fenced-code-blocks", "strike", "cuddled-lists"]
+
+_HTML_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ font-family: Helvetica, Arial, sans-serif; max-width: 860px; margin: 2rem auto; line-height: 1.5; color: #222; }}
+table {{ border-collapse: collapse; margin: 1rem 0; }}
+th, td {{ border: 1px solid #ccc; padding: 4px 8px; text-align: right; }}
+th:first-child, td:first-child {{ text-align: left; }}
+blockquote {{ color: #555; border-left: 3px solid #ccc; margin-left: 0; padding-left: 1rem; }}
+</style>
+</head>
+<body>
+{body}
+</body>
+</html>
+"""
+
+# Core PDF fonts are Latin-1 only: map common typography to ASCII, drop the rest (e.g., emoji)
+_PDF_TRANSLATION = str.maketrans(
+    {"—": "-", "–": "-", "‘": "'", "’": "'", "“": '"', "”": '"', "…": "...", "•": "-", "→": "->"}
+)
+
+_INLINE_RE = re.compile(r"(\*\*[^*]+\*\*|\*[^*]+\*|`[^`]+`|\[[^\]]+\]\([^)]+\))")
+
+
+class ExportBusy(RuntimeError):
+    """Raised when the export queue is full; callers should retry later."""
+
+
+def _html_body(markdown_text: str) -> str:
+    import markdown2
+
+    # Escape raw HTML (and neutralize javascript: links) coming from model/web text
+    return markdown2.markdown(markdown_text, extras=_MARKDOWN_EXTRAS, safe_mode="escape")
+
+
+def _render_html(markdown_text: str, title: str) -> bytes:
+    from html import escape
+
+    return _HTML_TEMPLATE.format(title=escape(title), body=_html_body(markdown_text)).encode("utf-8")
+
+
+def _render_pdf(markdown_text: str, title: str) -> bytes:
+    from fpdf import FPDF
+
+    html = _html_body(markdown_text).translate(_PDF_TRANSLATION)
+    html = html.encode("latin-1", "ignore").decode("latin-1")
+    pdf = FPDF()
+    pdf.set_title(title.translate(_PDF_TRANSLATION).encode("latin-1", "ignore").decode("latin-1"))
+    pdf.add_page()
+    pdf.set_font("helvetica", size=10)
+    pdf.write_html(html)
+    return bytes(pdf.output())
+
+
+def _add_inline_runs(paragraph, text: str) -> None:
+    """Add markdown inline spans (bold, italic, code, links) to a DOCX paragraph."""
+    for part in _INLINE_RE.split(text):
+        if not part:
+            continue
+        if part.startswith("**") and part.endswith("**"):
+            paragraph.add_run(part[2:-2]).bold = True
+        elif part.startswith("`") and part.endswith("`"):
+            paragraph.add_run(part[1:-1]).font.name = "Courier New"
+        elif part.startswith("[") and part.endswith(")"):
+            label, _, url = part[1:-1].partition("](")
+            paragraph.add_run(f"{label} ({url})")
+        elif part.startswith("*") and part.endswith("*") and len(part) > 2:
+            paragraph.add_run(part[1:-1]).italic = True
+        else:
+            paragraph.add_run(part)
+
+
+def _render_docx(markdown_text: str, title: str) -> bytes:
+    from docx import Document
+
+    doc = Document()
+    doc.core_properties.title = title
+    table_rows: list[list[str]] = []
+
+    def flush_table() -> None:
+        rows = [r for r in table_rows if not all(set(c) <= set(":- ") for c in r)]
+        table_rows.clear()
+        if not rows:
+            return
+        table = doc.add_table(rows=len(rows), cols=max(len(r) for r in rows))
+        table.style = "Table Grid"
+        for i, row in enumerate(rows):
+            for j, cell in enumerate(row):
+                paragraph = table.cell(i, j).paragraphs[0]
+                _add_inline_runs(paragraph, cell)
+                if i == 0:
+                    for run in paragraph.runs:
+                        run.bold = True
+
+    for raw in markdown_text.splitlines():
+        line = raw.strip()
+        if line.startswith("|"):
+            table_rows.append([c.strip() for c in line.strip("|").split("|")])
+            continue
+        if table_rows:
+            flush_table()
+        if not line or set(line) <= set("-*_="):
+            continue
+        heading = re.match(r"^(#{1,6})\s+(.*)$", line)
+        bullet = re.match(r"^[-*+]\s+(.*)$", line)
+        numbered = re.match(r"^\d+[.)]\s+(.*)$", line)
+        if heading:
+            doc.add_heading(heading.group(2).strip("# "), level=min(len(heading.group(1)), 4))
+        elif bullet:
+            _add_inline_runs(doc.add_paragraph(style="List Bullet"), bullet.group(1))
+        elif numbered:
+            _add_inline_runs(doc.add_paragraph(style="List Number"), numbered.group(1))
+        elif line.startswith(">"):
+            _add_inline_runs(doc.add_paragraph(style="Quote"), line.lstrip("> "))
+        else:
+            _add_inline_runs(doc.add_paragraph(), line)
+    if table_rows:
+        flush_table()
+
+    buf = io.BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+
+_RENDERERS = {"html": _render_html, "pdf": _render_pdf, "docx": _render_docx}
+
+
+def render_report(markdown_text: str, fmt: str, title: str = "Equity Report") -> bytes:
+    """
+    Render report markdown to a document.
+
+    Args:
+        markdown_text: Report markdown.
+        fmt: One of EXPORT_FORMATS ("pdf", "html", "docx").
+        title: Document title metadata.
+
+    Returns:
+        bytes: The rendered document.
+    """
+    if fmt not in _RENDERERS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    return _RENDERERS[fmt](markdown_text, title)
+
+
+def render_to_file(markdown_text: str, fmt: str, title: str, path: str) -> str:
+    """
+    Worker entry point: render and write `path` atomically (temp file + rename), so a
+    partially written file is never served from the cache.
+    """
+    data = render_report(markdown_text, fmt, title)
+    target = Path(path)
+    fd, tmp = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp, target)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+    return path
+
+
+class ReportExporter:
+    """
+    Disk-cached, single-flight report exporter backed by a bounded process pool.
+
+    Attributes:
+        cache_dir: Directory holding rendered files named `{content_hash}.{fmt}`.
+        workers: Size of the process pool.
+        max_pending: Renders allowed in flight before new ones are rejected (ExportBusy).
+        max_files: Cached files kept (least recently used beyond this are deleted).
+        max_age_seconds: Cached files unused for longer than this are deleted.
+        in_use_seconds: Files used this recently are kept even beyond `max_files` (a
+            request that just got the path from the cache may still be opening it).
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        workers: int = 2,
+        max_pending: int = 8,
+        max_files: int = 500,
+        max_age_seconds: float = 7 * 24 * 3600,
+        in_use_seconds: float = 300,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.workers = max(1, workers)
+        self.max_pending = max(1, max_pending)
+        self.max_files = max(1, max_files)
+        self.max_age_seconds = max_age_seconds
+        self.in_use_seconds = in_use_seconds
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._inflight: dict[str, Future] = {}
+
+    @classmethod
+    def from_settings(cls) -> "ReportExporter":
+        """Build the exporter from application settings."""
+        from core.config import get_settings
+
+        s = get_settings()
+        return cls(
+            s.EXPORT_CACHE_DIR,
+            workers=s.EXPORT_WORKERS,
+            max_pending=s.EXPORT_MAX_PENDING,
+            max_files=s.EXPORT_CACHE_MAX_FILES,
+            max_age_seconds=s.EXPORT_CACHE_MAX_AGE_SECONDS,
+        )
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        # Created lazily so API startup and non-export traffic never pay for worker processes.
+        # "spawn" avoids forking a process that already runs an event loop and threads.
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    def _drop_pool(self, pool: ProcessPoolExecutor) -> None:
+        # Caller holds the lock. Only the broken pool is dropped; a replacement that another
+        # request already created is left alone. A broken pool has already terminated its
+        # workers, so it only needs detaching (the next submit creates a fresh one).
+        if self._pool is pool:
+            self._pool = None
+            logger.warning("Export worker pool broke (worker crashed); starting a new one")
+
+    def cache_path(self, content_hash: str, fmt: str) -> Path:
+        """Where the rendered `fmt` file for a report hash is (or will be) cached."""
+        return self.cache_dir / f"{content_hash}.{fmt}"
+
+    @property
+    def pending(self) -> int:
+        """Renders currently queued or running."""
+        return len(self._inflight)
+
+    def _submit(self, content_hash: str, markdown_text: str, fmt: str, title: str) -> Future:
+        key = f"{content_hash}.{fmt}"
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                return future  # single flight: join the render already in progress
+            if len(self._inflight) >= self.max_pending:
+                raise ExportBusy("Export queue is full")
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            args = (render_to_file, markdown_text, fmt, title, str(self.cache_path(content_hash, fmt)))
+            pool = self._get_pool()
+            try:
+                future = pool.submit(*args)
+            except BrokenProcessPool:
+                self._drop_pool(pool)
+                pool.shutdown(wait=False, cancel_futures=True)
+                pool = self._get_pool()
+                future = pool.submit(*args)
+            self._inflight[key] = future
+
+        def _done(fut: Future) -> None:
+            with self._lock:
+                self._inflight.pop(key, None)
+                if not fut.cancelled() and isinstance(fut.exception(), BrokenProcessPool):
+                    self._drop_pool(pool)
+
+        future.add_done_callback(_done)
+        return future
+
+    async def export(self, content_hash: str, markdown_text: str, fmt: str, title: str) -> Path:
+        """
+        Return the path of the rendered file, rendering it in the pool on a cache miss.
+
+        Raises:
+            ValueError: Unsupported format.
+            ExportBusy: Too many renders in flight.
+        """
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {fmt}")
+        path = self.cache_path(content_hash, fmt)
+        if self._fresh(path):
+            return path
+        try:
+            await asyncio.wrap_future(self._submit(content_hash, markdown_text, fmt, title))
+        except BrokenProcessPool:
+            # The crashed pool was dropped by the done callback; retry once on a new one
+            await asyncio.wrap_future(self._submit(content_hash, markdown_text, fmt, title))
+        await asyncio.to_thread(self.prune)
+        return path
+
+    def _fresh(self, path: Path) -> bool:
+        """True for a usable cached file; marks it as recently used."""
+        try:
+            if time.time() - path.stat().st_mtime > self.max_age_seconds:
+                path.unlink(missing_ok=True)
+                return False
+            os.utime(path)  # LRU: eviction is by last use, not by render time
+            return True
+        except FileNotFoundError:
+            return False
+
+    def prune(self) -> int:
+        """
+        Evict expired and least recently used cached files.
+
+        Returns:
+            int: Number of files deleted.
+        """
+        now = time.time()
+        cutoff, in_use = now - self.max_age_seconds, now - self.in_use_seconds
+        entries = []
+        for p in self.cache_dir.glob("*.*"):
+            if p.name.startswith("."):
+                continue  # in-progress temp files
+            try:
+                entries.append((p.stat().st_mtime, p))
+            except FileNotFoundError:
+                continue
+        entries.sort(reverse=True)  # most recently used first
+        removed = 0
+        for i, (mtime, p) in enumerate(entries):
+            if mtime >= in_use or (i < self.max_files and mtime >= cutoff):
+                continue
+            try:
+                p.unlink(missing_ok=True)
+            except OSError:
+                continue  # still open elsewhere (Windows)
+            removed += 1
+        return removed
+
+    def shutdown(self) -> None:
+        """Stop worker processes (pending renders are cancelled)."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+_exporter: Optional[ReportExporter] = None
+
+
+def get_report_exporter() -> ReportExporter:
+    """Process-wide exporter built from settings on first use."""
+    global _exporter
+    if _exporter is None:
+        _exporter = ReportExporter.from_settings()
+    return _exporter
+
+
+def shutdown_report_exporter() -> None:
+    """Shut down the process-wide exporter's pool, if it was ever started."""
+    global _exporter
+    if _exporter is not None:
+        _exporter.shutdown()
+        _exporter = None
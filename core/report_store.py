@@ -0,0 +1,198 @@
+# core/report_store.py
+"""
+Report Store
+
+Purpose:
+- Persist every generated report so it can be referenced after the `/v1/analyze`
+  response is sent (exports, reuse, follow-ups).
+- Lives in the same SQLite file as Agno sessions/memories (see `core.memory.db_file_path`),
+  in its own `reports` table, using the standard library driver.
+
+Key Components:
+- StoredReport: One saved report (id, session, ticker, prompt, markdown, timestamps).
+- ReportStore: Thread-safe save/get/lookup helpers.
+- get_report_store: Process-wide cached store.
+
+Usage:
+    store = get_report_store()
+    report = store.save(ticker="AAPL", prompt="...", content_markdown=md, session_id=sid)
+    store.get(report.report_id)
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from functools import lru_cache
+from typing import Any, Optional
+
+from pydantic import BaseModel, Field
+
+from core.memory import db_file_path
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    report_id TEXT PRIMARY KEY,
+    session_id TEXT,
+    ticker TEXT NOT NULL,
+    prompt TEXT NOT NULL,
+    content_markdown TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    meta TEXT NOT NULL DEFAULT '{}',
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_reports_ticker_created ON reports (ticker, created_at);
+CREATE INDEX IF NOT EXISTS ix_reports_session ON reports (session_id);
+"""
+
+_COLUMNS = "report_id, session_id, ticker, prompt, content_markdown, content_hash, meta, created_at"
+
+
+def content_hash(content_markdown: str) -> str:
+    """SHA-256 of the report markdown (identifies identical renders across report ids)."""
+    return hashlib.sha256(content_markdown.encode("utf-8")).hexdigest()
+
+
+class StoredReport(BaseModel):
+    """
+    A persisted report.
+
+    Attributes:
+        report_id: Opaque identifier returned to API clients.
+        session_id: Agno session that produced the report (if known).
+        ticker: Normalized ticker symbol.
+        prompt: User goal the report answered.
+        content_markdown: Final report markdown.
+        content_hash: SHA-256 of `content_markdown`.
+        meta: Free-form metadata (e.g., run options) stored as JSON.
+        created_at: Unix timestamp of creation.
+    """
+
+    report_id: str
+    session_id: Optional[str] = None
+    ticker: str
+    prompt: str
+    content_markdown: str
+    content_hash: str
+    meta: dict[str, Any] = Field(default_factory=dict)
+    created_at: float
+
+
+class ReportStore:
+    """
+    SQLite-backed report persistence.
+
+    Each call opens a short-lived connection, so the store is safe to use from the event
+    loop, worker threads and tests alike; writes are serialized by a lock.
+    """
+
+    def __init__(self, db_file: str):
+        self.db_file = db_file
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_file, timeout=10)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def _row(row: Optional[sqlite3.Row]) -> Optional[StoredReport]:
+        if row is None:
+            return None
+        data = dict(row)
+        data["meta"] = json.loads(data.get("meta") or "{}")
+        return StoredReport(**data)
+
+    def save(
+        self,
+        ticker: str,
+        prompt: str,
+        content_markdown: str,
+        session_id: Optional[str] = None,
+        meta: Optional[dict[str, Any]] = None,
+    ) -> StoredReport:
+        """Persist a new report and return it (with its generated id)."""
+        report = StoredReport(
+            report_id=uuid.uuid4().hex,
+            session_id=session_id,
+            ticker=ticker,
+            prompt=prompt,
+            content_markdown=content_markdown,
+            content_hash=content_hash(content_markdown),
+            meta=meta or {},
+            created_at=time.time(),
+        )
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                f"INSERT INTO reports ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    report.report_id,
+                    report.session_id,
+                    report.ticker,
+                    report.prompt,
+                    report.content_markdown,
+                    report.content_hash,
+                    json.dumps(report.meta),
+                    report.created_at,
+                ),
+            )
+        return report
+
+    def get(self, report_id: str) -> Optional[StoredReport]:
+        """Return the report with `report_id`, or None."""
+        with self._connect() as conn:
+            row = conn.execute(
+                f"SELECT {_COLUMNS} FROM reports WHERE report_id = ?", (report_id,)
+            ).fetchone()
+        return self._row(row)
+
+    def latest_for_ticker(self, ticker: str) -> Optional[StoredReport]:
+        """Most recent report for `ticker`, or None."""
+        found = self.recent_for_ticker(ticker, limit=1)
+        return found[0] if found else None
+
+    def recent_for_ticker(
+        self, ticker: str, since: Optional[float] = None, limit: int = 50
+    ) -> list[StoredReport]:
+        """
+        Reports generated for `ticker` (newest first), optionally only those created after
+        `since`. Copies stored when a report was served to another client (meta
+        `served_from`) are excluded; they are reachable through their session only.
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT {_COLUMNS} FROM reports WHERE ticker = ? AND created_at >= ? "
+                "AND json_extract(meta, '$.served_from') IS NULL "
+                "ORDER BY created_at DESC LIMIT ?",
+                (ticker, since or 0.0, limit),
+            ).fetchall()
+        return [self._row(r) for r in rows]
+
+    def recent(self, limit: int = 500) -> list[StoredReport]:
+        """Most recent generated reports across tickers (newest first), served copies excluded."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT {_COLUMNS} FROM reports WHERE json_extract(meta, '$.served_from') IS NULL "
+                "ORDER BY created_at DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return [self._row(r) for r in rows]
+
+    def by_session(self, session_id: str) -> list[StoredReport]:
+        """All reports produced in `session_id`, oldest first."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT {_COLUMNS} FROM reports WHERE session_id = ? ORDER BY created_at",
+                (session_id,),
+            ).fetchall()
+        return [self._row(r) for r in rows]
+
+
+@lru_cache
+def get_report_store() -> ReportStore:
+    """Process-wide report store backed by the application's SQLite file."""
+    return ReportStore(db_file_path())
@@ -0,0 +1,86 @@
+# core/run_stats.py
+"""
+Per-Run Statistics
+
+Purpose:
+- Collect lightweight counters (e.g., tokens saved by deduplication) for a single
+  analysis run, without threading a stats object through every agent and tool.
+- Also carries small text artifacts produced during the run (e.g., each member's
+  condensed findings), so they can be stored with the report for follow-up questions.
+- Backed by a ContextVar: the API sets a fresh RunStats per request, and tool calls
+  (including those run in worker threads via `asyncio.to_thread`) see the same object.
+
+Usage:
+    stats = start_run()
+    ...                                   # anywhere inside the run:
+    record("dedup_tokens_saved", 120)
+    attach("Equity Analyst", findings_markdown)
+    logger.info(stats.as_dict())
+"""
+
+import threading
+from contextvars import ContextVar
+from typing import Optional
+
+
+class RunStats:
+    """Thread-safe bag of numeric counters (and named text artifacts) for one run."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: dict[str, float] = {}
+        self._artifacts: dict[str, str] = {}
+
+    def add(self, name: str, value: float = 1) -> None:
+        """Increment counter `name` by `value`."""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def get(self, name: str, default: float = 0) -> float:
+        """Return the current value of counter `name`."""
+        return self._counters.get(name, default)
+
+    def as_dict(self) -> dict[str, float]:
+        """Snapshot of all counters."""
+        with self._lock:
+            return dict(self._counters)
+
+    def attach(self, name: str, text: str) -> None:
+        """Store text artifact `name`; repeated names are appended."""
+        with self._lock:
+            previous = self._artifacts.get(name)
+            self._artifacts[name] = f"{previous}\n\n{text}" if previous else text
+
+    def artifacts(self) -> dict[str, str]:
+        """Snapshot of all text artifacts."""
+        with self._lock:
+            return dict(self._artifacts)
+
+
+_current: ContextVar[Optional[RunStats]] = ContextVar("run_stats", default=None)
+
+
+def start_run() -> RunStats:
+    """Install and return a fresh RunStats for the current context."""
+    stats = RunStats()
+    _current.set(stats)
+    return stats
+
+
+def current_run() -> Optional[RunStats]:
+    """The RunStats of the current context, if a run is active."""
+    return _current.get()
+
+
+def record(name: str, value: float = 1) -> None:
+    """Add to a counter of the active run; a no-op outside of a run."""
+    stats = _current.get()
+    if stats is not None:
+        stats.add(name, value)
+
+
+def attach(name: str, text: str) -> None:
+    """Store a text artifact on the active run; a no-op outside of a run."""
+    stats = _current.get()
+    if stats is not None:
+        stats.attach(name, text)
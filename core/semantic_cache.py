@@ -0,0 +1,239 @@
+# core/semantic_cache.py
+"""
+Semantic Report Cache
+
+Purpose:
+- Exact-match caching misses most traffic: "Full deep-dive with catalysts and risks" and
+  "deep dive incl. risks & catalysts" ask for the same report.
+- Prompts are embedded locally (no network, no model download) with a signed hashing
+  vectorizer over normalized words and word-internal character n-grams; recent reports
+  of the same ticker whose prompt is similar enough (cosine ≥ threshold) and younger
+  than the TTL are served instead of running the team again.
+
+Key Components:
+- embed_prompt: Deterministic L2-normalized prompt embedding (NumPy).
+- SemanticCache: Per-ticker in-memory vector index, lazily hydrated from the report store.
+- CacheHit / adapt_cached_report: Matched report and the light note added when serving it.
+- get_semantic_cache: Process-wide cache built from settings.
+"""
+
+import hashlib
+import re
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Callable, Optional
+
+import numpy as np
+
+from core.config import get_settings
+from core.report_store import ReportStore, StoredReport, get_report_store
+
+EMBEDDING_DIM = 1024
+_CHAR_NGRAM = 4
+_CHAR_WEIGHT = 0.35  # char n-grams add typo/inflection tolerance without dominating words
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Phrase-level rewrites applied before tokenizing
+_REWRITES = (
+    (re.compile(r"&|\+"), " and "),
+    (re.compile(r"\bincl\.?(?=\s|$)|\bincluding\b"), " with "),
+    (re.compile(r"\bdeep[\s-]*dive\b"), " deepdive "),
+    (re.compile(r"\bfx\b|\bforeign exchange\b|\bcurrency\b"), " fx "),
+    (re.compile(r"\bp\s*/\s*e\b"), " pe "),
+)
+
+# Words that carry no analytical intent in analysis prompts
+_STOPWORDS = frozenset(
+    """
+    a an and are as at be by can could do for from full give i in into is it its me my
+    of on or our please plus provide report show some that the their this to us w we
+    what with would you your analysis analyze analyse equity stock company complete
+    comprehensive detailed thorough quick short overall incl including also about
+    """.split()
+)
+
+# Light stemming: fold plurals/inflections so "risks"/"risk", "catalysts"/"catalyst" match
+_SUFFIXES = ("ations", "ation", "ings", "ing", "ies", "es", "s")
+
+
+def _stem(word: str) -> str:
+    for suffix in _SUFFIXES:
+        if len(word) > len(suffix) + 3 and word.endswith(suffix):
+            return word[: -len(suffix)] + ("y" if suffix == "ies" else "")
+    return word
+
+
+def prompt_terms(prompt: str) -> list[str]:
+    """Normalized, stemmed content words of a prompt."""
+    text = prompt.lower()
+    for pattern, replacement in _REWRITES:
+        text = pattern.sub(replacement, text)
+    return [_stem(w) for w in _TOKEN_RE.findall(text) if len(w) > 1 and w not in _STOPWORDS]
+
+
+def _bucket(feature: str) -> tuple[int, float]:
+    digest = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "little")
+    return digest % EMBEDDING_DIM, 1.0 if (digest >> 63) & 1 else -1.0
+
+
+def embed_prompt(prompt: str) -> np.ndarray:
+    """
+    Embed a prompt as an L2-normalized hashed bag of words + character n-grams.
+
+    Returns:
+        np.ndarray: Shape (EMBEDDING_DIM,), float32; dot product = cosine similarity.
+    """
+    vec = np.zeros(EMBEDDING_DIM, dtype=np.float32)
+    for term in set(prompt_terms(prompt)):
+        idx, sign = _bucket("w:" + term)
+        vec[idx] += sign
+        padded = f"<{term}>"
+        grams = {padded[i : i + _CHAR_NGRAM] for i in range(max(1, len(padded) - _CHAR_NGRAM + 1))}
+        for gram in grams:
+            idx, sign = _bucket("c:" + gram)
+            vec[idx] += sign * _CHAR_WEIGHT / np.sqrt(len(grams))
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm else vec
+
+
+@dataclass
+class CacheHit:
+    """A cached report matched for a request."""
+
+    report: StoredReport
+    similarity: float
+
+
+def adapt_cached_report(hit: CacheHit) -> str:
+    """
+    Prefix a served report with a note stating when it was produced.
+
+    The note is deliberately neutral: the original request's prompt belongs to another
+    client and is never echoed.
+    """
+    generated = datetime.fromtimestamp(hit.report.created_at, tz=timezone.utc)
+    note = (
+        f"> ♻️ Served from a report generated {generated:%Y-%m-%d %H:%M} UTC. "
+        "Data reflects that time.\n\n"
+    )
+    return note + hit.report.content_markdown
+
+
+class _TickerIndex:
+    """Embeddings of recent reports for one ticker (rows aligned with `reports`)."""
+
+    def __init__(self) -> None:
+        self.reports: list[StoredReport] = []
+        self.vectors = np.zeros((0, EMBEDDING_DIM), dtype=np.float32)
+
+    def add(self, report: StoredReport, vector: np.ndarray, max_entries: int) -> None:
+        self.reports.append(report)
+        self.vectors = np.vstack([self.vectors, vector[None, :]])
+        if len(self.reports) > max_entries:
+            self.reports = self.reports[-max_entries:]
+            self.vectors = self.vectors[-max_entries:]
+
+    def evict_older_than(self, cutoff: float) -> None:
+        keep = [i for i, r in enumerate(self.reports) if r.created_at >= cutoff]
+        if len(keep) != len(self.reports):
+            self.reports = [self.reports[i] for i in keep]
+            self.vectors = self.vectors[keep]
+
+
+class SemanticCache:
+    """
+    Per-ticker semantic lookup over recently stored reports.
+
+    Attributes:
+        threshold: Minimum cosine similarity between prompts to reuse a report.
+        ttl_seconds: Maximum age of a reusable report.
+        max_entries: Reports kept in memory per ticker (most recent).
+    """
+
+    def __init__(
+        self,
+        store: ReportStore,
+        threshold: float = 0.8,
+        ttl_seconds: float = 6 * 3600,
+        max_entries: int = 50,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.store = store
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._indexes: dict[str, _TickerIndex] = {}
+
+    @classmethod
+    def from_settings(cls, store: Optional[ReportStore] = None) -> "SemanticCache":
+        """Build the cache over the application report store from settings."""
+        s = get_settings()
+        return cls(
+            store or get_report_store(),
+            threshold=s.SEMANTIC_CACHE_THRESHOLD,
+            ttl_seconds=s.SEMANTIC_CACHE_TTL_SECONDS,
+        )
+
+    def _index_for(self, ticker: str) -> _TickerIndex:
+        # Hydrate a ticker's index from the store on first use (survives restarts)
+        index = self._indexes.get(ticker)
+        if index is None:
+            index = _TickerIndex()
+            since = self._clock() - self.ttl_seconds
+            for report in reversed(self.store.recent_for_ticker(ticker, since=since, limit=self.max_entries)):
+                index.add(report, embed_prompt(report.prompt), self.max_entries)
+            self._indexes[ticker] = index
+        return index
+
+    def lookup(
+        self, ticker: str, prompt: str, accept: Optional[Callable[[StoredReport], bool]] = None
+    ) -> Optional[CacheHit]:
+        """
+        Best fresh report for `ticker` whose prompt is similar to `prompt`, if any.
+
+        Args:
+            ticker: Normalized ticker (the index partition).
+            prompt: Sanitized user prompt.
+            accept: Optional extra filter on candidate reports (e.g., same run options).
+        """
+        query = embed_prompt(prompt)
+        with self._lock:
+            index = self._index_for(ticker)
+            index.evict_older_than(self._clock() - self.ttl_seconds)
+            if not index.reports:
+                return None
+            scores = index.vectors @ query
+            # Highest similarity first; ties go to the newest report (rows are in insertion order)
+            for i in np.lexsort((-np.arange(len(scores)), -scores)):
+                if scores[i] < self.threshold:
+                    break
+                report = index.reports[i]
+                if accept is None or accept(report):
+                    return CacheHit(report=report, similarity=float(scores[i]))
+        return None
+
+    def add(self, report: StoredReport) -> None:
+        """Index a newly stored report."""
+        vector = embed_prompt(report.prompt)
+        with self._lock:
+            self._index_for(report.ticker)  # hydrate first so the new row isn't loaded twice
+            index = self._indexes[report.ticker]
+            if all(r.report_id != report.report_id for r in index.reports):
+                index.add(report, vector, self.max_entries)
+
+    def clear(self) -> None:
+        """Drop all in-memory indexes (they are rebuilt from the store on demand)."""
+        with self._lock:
+            self._indexes.clear()
+
+
+@lru_cache
+def get_semantic_cache() -> SemanticCache:
+    """Process-wide semantic cache over the application report store."""
+    return SemanticCache.from_settings()
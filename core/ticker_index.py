@@ -0,0 +1,331 @@
+# core/ticker_index.py
+"""
+Ticker Reference Index
+
+Purpose:
+- Keep a compact, local symbol reference (exchange suffix, company name, sector,
+  industry and ADR/local pair) so unknown or mistyped tickers are rejected before
+  any LLM cost is incurred.
+- Power fast prefix + fuzzy lookup for autocomplete (`/v1/tickers/search`).
+- Provide the ADR/local mapping as ready-made context for the agents.
+- The bundled file is a curated subset, not a full listing: on an index miss the symbol is
+  checked against Yahoo Finance (`provider_listing`) before it is rejected, so valid
+  names such as F, UBER or BRK.B are not turned away. Listings are cached for the
+  process lifetime; misses only for TICKER_VERIFY_NEGATIVE_TTL_SECONDS, so a fresh IPO
+  or a symbol the provider briefly returned empty for is not rejected until restart.
+  The lookup is blocking network I/O: async callers run it in a thread
+  (`core.guardrails.resolve_known_ticker`).
+
+Data:
+- A bundled CSV (`core/data/tickers.csv`) is used by default. Point `TICKER_INDEX_PATH`
+  at a refreshed file with the same columns to override it:
+  symbol,name,exchange,country,sector,industry,adr_pair
+
+Usage:
+    from core.ticker_index import get_ticker_index
+    index = get_ticker_index()
+    index.search("petro")        # prefix/fuzzy autocomplete
+    index.require("BBAS3.SA")    # raises ValueError with suggestions if unknown
+    provider_listing("BRK.B")    # "BRK-B" (Yahoo symbol) or None if no such listing
+"""
+
+import bisect
+import csv
+import difflib
+import re
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+import yfinance as yf
+from pydantic import BaseModel
+from yfinance.exceptions import YFException, YFRateLimitError
+
+from core.config import get_settings
+
+BUNDLED_INDEX_PATH = Path(__file__).parent / "data" / "tickers.csv"
+
+_WORD_RE = re.compile(r"[A-Z0-9]+")
+# US share classes are written "BRK.B" by users and "BRK-B" by Yahoo Finance
+_SHARE_CLASS_RE = re.compile(r"^([A-Z0-9]{1,6})[.-]([A-Z])$")
+
+
+class TickerRecord(BaseModel):
+    """One listing in the reference index."""
+
+    symbol: str
+    name: str
+    exchange: str
+    country: str
+    sector: str = ""
+    industry: str = ""
+    adr_pair: Optional[str] = None
+
+
+class TickerIndex:
+    """
+    In-memory symbol index with sorted keys for prefix search.
+
+    Keys:
+        - Full symbols ("BBAS3.SA") and their base symbol ("BBAS3").
+        - Each word of the company name ("BANCO", "BRASIL").
+    """
+
+    def __init__(self, records: Iterable[TickerRecord]):
+        self._records: dict[str, TickerRecord] = {}
+        for rec in records:
+            self._records[rec.symbol.upper()] = rec
+
+        symbol_keys: list[tuple[str, str]] = []
+        name_keys: list[tuple[str, str]] = []
+        for sym, rec in self._records.items():
+            symbol_keys.append((sym, sym))
+            base = sym.split(".", 1)[0]
+            if base != sym:
+                symbol_keys.append((base, sym))
+            for word in _WORD_RE.findall(rec.name.upper()):
+                name_keys.append((word, sym))
+        self._symbol_keys = sorted(symbol_keys)
+        self._name_keys = sorted(name_keys)
+        self._names = {rec.name.upper(): sym for sym, rec in self._records.items()}
+
+    @classmethod
+    def load(cls, path: Optional[str | Path] = None) -> "TickerIndex":
+        """
+        Load an index from a CSV file.
+
+        Args:
+            path: CSV path; defaults to the bundled reference file.
+        """
+        path = Path(path) if path else BUNDLED_INDEX_PATH
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = csv.DictReader(f)
+            return cls(
+                TickerRecord(
+                    symbol=row["symbol"].strip().upper(),
+                    name=row["name"].strip(),
+                    exchange=row.get("exchange", "").strip(),
+                    country=row.get("country", "").strip(),
+                    sector=row.get("sector", "").strip(),
+                    industry=row.get("industry", "").strip(),
+                    adr_pair=(row.get("adr_pair") or "").strip().upper() or None,
+                )
+                for row in rows
+                if row.get("symbol")
+            )
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol.strip().upper() in self._records
+
+    def records(self) -> list[TickerRecord]:
+        """All records in the index."""
+        return list(self._records.values())
+
+    def get(self, symbol: str) -> Optional[TickerRecord]:
+        """Exact lookup by symbol (case-insensitive)."""
+        return self._records.get(symbol.strip().upper())
+
+    @staticmethod
+    def _prefix_scan(keys: list[tuple[str, str]], prefix: str) -> Iterable[str]:
+        i = bisect.bisect_left(keys, (prefix, ""))
+        while i < len(keys) and keys[i][0].startswith(prefix):
+            yield keys[i][1]
+            i += 1
+
+    def search(self, query: str, limit: int = 10) -> list[TickerRecord]:
+        """
+        Autocomplete lookup.
+
+        Ranking:
+            1) Exact symbol match.
+            2) Symbol / base-symbol prefix matches.
+            3) Company-name word prefix matches.
+            4) Fuzzy matches on symbols and names (typos such as "APPL").
+        """
+        q = query.strip().upper()
+        if not q or limit <= 0:
+            return []
+
+        found: list[str] = []
+
+        def add(symbols: Iterable[str]) -> bool:
+            for sym in symbols:
+                if sym not in found:
+                    found.append(sym)
+                    if len(found) >= limit:
+                        return True
+            return False
+
+        if q in self._records and add([q]):
+            return self._resolve(found)
+        if add(self._prefix_scan(self._symbol_keys, q)):
+            return self._resolve(found)
+        words = _WORD_RE.findall(q)
+        if words:
+            # Every query word must prefix-match some word of the name
+            candidates = set(self._prefix_scan(self._name_keys, words[0]))
+            for word in words[1:]:
+                candidates &= set(self._prefix_scan(self._name_keys, word))
+            if add(sorted(candidates)):
+                return self._resolve(found)
+
+        fuzzy_symbols = difflib.get_close_matches(q, self._records.keys(), n=limit, cutoff=0.6)
+        fuzzy_names = difflib.get_close_matches(q, self._names.keys(), n=limit, cutoff=0.6)
+        add(fuzzy_symbols + [self._names[n] for n in fuzzy_names])
+        return self._resolve(found)
+
+    def _resolve(self, symbols: list[str]) -> list[TickerRecord]:
+        return [self._records[s] for s in symbols]
+
+    def require(self, symbol: str) -> TickerRecord:
+        """
+        Return the record for `symbol` or reject it.
+
+        Raises:
+            ValueError: If the symbol is unknown; the message lists close matches.
+        """
+        rec = self.get(symbol)
+        if rec is not None:
+            return rec
+        suggestions = [r.symbol for r in self.search(symbol, limit=3)]
+        hint = f" Did you mean: {', '.join(suggestions)}?" if suggestions else ""
+        raise ValueError(f"Unknown ticker '{symbol.strip().upper()}'.{hint}")
+
+    def context_for(self, symbol: str) -> str:
+        """
+        One-paragraph listing context for the agents (name, venue, ADR/local pair).
+
+        Returns an empty string for unknown symbols.
+        """
+        rec = self.get(symbol)
+        if rec is None:
+            return ""
+        text = f"{rec.name} ({rec.symbol}) listed on {rec.exchange}, {rec.country}."
+        if rec.sector:
+            text += f" Sector: {rec.sector} / {rec.industry}."
+        if rec.adr_pair:
+            pair = self.get(rec.adr_pair)
+            pair_desc = f"{rec.adr_pair} on {pair.exchange}" if pair else rec.adr_pair
+            text += f" ADR/local pair: {pair_desc}."
+        else:
+            text += " ADR/local pair: none known."
+        return text
+
+
+@lru_cache
+def get_ticker_index() -> TickerIndex:
+    """
+    Retrieve the cached ticker index (bundled file unless TICKER_INDEX_PATH is set).
+
+    Returns:
+        TickerIndex: A process-wide singleton.
+    """
+    return TickerIndex.load(get_settings().TICKER_INDEX_PATH or None)
+
+
+def yahoo_symbol_candidates(symbol: str) -> list[str]:
+    """Yahoo Finance spellings to try for a symbol ("BRK.B" → ["BRK.B", "BRK-B"])."""
+    sym = symbol.strip().upper()
+    candidates = [sym]
+    m = _SHARE_CLASS_RE.match(sym)
+    if m and "." in sym:
+        candidates.append(f"{m[1]}-{m[2]}")
+    return candidates
+
+
+def yahoo_listing(symbol: str, timeout: float = 10.0) -> Optional[str]:
+    """
+    Ask Yahoo Finance whether `symbol` is listed (uncached, blocking).
+
+    Returns:
+        The Yahoo symbol that has recent prices (e.g., "BRK-B" for "BRK.B"), or None when
+        the provider has no such listing.
+
+    Raises:
+        Exception: Network/HTTP errors and rate limits propagate.
+    """
+    for candidate in yahoo_symbol_candidates(symbol):
+        try:
+            history = yf.Ticker(candidate).history(period="5d", raise_errors=True, timeout=timeout)
+        except YFRateLimitError:
+            raise
+        except YFException:
+            continue  # unknown / delisted symbol
+        if not history.empty:
+            return candidate
+    return None
+
+
+class ListingCache:
+    """
+    Memo of provider listing lookups.
+
+    Found listings are kept (LRU-bounded by `max_entries`); misses expire after
+    `negative_ttl` seconds. Lookup errors propagate and are not cached. Thread-safe, since
+    lookups run on worker threads.
+    """
+
+    def __init__(
+        self,
+        lookup: Callable[[str], Optional[str]],
+        negative_ttl: float,
+        max_entries: int = 2048,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._lookup = lookup
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple[Optional[str], float]]" = OrderedDict()
+
+    def get(self, symbol: str) -> Optional[str]:
+        """Cached listing for `symbol`, looking it up when unknown or when a miss expired."""
+        with self._lock:
+            entry = self._entries.get(symbol)
+            if entry is not None:
+                listed, checked_at = entry
+                if listed is not None or self._clock() - checked_at < self.negative_ttl:
+                    self._entries.move_to_end(symbol)
+                    return listed
+        listed = self._lookup(symbol)
+        with self._lock:
+            self._entries[symbol] = (listed, self._clock())
+            self._entries.move_to_end(symbol)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return listed
+
+
+@lru_cache
+def get_listing_cache() -> ListingCache:
+    """
+    Retrieve the process-wide provider listing cache configured from settings.
+
+    Returns:
+        ListingCache: A singleton wrapping `yahoo_listing`.
+    """
+    s = get_settings()
+    return ListingCache(
+        lambda symbol: yahoo_listing(symbol, timeout=s.TICKER_VERIFY_TIMEOUT_SECONDS),
+        negative_ttl=s.TICKER_VERIFY_NEGATIVE_TTL_SECONDS,
+    )
+
+
+def provider_listing(symbol: str) -> Optional[str]:
+    """
+    Whether Yahoo Finance lists `symbol` (cached; see `ListingCache`). Blocking.
+
+    Returns:
+        The Yahoo symbol (e.g., "BRK-B" for "BRK.B"), or None when not listed.
+
+    Raises:
+        Exception: Network/HTTP errors and rate limits propagate.
+    """
+    return get_listing_cache().get(symbol)
@@ -0,0 +1,58 @@
+"""
+Compare coordinator prompt size and team wall time with member compaction on vs off.
+
+Every model-backed `/v1/analyze` run stores its counters in the report's meta
+("metrics"), tagged with `member_compaction_enabled`. Run a batch of analyses with
+MEMBER_COMPACTION_ENABLED=true and another with it set to false (same tickers and
+prompts), then, from the project root:
+
+    python -m scripts.compare_member_compaction --limit 500
+"""
+
+import argparse
+import statistics
+from collections import defaultdict
+
+from core.report_store import get_report_store
+
+
+def summarize(reports):
+    """(depth, compaction on?) → run count and median coordinator tokens / team seconds."""
+    groups = defaultdict(list)
+    for report in reports:
+        metrics = report.meta.get("metrics") or {}
+        if "member_compaction_enabled" in metrics and "team_seconds" in metrics:
+            key = (report.meta.get("depth", "deep"), bool(metrics["member_compaction_enabled"]))
+            groups[key].append(metrics)
+
+    rows = {}
+    for key, runs in sorted(groups.items()):
+        tokens = [m["coordinator_input_tokens"] for m in runs if "coordinator_input_tokens" in m]
+        rows[key] = {
+            "runs": len(runs),
+            "coordinator_input_tokens": statistics.median(tokens) if tokens else None,
+            "team_seconds": statistics.median(m["team_seconds"] for m in runs),
+        }
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--limit", type=int, default=500, help="Most recent reports to scan.")
+    args = parser.parse_args()
+
+    rows = summarize(get_report_store().recent(args.limit))
+    if not rows:
+        print("No tagged runs found; run some analyses first.")
+        return
+    print(f"{'depth':<10}{'compaction':<12}{'runs':>6}{'coord. tokens (median)':>26}{'team s (median)':>18}")
+    for (depth, enabled), row in rows.items():
+        tokens = row["coordinator_input_tokens"]
+        print(
+            f"{depth:<10}{'on' if enabled else 'off':<12}{row['runs']:>6}"
+            f"{tokens if tokens is not None else 'n/a':>26}{row['team_seconds']:>18.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
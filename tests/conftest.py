@@ -0,0 +1,57 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from apps.api.main import app
+from apps.api.routers import analyze, reports, sessions
+from core.admission import get_admission_controller
+from core.config import get_settings
+from core.report_store import ReportStore
+
+# Keys recognized by admission control in API tests; the first is the client's default.
+API_KEYS = ("test-key", "client-a", "client-b", "client-c")
+
+
+@pytest.fixture(autouse=True)
+def fresh_admission_controller():
+    """Every test starts with empty rate buckets, queue and service-time averages."""
+    get_admission_controller.cache_clear()
+    yield
+    get_admission_controller.cache_clear()
+
+
+@pytest.fixture
+def report_store(monkeypatch, tmp_path):
+    """A throwaway ReportStore used by every router (the tracked agno_memory.db stays untouched)."""
+    store = ReportStore(str(tmp_path / "reports.db"))
+    for router in (analyze, sessions, reports):
+        monkeypatch.setattr(router, "get_report_store", lambda: store)
+    return store
+
+
+@pytest.fixture
+def team_calls(monkeypatch):
+    """Replace the agent team with a canned report; returns the messages it was sent."""
+    calls = []
+
+    async def fake_team(message, session_id=None):
+        calls.append(message)
+        return "## Report\nBody"
+
+    monkeypatch.setattr(analyze, "_call_team", fake_team)
+    return calls
+
+
+@pytest.fixture
+def api_client(monkeypatch, report_store, team_calls):
+    """
+    TestClient authenticated with a configured API key, backed by `report_store` and the
+    fake team. The semantic cache is off and the burst is generous, so tests only hit
+    admission limits they set up themselves.
+    """
+    settings = get_settings()
+    monkeypatch.setattr(settings, "API_KEYS", ",".join(API_KEYS))
+    monkeypatch.setattr(settings, "RATE_LIMIT_BURST", 100)
+    monkeypatch.setattr(settings, "SEMANTIC_CACHE_ENABLED", False)
+    client = TestClient(app, headers={"X-API-Key": API_KEYS[0]})
+    client.calls, client.store = team_calls, report_store
+    return client
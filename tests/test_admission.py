@@ -0,0 +1,151 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from apps.api.middleware import AdmissionMiddleware, _client_key, _priority
+from core.admission import AdmissionController, AdmissionRejected, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _controller(**overrides):
+    params = dict(max_concurrent=1, max_queue=4, queue_timeout=5, rate_per_minute=60, burst=100)
+    params.update(overrides)
+    return AdmissionController(**params)
+
+
+def test_token_bucket_refills():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=1.0, capacity=2, clock=clock)
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == pytest.approx(1.0)
+    clock.now += 1.0
+    assert bucket.try_acquire() == 0
+
+
+def test_rate_limit_is_per_key():
+    ctrl = _controller(rate_per_minute=6, burst=1)
+    ctrl.check_rate("a")
+    ctrl.check_rate("b")
+    with pytest.raises(AdmissionRejected) as exc:
+        ctrl.check_rate("a")
+    assert exc.value.status_code == 429
+    assert exc.value.retry_after >= 1
+
+
+def test_interactive_jumps_ahead_of_batch():
+    async def scenario():
+        ctrl = _controller()
+        order = []
+        await ctrl.acquire()  # occupy the only slot
+
+        async def job(name, priority):
+            await ctrl.acquire(priority)
+            order.append(name)
+            ctrl.release()
+
+        tasks = [asyncio.create_task(job("scheduled", "scheduled"))]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(job("batch", "batch")))
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(job("interactive", "interactive")))
+        await asyncio.sleep(0)
+        assert ctrl.queue_depth == 3
+
+        ctrl.release()
+        await asyncio.gather(*tasks)
+        assert ctrl.in_flight == 0
+        return order
+
+    assert asyncio.run(scenario()) == ["interactive", "batch", "scheduled"]
+
+
+def test_full_queue_rejects_fast():
+    async def scenario():
+        ctrl = _controller(max_queue=1)
+        await ctrl.acquire()
+        waiter = asyncio.create_task(ctrl.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as exc:
+            await ctrl.acquire()
+        assert exc.value.status_code == 503
+        ctrl.release()
+        await waiter
+        ctrl.release()
+        assert ctrl.in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_queue_timeout_rejects():
+    async def scenario():
+        ctrl = _controller(queue_timeout=0.01)
+        await ctrl.acquire()
+        with pytest.raises(AdmissionRejected):
+            await ctrl.acquire()
+        assert ctrl.queue_depth == 0
+
+    asyncio.run(scenario())
+
+
+def test_middleware_returns_retry_after():
+    app = FastAPI()
+    app.add_middleware(
+        AdmissionMiddleware,
+        controller=_controller(rate_per_minute=1, burst=1),
+        paths=("/v1/analyze",),
+        api_keys=("k1", "k2"),
+    )
+
+    @app.post("/v1/analyze")
+    def analyze():
+        return {"ok": True}
+
+    @app.get("/v1/health")
+    def health():
+        return {"ok": True}
+
+    c = TestClient(app)
+    assert c.post("/v1/analyze", headers={"X-API-Key": "k1"}).status_code == 200
+    r = c.post("/v1/analyze", headers={"X-API-Key": "k1"})
+    assert r.status_code == 429
+    assert int(r.headers["Retry-After"]) >= 1
+    # Other keys and non-gated paths are unaffected
+    assert c.post("/v1/analyze", headers={"X-API-Key": "k2"}).status_code == 200
+    assert c.get("/v1/health").status_code == 200
+
+    # Unrecognized keys share the caller's address bucket: rotating keys gains nothing
+    assert c.post("/v1/analyze", headers={"X-API-Key": "made-up-1"}).status_code == 200
+    assert c.post("/v1/analyze", headers={"X-API-Key": "made-up-2"}).status_code == 429
+
+
+def test_unauthenticated_callers_capped_at_batch():
+    scope = {"client": ("10.0.0.1", 1234)}
+    assert _client_key(scope, {b"x-api-key": b"guess"}, ("real",)) == ("ip:10.0.0.1", False)
+    assert _client_key(scope, {b"x-api-key": b"real"}, ("real",)) == ("key:real", True)
+    assert _priority({}, authenticated=False) == "batch"
+    assert _priority({b"x-request-priority": b"interactive"}, authenticated=False) == "batch"
+    assert _priority({b"x-request-priority": b"scheduled"}, authenticated=False) == "scheduled"
+    assert _priority({}, authenticated=True) == "interactive"
+
+
+def test_overload_rejection_refunds_rate_token():
+    async def scenario():
+        ctrl = _controller(max_queue=0, rate_per_minute=0.001, burst=1)
+        await ctrl.acquire()  # saturate the only slot
+        with pytest.raises(AdmissionRejected) as exc:
+            async with ctrl.admit("client"):
+                pass
+        assert exc.value.status_code == 503
+        ctrl.check_rate("client")  # token was refunded, so no 429
+
+    asyncio.run(scenario())
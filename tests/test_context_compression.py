@@ -0,0 +1,134 @@
+import asyncio
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from apps.api.routers import analyze
+from core.config import get_settings
+from core.context_compression import compress_member_output, compress_member_output_hook
+from core.guardrails import estimate_tokens
+from core.run_stats import start_run
+
+MEMBER_OUTPUT = """
+THINK: I should look up recent news for Banco do Brasil first.
+Let me search for the latest quarterly results.
+ACT: duckduckgo_news("Banco do Brasil results")
+OBSERVE: several outlets report the same story.
+
+## Key Findings
+- 2025-08-14: Banco do Brasil reported Q2 2025 net income of R$ 3.8bn, down 60% y/y.
+- The bank cut its 2025 earnings guidance, citing agribusiness defaults.
+- Management remains committed to digital transformation and customer experience initiatives.
+
+| Metric | Value |
+|---|---|
+| ROE | 8.4% |
+| NPL 90d | 4.2% |
+
+## Data Gaps
+- Analyst consensus revisions not available.
+
+## Sources
+- [Reuters: BB cuts guidance](https://www.reuters.com/markets/bb-guidance)
+- https://www.investing.com/news/bb-q2
+""" + "\n".join(f"REFLECT: double-checking step {i} of the reasoning chain." for i in range(40))
+
+
+def test_scratch_removed_and_findings_structured():
+    out = compress_member_output(MEMBER_OUTPUT, budget_tokens=1000, member_name="Market Researcher")
+    assert out.startswith("### Findings from Market Researcher")
+    assert "THINK" not in out and "REFLECT" not in out and "ACT:" not in out
+    assert "- 2025-08-14: Banco do Brasil reported Q2 2025 net income" in out
+    assert "| ROE | 8.4% |" in out
+    assert "**Data gaps**\n- Analyst consensus revisions not available." in out
+    assert "[Reuters: BB cuts guidance](https://www.reuters.com/markets/bb-guidance)" in out
+    assert estimate_tokens(out) < estimate_tokens(MEMBER_OUTPUT) / 2
+
+
+def test_budget_is_respected_by_priority():
+    out = compress_member_output(MEMBER_OUTPUT, budget_tokens=80)
+    assert estimate_tokens(out) <= 80 + 20  # budget + omission note
+    assert "| ROE | 8.4% |" in out  # metrics go first
+    assert "omitted to fit the context budget" in out
+
+
+def test_hook_rewrites_content_and_records_sizes():
+    stats = start_run()
+    run_output = SimpleNamespace(content=MEMBER_OUTPUT)
+    compress_member_output_hook(run_output, agent=SimpleNamespace(name="Market Researcher"))
+    assert run_output.content.startswith("### Findings")
+    assert stats.get("member_tokens_compacted") < stats.get("member_tokens_raw")
+
+    short = SimpleNamespace(content="Price is 10.")
+    compress_member_output_hook(short)
+    assert short.content == "Price is 10."
+
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+# Recorded member outputs → (raw tokens, compacted tokens at the default 1200-token budget).
+# Re-run this test after changing the compressor and update the numbers deliberately.
+@pytest.mark.parametrize(
+    "member,raw_tokens,compacted_tokens",
+    [("market_researcher", 686, 481), ("equity_analyst", 493, 349)],
+)
+def test_recorded_member_outputs_token_savings(member, raw_tokens, compacted_tokens):
+    text = (FIXTURES / f"member_{member}.md").read_text(encoding="utf-8")
+    out = compress_member_output(text, budget_tokens=1200, member_name=member)
+    assert (estimate_tokens(text), estimate_tokens(out)) == (raw_tokens, compacted_tokens)
+    assert "Thought:" not in out and "OBSERVE:" not in out and "Action Input:" not in out
+
+
+def test_prose_resembling_scratch_is_kept():
+    researcher = compress_member_output(
+        (FIXTURES / "member_market_researcher.md").read_text(encoding="utf-8"), budget_tokens=1200
+    )
+    assert "Planned capex for the digital channels program" in researcher
+    assert "I will note that the government" in researcher
+    analyst = compress_member_output(
+        (FIXTURES / "member_equity_analyst.md").read_text(encoding="utf-8"), budget_tokens=1200
+    )
+    assert "Action plan for investors" in analyst
+
+
+def _run_output(text="## Report\nBody", input_tokens=900):
+    return SimpleNamespace(content=text, metrics=SimpleNamespace(input_tokens=input_tokens))
+
+
+class KeywordTeam:
+    async def arun(self, input, session_id=None):
+        return _run_output()
+
+
+class PositionalTeam:
+    async def arun(self, text, /):
+        return _run_output()
+
+
+class PrintingTeam:
+    """Only the stdout-printing entry point; metrics come from the stored run."""
+
+    async def aprint_response(self, message, stream=False):
+        print("## Report\nBody")
+
+    def get_last_run_output(self, session_id=None):
+        return _run_output()
+
+
+@pytest.mark.parametrize("fake_team", [KeywordTeam(), PositionalTeam(), PrintingTeam()])
+def test_coordinator_tokens_recorded_on_every_call_path(monkeypatch, fake_team):
+    monkeypatch.setattr(analyze, "team", fake_team)
+    stats = start_run()
+    assert "Body" in asyncio.run(analyze._call_team("Target: AAPL", session_id="s1"))
+    assert stats.get("coordinator_input_tokens") == 900
+
+
+@pytest.mark.parametrize("enabled", [True, False])
+def test_team_runs_tagged_with_compaction_setting(api_client, monkeypatch, enabled):
+    monkeypatch.setattr(get_settings(), "MEMBER_COMPACTION_ENABLED", enabled)
+    report_id = api_client.post("/v1/analyze", json={"ticker": "AAPL"}).json()["report_id"]
+    metrics = api_client.store.get(report_id).meta["metrics"]
+    assert metrics["member_compaction_enabled"] == int(enabled)
+    assert metrics["team_seconds"] >= 0
@@ -0,0 +1,50 @@
+import json
+
+from core.run_stats import start_run
+from tools.dedup import cluster_near_duplicates, dedupe_json, dedupe_results
+
+STORY = (
+    "Banco do Brasil reported third-quarter net income of 9.5 billion reais, beating analyst "
+    "estimates as loan loss provisions fell and fee income rose, the bank said on Thursday."
+)
+
+
+def _news():
+    return [
+        {"title": "Banco do Brasil beats estimates", "body": STORY,
+         "url": "https://www.investing.com/news/bb-q3", "source": "Investing.com"},
+        {"title": "Banco do Brasil beats estimates", "body": STORY + " Shares rose 2%.",
+         "url": "https://www.reuters.com/markets/bb-q3", "source": "Reuters"},
+        {"title": "Petrobras raises dividend", "body": "Petrobras board approved a higher "
+         "interim dividend payout after record oil output in the quarter.",
+         "url": "https://www.ft.com/content/petro", "source": "FT"},
+        {"title": "BB tops forecasts", "body": STORY,
+         "url": "https://someblog.example/bb", "source": "Some Blog"},
+    ]
+
+
+def test_clusters_near_duplicates_only():
+    texts = [n["title"] + " " + n["body"] for n in _news()]
+    clusters = cluster_near_duplicates(texts, threshold=0.5)
+    assert sorted(map(sorted, clusters)) == [[0, 1, 3], [2]]
+
+
+def test_keeps_most_authoritative_source():
+    kept = dedupe_results(_news())
+    assert len(kept) == 2
+    # reuters.com ranks above investing.com in ALLOWED_WEB_DOMAINS
+    assert kept[0]["source"] == "Reuters"
+    assert {c["source"] for c in kept[0]["corroborated_by"]} == {"Investing.com", "Some Blog"}
+    assert "corroborated_by" not in kept[1]
+
+
+def test_json_passthrough_and_savings():
+    assert dedupe_json("DATA UNAVAILABLE: x") == "DATA UNAVAILABLE: x"
+    single = json.dumps(_news()[:1])
+    assert dedupe_json(single) == single
+
+    stats = start_run()
+    out = json.loads(dedupe_json(json.dumps(_news(), indent=2)))
+    assert len(out) == 2
+    assert stats.get("dedup_items_collapsed") == 2
+    assert stats.get("dedup_tokens_saved") > 0
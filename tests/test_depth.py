@@ -0,0 +1,162 @@
+import asyncio
+import contextlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from apps.api.routers import analyze
+from core.admission import AdmissionController
+from core.config import get_settings
+from core.depth import choose_depth
+from tools.fundamentals import RAW_COLUMNS
+from tools.snapshot import build_snapshot
+
+
+@pytest.mark.parametrize(
+    "requested,queue,latency,expected",
+    [
+        ("deep", 0, 10, "deep"),
+        ("deep", 4, 10, "standard"),
+        ("deep", 8, 10, "snapshot"),
+        ("standard", 4, 10, "standard"),
+        ("snapshot", 0, 10, "snapshot"),
+        ("deep", 0, 200, "standard"),
+        ("standard", 0, 200, "snapshot"),
+        ("deep", 4, 200, "standard"),
+    ],
+)
+def test_choose_depth_degrades_never_upgrades(requested, queue, latency, expected):
+    decision = choose_depth(requested, queue_depth=queue, avg_service_seconds=latency)
+    assert decision.depth == expected
+    assert decision.degraded == (expected != requested)
+    assert not decision.serve_stale
+
+
+def test_choose_depth_serves_stale_past_last_threshold(monkeypatch):
+    assert choose_depth("deep", 12, 0).serve_stale
+    monkeypatch.setattr(get_settings(), "DEPTH_DEGRADE_ENABLED", False)
+    assert choose_depth("deep", 50, 999).depth == "deep"
+
+
+def test_build_snapshot_without_model():
+    idx = pd.bdate_range("2024-01-01", periods=30)
+
+    def price_loader(symbols):
+        return pd.DataFrame({s: np.linspace(10, 12, len(idx)) for s in symbols}, index=idx)
+
+    def statement_loader(symbol):
+        row = dict.fromkeys(RAW_COLUMNS, np.nan)
+        row.update(shares=10.0, currency="BRL", revenue=100.0, net_income=10.0)
+        return row
+
+    md = build_snapshot("BBAS3.SA", ["ITUB4.SA"], statement_loader, price_loader)
+    assert md.startswith("# BBAS3.SA — Snapshot")
+    assert "Banco do Brasil" in md and "## Key metrics" in md and "## Peers" in md
+
+    def broken(symbols):
+        raise ConnectionError("offline")
+
+    assert "DATA UNAVAILABLE" in build_snapshot("BBAS3.SA", [], statement_loader, broken)
+
+
+class LoadedController(AdmissionController):
+    """Controller reporting a fixed queue depth; slots are granted immediately."""
+
+    def __init__(self, queue_depth):
+        super().__init__(max_concurrent=100, max_queue=100, queue_timeout=1, rate_per_minute=60, burst=100)
+        self._fake_depth = queue_depth
+
+    @property
+    def queue_depth(self):
+        return self._fake_depth
+
+    def slot(self, *args, **kwargs):
+        return contextlib.nullcontext()
+
+
+@pytest.fixture
+def client(api_client, monkeypatch):
+    monkeypatch.setattr(analyze, "build_snapshot", lambda ticker: f"# {ticker} — Snapshot")
+    return api_client
+
+
+def test_snapshot_depth_makes_no_model_call(client):
+    r = client.post("/v1/analyze", json={"ticker": "AAPL", "depth": "snapshot"})
+    assert r.status_code == 200
+    assert r.json()["depth"] == "snapshot"
+    assert r.json()["content_markdown"].startswith("# AAPL — Snapshot")
+    assert client.calls == []
+
+
+def test_load_downgrades_then_serves_stale(client, monkeypatch):
+    monkeypatch.setattr(analyze, "get_admission_controller", lambda: LoadedController(4))
+    r = client.post("/v1/analyze", json={"ticker": "AAPL"}).json()
+    assert r["depth"] == "standard" and "requested deep" in r["content_markdown"]
+    assert "Depth: standard" in client.calls[-1]
+
+    monkeypatch.setattr(analyze, "get_admission_controller", lambda: LoadedController(12))
+    stale = client.post("/v1/analyze", json={"ticker": "AAPL"}).json()
+    assert stale["stale"] is True and stale["session_id"] != r["session_id"]
+    assert "Stale report" in stale["content_markdown"]
+    assert stale["content_markdown"].endswith(r["content_markdown"].split("\n\n", 1)[1])
+    assert len(client.calls) == 1
+
+
+def test_no_model_paths_skip_the_concurrency_gate(client, monkeypatch):
+    saturated = AdmissionController(max_concurrent=1, max_queue=0, queue_timeout=1, rate_per_minute=60, burst=100)
+    saturated._in_flight = 1  # every slot taken by a long deep run
+    monkeypatch.setattr(analyze, "get_admission_controller", lambda: saturated)
+
+    deep = client.post("/v1/analyze", json={"ticker": "AAPL"})
+    assert deep.status_code == 503 and "Retry-After" in deep.headers
+    snapshot = client.post("/v1/analyze", json={"ticker": "AAPL", "depth": "snapshot"})
+    assert snapshot.status_code == 200
+    assert client.calls == []
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+async def _run(ctrl, clock, tier, seconds):
+    async with ctrl.slot(tier=tier):
+        clock.now += seconds
+
+
+def test_service_time_tracked_per_tier():
+    clock = Clock()
+    ctrl = AdmissionController(
+        max_concurrent=2, max_queue=2, queue_timeout=1, rate_per_minute=60, burst=10,
+        clock=clock, tier_half_life=0,
+    )
+    asyncio.run(_run(ctrl, clock, "deep", 100.0))
+    asyncio.run(_run(ctrl, clock, "standard", 2.0))
+    assert ctrl.avg_service_for("deep") == 100.0
+    assert ctrl.avg_service_for("standard") == 2.0
+    assert ctrl.avg_service_for("snapshot") == 0.0
+
+
+def test_slow_depth_recovers_once_load_drops():
+    clock = Clock()
+    ctrl = AdmissionController(
+        max_concurrent=2, max_queue=2, queue_timeout=1, rate_per_minute=60, burst=100,
+        clock=clock, tier_half_life=300,
+    )
+    asyncio.run(_run(ctrl, clock, "deep", 200.0))  # one slow deep run
+    assert choose_depth("deep", 0, ctrl.avg_service_for("deep")).depth == "standard"
+
+    for _ in range(50):  # the requests it degraded run fast, but at standard depth
+        asyncio.run(_run(ctrl, clock, "standard", 1.0))
+    assert choose_depth("deep", 0, ctrl.avg_service_for("deep")).depth == "standard"
+
+    clock.now += 100  # no deep sample for a while: the old one no longer counts in full
+    decision = choose_depth("deep", 0, ctrl.avg_service_for("deep"))
+    assert decision.depth == "deep" and not decision.degraded
+
+    asyncio.run(_run(ctrl, clock, "deep", 20.0))  # a fresh, fast deep sample takes over
+    assert ctrl.avg_service_for("deep") < 150
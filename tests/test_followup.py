@@ -0,0 +1,124 @@
+import asyncio
+
+from apps.api.routers import analyze, sessions
+from core.config import get_settings
+from core.context_compression import compress_member_output_hook
+from core.depth import DepthDecision
+from core.report_store import StoredReport
+from core.run_stats import attach, start_run
+from core.semantic_cache import SemanticCache
+
+
+class RunOutput:
+    def __init__(self, content):
+        self.content = content
+
+
+class Member:
+    name = "Market Researcher"
+
+
+def test_member_findings_are_kept_as_research_notes():
+    stats = start_run()
+    compress_member_output_hook(RunOutput("- BRL fell 3% vs USD on 2024-06-28 (https://reuters.com/a)"), Member())
+    assert "BRL fell 3%" in stats.artifacts()["Market Researcher"]
+
+
+def test_followup_context_fits_budget():
+    report = StoredReport(
+        report_id="r", ticker="AAPL", prompt="deep dive", content_markdown="## Report\n" + "x" * 4000,
+        content_hash="h", meta={"research": {"Equity Analyst": "y" * 40000}}, created_at=0,
+    )
+    context = sessions._followup_context(report, budget_tokens=2000)
+    assert len(context) < 2000 * 4 + 500
+    assert "## Report" in context and "notes truncated" in context
+
+
+def test_report_context_goes_to_system_prompt_not_history():
+    from agno.run import RunContext
+    from agno.session import AgentSession
+
+    from agents.followup_analyst import followup_analyst
+
+    context = "### Delivered report\nFX exposure is low ($5bn hedged)."
+    run_context = RunContext(run_id="r", session_id="s", dependencies={"report_context": context})
+    session = AgentSession(session_id="s")
+    system = asyncio.run(followup_analyst.aget_system_message(session, run_context=run_context))
+    assert context in system.content
+    assert followup_analyst.system_message_role == "system"  # history skips this role
+
+
+def test_followup_answers_from_stored_session(api_client, monkeypatch):
+    sent = {}
+
+    async def fake_team(message, session_id=None):
+        attach("Market Researcher", "- BRL fell 3% vs USD on 2024-06-28")
+        return "## Report\nFX exposure is low."
+
+    async def fake_followup(question, context, session_id):
+        sent.update(question=question, context=context, session_id=session_id)
+        return "FX risk is limited."
+
+    monkeypatch.setattr(analyze, "_call_team", fake_team)
+    monkeypatch.setattr(sessions, "_call_followup", fake_followup)
+    c = api_client
+
+    report = c.post("/v1/analyze", json={"ticker": "AAPL"}).json()
+    r = c.post(f"/v1/sessions/{report['session_id']}/followup", json={"question": "What about FX risk?"})
+    assert r.status_code == 200
+    assert r.json() == {
+        "session_id": report["session_id"],
+        "report_id": report["report_id"],
+        "answer_markdown": "FX risk is limited.",
+    }
+    assert sent["question"] == "What about FX risk?"
+    assert "FX exposure is low." in sent["context"] and "BRL fell 3%" in sent["context"]
+
+    assert c.post("/v1/sessions/unknown/followup", json={"question": "x"}).status_code == 404
+    empty = c.post(f"/v1/sessions/{report['session_id']}/followup", json={"question": " "})
+    assert empty.status_code == 422
+
+
+def test_served_reports_cannot_reach_original_followup_history(api_client, report_store, monkeypatch):
+    followups = []
+
+    async def fake_team(message, session_id=None):
+        return "## Report\nFX exposure is low."
+
+    class FakeFollowupAnalyst:
+        async def arun(self, input, session_id, dependencies):
+            # session_id keys the agent's history; only `input` is stored in it
+            followups.append((session_id, input, dependencies["report_context"]))
+            return RunOutput("ok")
+
+    monkeypatch.setattr(analyze, "_call_team", fake_team)
+    monkeypatch.setattr(get_settings(), "SEMANTIC_CACHE_ENABLED", True)
+    monkeypatch.setattr(analyze, "get_semantic_cache", lambda: SemanticCache(report_store))
+    monkeypatch.setattr(sessions, "followup_analyst", FakeFollowupAnalyst())
+
+    def as_client(key, path, payload):
+        r = api_client.post(path, json=payload, headers={"X-API-Key": key})
+        assert r.status_code == 200
+        return r.json()
+
+    prompt = "Full deep-dive with catalysts and risks for Alpha"
+    original = as_client("client-a", "/v1/analyze", {"ticker": "AAPL", "prompt": prompt})
+    as_client("client-a", f"/v1/sessions/{original['session_id']}/followup", {"question": "FX?"})
+
+    hit = as_client("client-b", "/v1/analyze", {"ticker": "AAPL", "prompt": "deep dive incl. risks & catalysts"})
+    assert hit["cached"] is True
+
+    stale_decision = DepthDecision(requested="deep", depth="deep", serve_stale=True, reason="test load")
+    monkeypatch.setattr(analyze, "choose_depth", lambda *args: stale_decision)
+    stale = as_client("client-c", "/v1/analyze", {"ticker": "AAPL"})
+    assert stale["stale"] is True
+
+    for served, key in ((hit, "client-b"), (stale, "client-c")):
+        assert served["session_id"] != original["session_id"]
+        answer = as_client(key, f"/v1/sessions/{served['session_id']}/followup", {"question": "FX?"})
+        assert answer["session_id"] == served["session_id"]
+
+    original_history = f"{original['session_id']}:followup"
+    assert [session for session, _, _ in followups].count(original_history) == 1  # client A only
+    assert all(question == "FX?" for _, question, _ in followups)
+    assert all(prompt not in context for _, _, context in followups[1:])
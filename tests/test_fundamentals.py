@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from tools.fundamentals import RAW_COLUMNS, compute_fundamentals, fundamentals_markdown
+
+
+def _statements():
+    rows = {
+        "AAA": dict(revenue=1000.0, gross_profit=400.0, operating_income=200.0, net_income=100.0,
+                    ebitda=250.0, operating_cash_flow=180.0, capex=-30.0, total_debt=300.0,
+                    cash=50.0, equity=500.0, shares=10.0, currency="USD"),
+        "BBB": dict(revenue=500.0, gross_profit=100.0, operating_income=-20.0, net_income=-40.0,
+                    ebitda=np.nan, operating_cash_flow=10.0, capex=-60.0, total_debt=0.0,
+                    cash=20.0, equity=200.0, shares=5.0, currency="BRL"),
+    }
+    return pd.DataFrame.from_dict(rows, orient="index").reindex(columns=RAW_COLUMNS)
+
+
+def _closes():
+    idx = pd.date_range("2025-01-01", periods=4, freq="D")
+    return pd.DataFrame({"AAA": [90.0, 120.0, 110.0, 100.0], "BBB": [10.0, 8.0, np.nan, 9.0]}, index=idx)
+
+
+def test_vectorized_ratios():
+    m = compute_fundamentals(["aaa", "BBB"], statements=_statements(), closes=_closes())
+    a = m.loc["AAA"]
+    assert a["price"] == 100.0
+    assert a["high_52w"] == 120.0 and a["low_52w"] == 90.0
+    assert a["market_cap"] == 1000.0
+    assert a["enterprise_value"] == 1250.0
+    assert a["pe"] == pytest.approx(10.0)
+    assert a["ev_ebitda"] == pytest.approx(5.0)
+    assert a["gross_margin"] == pytest.approx(0.4)
+    assert a["fcf"] == pytest.approx(150.0)
+    assert a["net_debt_ebitda"] == pytest.approx(1.0)
+    assert a["debt_equity"] == pytest.approx(0.6)
+
+
+def test_loss_makers_and_gaps_are_not_meaningful():
+    b = compute_fundamentals(["BBB"], statements=_statements(), closes=_closes()).loc["BBB"]
+    assert b["price"] == 9.0  # last valid close
+    assert np.isnan(b["pe"])
+    assert np.isnan(b["ev_ebitda"])
+    assert b["fcf"] == pytest.approx(-50.0)
+
+
+def test_markdown_table():
+    md = fundamentals_markdown(compute_fundamentals(["AAA", "BBB"], statements=_statements(), closes=_closes()))
+    assert md.splitlines()[0] == "| Metric | AAA (USD) | BBB (BRL) |"
+    assert "| P/E | 10.0x | n/a |" in md
+    assert "| Gross Margin | 40.0% | 20.0% |" in md
+
+
+def test_loaders_are_used_for_missing_inputs():
+    seen = []
+
+    def statement_loader(symbol):
+        seen.append(symbol)
+        return _statements().loc[symbol].to_dict()
+
+    m = compute_fundamentals(
+        ["AAA", "BBB"], statement_loader=statement_loader, price_loader=lambda syms: _closes()[syms]
+    )
+    assert sorted(seen) == ["AAA", "BBB"]
+    assert m.loc["AAA", "pe"] == pytest.approx(10.0)
+
+
+def _cross_currency_statements():
+    rows = {
+        # ADR: trades in USD, reports in TWD; 1 ADR = 5 local shares
+        "ADR": dict(revenue=2000.0, net_income=400.0, ebitda=800.0, operating_cash_flow=600.0,
+                    capex=-200.0, total_debt=100.0, cash=300.0, shares=50.0,
+                    quoted_market_cap=250.0, currency="TWD", price_currency="USD"),
+        # LSE line quoted in pence, reports in GBP
+        "LSE.L": dict(revenue=100.0, net_income=10.0, ebitda=20.0, total_debt=0.0, cash=0.0,
+                      shares=20.0, currency="GBP", price_currency="GBp"),
+        # No FX quote available for this pair
+        "XYZ": dict(revenue=100.0, net_income=10.0, shares=1.0, quoted_market_cap=50.0,
+                    currency="ARS", price_currency="USD"),
+    }
+    return pd.DataFrame.from_dict(rows, orient="index").reindex(columns=RAW_COLUMNS)
+
+
+def test_cross_currency_valuation():
+    idx = pd.date_range("2025-01-01", periods=2, freq="D")
+    closes = pd.DataFrame({"ADR": [24.0, 25.0], "LSE.L": [480.0, 500.0], "XYZ": [50.0, 50.0]}, index=idx)
+    requested = []
+
+    def fx_loader(pairs):
+        requested.append(pairs)
+        return {("USD", "TWD"): 32.0}
+
+    m = compute_fundamentals(
+        ["ADR", "LSE.L", "XYZ"], statements=_cross_currency_statements(), closes=closes, fx_loader=fx_loader
+    )
+    assert requested == [[("USD", "ARS"), ("USD", "TWD")]]
+
+    adr = m.loc["ADR"]
+    assert adr["price"] == 25.0  # trading currency
+    assert adr["market_cap"] == pytest.approx(250.0 * 32)  # quoted cap, in TWD
+    assert adr["pe"] == pytest.approx(20.0)
+
+    lse = m.loc["LSE.L"]
+    assert lse["price"] == pytest.approx(5.0)  # pence → GBP
+    assert lse["market_cap"] == pytest.approx(100.0)
+    assert lse["pe"] == pytest.approx(10.0)
+
+    xyz = m.loc["XYZ"]
+    assert np.isnan(xyz["market_cap"]) and np.isnan(xyz["pe"])  # not reconcilable
+    assert xyz["net_margin"] == pytest.approx(0.1)  # same-currency ratios still shown
+
+    header = fundamentals_markdown(m).splitlines()[0]
+    assert header == "| Metric | ADR (price USD; financials TWD) | LSE.L (GBP) | XYZ (price USD; financials ARS) |"
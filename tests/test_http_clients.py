@@ -0,0 +1,26 @@
+from fastapi.testclient import TestClient
+from yfinance.data import YfData
+
+from agents.team_orchestrator import team
+from apps.api.main import app
+from core.config import get_settings
+from core.http_clients import collect_models
+
+
+def test_collect_models_covers_coordinator_and_members():
+    models = collect_models(team)
+    assert len(models) == 3
+    assert team.model in models
+
+
+def test_lifespan_shares_one_pool_and_closes_it(monkeypatch):
+    monkeypatch.setattr(get_settings(), "HTTP_WARMUP_ENABLED", False)
+    original_yf_session = YfData()._session
+    with TestClient(app) as c:
+        assert c.get("/v1/health").status_code == 200
+        pool = app.state.http.async_client
+        assert all(m.http_client is pool for m in collect_models(team))
+        assert YfData()._session is app.state.http.yf_session  # yfinance tools share it
+    assert pool.is_closed
+    assert all(m.http_client is None for m in collect_models(team))
+    assert YfData()._session is original_yf_session
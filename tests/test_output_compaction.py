@@ -0,0 +1,82 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from core.guardrails import estimate_tokens
+from tools.output_compaction import FullToolOutputTools, compact_tool_output, compact_toolkit
+
+BUDGET = 1500
+
+
+def price_history_json(days=252):
+    idx = pd.bdate_range("2024-01-02", periods=days)
+    close = 100 * np.cumprod(1 + np.random.default_rng(0).normal(0, 0.01, days))
+    frame = pd.DataFrame(
+        {"Open": close, "High": close * 1.01, "Low": close * 0.99, "Close": close,
+         "Volume": np.full(days, 1_000_000), "Dividends": 0.0, "Stock Splits": 0.0},
+        index=idx,
+    )
+    return frame, frame.to_json(orient="index")
+
+
+def statement_json():
+    dates = pd.to_datetime(["2024-12-31", "2023-12-31", "2022-12-31", "2021-12-31", "2020-12-31"])
+    rows = {f"Line Item {i}": np.arange(5.0) + i for i in range(60)}
+    rows.update({"Total Revenue": [500.0, 400, 300, 200, 100], "Net Income": [50.0, 40, 30, 20, 10]})
+    return pd.DataFrame(rows, index=dates).T.to_json(orient="index")
+
+
+def test_small_and_non_json_outputs_pass_through():
+    assert compact_tool_output('{"price": 1}', BUDGET) == '{"price": 1}'
+    text = "Error fetching prices " * 2000
+    assert compact_tool_output(text, BUDGET) == text
+
+
+def test_price_history_is_summarized_and_resampled():
+    frame, payload = price_history_json()
+    out = json.loads(compact_tool_output(payload, BUDGET))
+    assert estimate_tokens(json.dumps(out)) <= BUDGET < estimate_tokens(payload)
+    assert out["kind"] == "price_history"
+    assert out["summary"]["sessions"] == len(frame)
+    assert out["summary"]["last_close"] == round(frame["Close"].iloc[-1], 4)
+    assert out["resampled"]["frequency"] in ("weekly", "monthly")
+    assert out["resampled"]["bars"][-1]["close"] == round(frame["Close"].iloc[-1], 4)
+
+
+def test_statement_keeps_key_items_for_latest_periods():
+    out = json.loads(compact_tool_output(statement_json(), 400))
+    assert out["kind"] == "statement"
+    assert out["periods"][0] == "2024-12-31" and len(out["periods"]) == 4
+    assert out["line_items"]["Total Revenue"] == [500.0, 400.0, 300.0, 200.0]
+    assert "Line Item 3" not in out["line_items"]
+
+
+def test_info_dict_is_allow_listed():
+    info = {"currentPrice": 10.5, "trailingPE": 12.0, **{f"field{i}": "x" * 40 for i in range(300)}}
+    out = json.loads(compact_tool_output(json.dumps(info, indent=2), BUDGET))
+    assert out["fields"] == {"currentPrice": 10.5, "trailingPE": 12.0}
+
+
+def test_full_payload_available_by_reference():
+    _, payload = price_history_json()
+    ref = json.loads(compact_tool_output(payload, BUDGET))["full_output_ref"]
+    tools = FullToolOutputTools()
+    first = tools.get_full_tool_output(ref, max_chars=1000)
+    assert first.startswith(payload[:1000]) and "offset=1000" in first
+    assert tools.get_full_tool_output(ref, max_chars=len(payload)) == payload
+    assert tools.get_full_tool_output("nope").startswith("Error")
+
+
+def test_compact_toolkit_wraps_entrypoints():
+    from agno.tools import Toolkit
+
+    _, payload = price_history_json()
+
+    def get_historical_stock_prices(symbol: str) -> str:
+        """Prices."""
+        return payload
+
+    toolkit = compact_toolkit(Toolkit(name="t", tools=[get_historical_stock_prices]))
+    result = toolkit.functions["get_historical_stock_prices"].entrypoint("AAPL")
+    assert "full_output_ref" in json.loads(result)
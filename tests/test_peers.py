@@ -0,0 +1,73 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from core.config import get_settings
+from tools.fundamentals import RAW_COLUMNS
+from tools.peers import compute_peer_comparison, peer_comparison_markdown, resolve_peers
+
+
+def test_resolve_peers_same_industry_one_listing_per_company():
+    peers = resolve_peers("BBAS3.SA", max_peers=4)
+    assert "BBAS3.SA" not in peers and "BDORY" not in peers
+    assert {"ITUB4.SA", "BBDC4.SA"} <= set(peers)
+    assert not ({"ITUB", "ITUB4.SA"} <= set(peers))  # ADR and local line count once
+
+
+def test_unknown_symbol_has_no_peers():
+    assert resolve_peers("NOPE1.SA") == []
+
+
+def test_bulk_comparison_single_price_download():
+    group_calls = []
+    idx = pd.bdate_range("2024-01-01", periods=260)
+    growth = {"AAA": 1.001, "BBB": 1.0, "CCC": 0.999}
+
+    def price_loader(symbols):
+        group_calls.append(list(symbols))
+        return pd.DataFrame({s: 100 * growth[s] ** np.arange(len(idx)) for s in symbols}, index=idx)
+
+    pe_inputs = {"AAA": 10.0, "BBB": 20.0, "CCC": 40.0}
+
+    def statement_loader(symbol):
+        row = dict.fromkeys(RAW_COLUMNS, np.nan)
+        row.update(shares=1.0, currency="USD", revenue=100.0)
+        row["net_income"] = 100 * growth[symbol] ** (len(idx) - 1) / pe_inputs[symbol]
+        return row
+
+    frame = compute_peer_comparison(
+        "AAA", peers=["BBB", "CCC"], statement_loader=statement_loader, price_loader=price_loader
+    )
+    assert group_calls == [["AAA", "BBB", "CCC"]]
+    assert list(frame.index) == ["AAA", "BBB", "CCC"]
+    assert frame.loc["AAA", "ret_1y"] > 0 > frame.loc["CCC", "ret_1y"]
+    assert abs(frame.loc["AAA", "pe"] - 10.0) < 1e-6
+
+    md = peer_comparison_markdown(frame)
+    assert "| **AAA** |" in md
+    assert "Peer median" in md
+    assert "P/E 67% discount" in md  # 10x vs median(20x, 40x) = 30x
+
+
+def test_slow_peer_becomes_gap_without_stalling_group(monkeypatch):
+    idx = pd.bdate_range("2024-01-01", periods=30)
+
+    def statement_loader(symbol):
+        if symbol == "SLOW":
+            time.sleep(2.0)
+        row = dict.fromkeys(RAW_COLUMNS, np.nan)
+        row.update(shares=1.0, currency="USD", net_income=10.0)
+        return row
+
+    def price_loader(symbols):
+        return pd.DataFrame({s: np.full(len(idx), 100.0) for s in symbols}, index=idx)
+
+    monkeypatch.setattr(get_settings(), "STATEMENT_FETCH_TIMEOUT_SECONDS", 0.2)
+    started = time.monotonic()
+    frame = compute_peer_comparison(
+        "AAA", peers=["SLOW", "CCC"], statement_loader=statement_loader, price_loader=price_loader
+    )
+    assert time.monotonic() - started < 1.0
+    assert frame.loc["AAA", "pe"] == 10.0 and frame.loc["CCC", "pe"] == 10.0
+    assert np.isnan(frame.loc["SLOW", "pe"])
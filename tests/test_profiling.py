@@ -0,0 +1,71 @@
+import time
+
+import pytest
+
+from apps.api import middleware
+from apps.api.routers import analyze, debug
+from core.config import get_settings
+from core.profiling import ProfileStore, SamplingProfiler
+
+
+def busy_python_work():
+    end = time.perf_counter() + 0.1
+    while time.perf_counter() < end:
+        sum(range(1000))
+
+
+def test_sampler_produces_collapsed_stacks():
+    import threading
+
+    with SamplingProfiler(interval=0.002) as prof:
+        t = threading.Thread(target=busy_python_work, name="worker")
+        t.start()
+        t.join()
+    lines = prof.collapsed().splitlines()
+    assert prof.samples > 5
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert any(line.startswith("worker;") and "busy_python_work" in line for line in lines)
+
+
+def test_profile_store_prunes_and_validates(tmp_path):
+    store = ProfileStore(str(tmp_path), max_files=2)
+    ids = [f"{i:032x}" for i in range(3)]
+    for pid in ids:
+        store.save(pid, "main;f 1\n")
+        time.sleep(0.01)
+    assert store.get(ids[0]) is None
+    assert store.get(ids[2]) == "main;f 1\n"
+    assert store.get("../etc/passwd") is None
+
+
+@pytest.fixture
+def client(api_client, monkeypatch, tmp_path):
+    async def fake_team(message, session_id=None):
+        busy_python_work()
+        return "## Report\nBody"
+
+    monkeypatch.setattr(get_settings(), "PROFILING_ENABLED", True)
+    profiles = ProfileStore(str(tmp_path / "profiles"))
+    monkeypatch.setattr(middleware, "get_profile_store", lambda: profiles)
+    monkeypatch.setattr(debug, "get_profile_store", lambda: profiles)
+    monkeypatch.setattr(analyze, "_call_team", fake_team)
+    return api_client
+
+
+def test_analyze_profiled_only_on_request(client):
+    body = {"ticker": "AAPL", "prompt": "deep dive"}
+    plain = client.post("/v1/analyze", json=body)
+    assert plain.status_code == 200
+    assert "x-profile-id" not in plain.headers
+
+    profiled = client.post("/v1/analyze", json=body, headers={"X-Debug-Profile": "1"})
+    assert profiled.status_code == 200
+    profile = client.get(f"/v1/debug/profiles/{profiled.headers['x-profile-id']}")
+    assert profile.status_code == 200
+    assert "busy_python_work" in profile.text
+
+
+def test_profiles_hidden_when_disabled(client, monkeypatch):
+    r = client.post("/v1/analyze", json={"ticker": "AAPL"}, headers={"X-Debug-Profile": "1"})
+    monkeypatch.setattr(get_settings(), "PROFILING_ENABLED", False)
+    assert client.get(f"/v1/debug/profiles/{r.headers['x-profile-id']}").status_code == 404
@@ -0,0 +1,144 @@
+import asyncio
+import io
+import os
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from apps.api.main import app
+from apps.api.routers import reports
+from core.report_export import ExportBusy, ReportExporter, render_report
+from core.report_store import ReportStore, content_hash
+
+REPORT_MD = """# 📊 AAPL — Equity Report
+
+## 1. Snapshot
+- **Price:** $189.50 (2024-06-28)
+- Net margin 25.3%
+
+| Metric | Value |
+|---|---|
+| P/E | 29.4x |
+
+Source: [Reuters](https://reuters.com/x)
+"""
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ReportStore(str(tmp_path / "reports.db"))
+
+
+def test_store_roundtrip(store):
+    saved = store.save(ticker="AAPL", prompt="deep dive", content_markdown=REPORT_MD, session_id="s1")
+    got = store.get(saved.report_id)
+    assert got == saved
+    assert got.content_hash == content_hash(REPORT_MD)
+    assert store.latest_for_ticker("AAPL").report_id == saved.report_id
+    assert [r.report_id for r in store.by_session("s1")] == [saved.report_id]
+    assert store.get("missing") is None
+
+
+@pytest.mark.parametrize("fmt,magic", [("pdf", b"%PDF"), ("docx", b"PK"), ("html", b"<!DOCTYPE html>")])
+def test_render_report_formats(fmt, magic):
+    data = render_report(REPORT_MD, fmt, "AAPL Equity Report")
+    assert data.startswith(magic)
+
+
+def test_docx_keeps_table_and_headings():
+    from docx import Document
+
+    doc = Document(io.BytesIO(render_report(REPORT_MD, "docx")))
+    assert doc.tables[0].cell(1, 1).text == "29.4x"
+    assert any(p.style.name.startswith("Heading") for p in doc.paragraphs)
+
+
+def test_exporter_caches_and_bounds_pending(tmp_path):
+    exporter = ReportExporter(str(tmp_path / "cache"), workers=1, max_pending=1)
+    try:
+        path = asyncio.run(exporter.export("h1", REPORT_MD, "html", "t"))
+        assert path.read_bytes().startswith(b"<!DOCTYPE html>")
+        assert asyncio.run(exporter.export("h1", REPORT_MD, "html", "t")) == path  # cache hit
+
+        first = exporter._submit("h2", REPORT_MD, "pdf", "t")
+        assert exporter._submit("h2", REPORT_MD, "pdf", "t") is first  # single flight
+        with pytest.raises(ExportBusy):
+            exporter._submit("h3", REPORT_MD, "pdf", "t")
+        first.result(timeout=60)
+    finally:
+        exporter.shutdown()
+
+
+def test_html_export_escapes_raw_html():
+    html = render_report(REPORT_MD + '\n<script>alert(1)</script> <img src=x onerror="alert(1)">\n', "html")
+    assert b"<script>alert" not in html and b"<img" not in html
+    assert b"&lt;script&gt;" in html
+    assert b"<table>" in html  # markdown itself still renders
+
+
+def test_exporter_recovers_from_crashed_worker(tmp_path):
+    exporter = ReportExporter(str(tmp_path / "cache"), workers=1)
+    try:
+        crash = exporter._get_pool().submit(os._exit, 1)
+        path = asyncio.run(exporter.export("h1", REPORT_MD, "html", "t"))
+        assert path.read_bytes().startswith(b"<!DOCTYPE html>")
+        assert crash.exception(timeout=60) is not None
+    finally:
+        exporter.shutdown()
+
+
+def test_export_cache_evicts_by_count_and_age(tmp_path):
+    exporter = ReportExporter(
+        str(tmp_path / "cache"), workers=1, max_files=2, max_age_seconds=3600, in_use_seconds=0
+    )
+    try:
+        paths = [asyncio.run(exporter.export(f"h{i}", REPORT_MD, "html", "t")) for i in range(3)]
+        assert [p.exists() for p in paths] == [False, True, True]  # least recently used evicted
+
+        old = time.time() - 7200
+        os.utime(paths[1], (old, old))
+        assert exporter.prune() == 1
+        assert not paths[1].exists() and paths[2].exists()
+
+        os.utime(paths[2], (old, old))
+        asyncio.run(exporter.export("h2", REPORT_MD, "html", "t"))  # expired: re-rendered
+        assert time.time() - paths[2].stat().st_mtime < 60
+    finally:
+        exporter.shutdown()
+
+
+def test_prune_spares_files_in_use(tmp_path):
+    exporter = ReportExporter(str(tmp_path / "cache"), workers=1, max_files=1, in_use_seconds=60)
+    try:
+        paths = [asyncio.run(exporter.export(f"h{i}", REPORT_MD, "html", "t")) for i in range(3)]
+        assert all(p.exists() for p in paths)  # just rendered/served: may be streaming now
+
+        old = time.time() - 120
+        for p in paths[:2]:
+            os.utime(p, (old, old))
+        asyncio.run(exporter.export("h0", REPORT_MD, "html", "t"))  # cache hit marks h0 in use
+        assert exporter.prune() == 1
+        assert [p.exists() for p in paths] == [True, False, True]
+    finally:
+        exporter.shutdown()
+
+
+def test_export_endpoint(monkeypatch, store, tmp_path):
+    report = store.save(ticker="AAPL", prompt="deep dive", content_markdown=REPORT_MD)
+    exporter = ReportExporter(str(tmp_path / "cache"), workers=1)
+    monkeypatch.setattr(reports, "get_report_store", lambda: store)
+    monkeypatch.setattr(reports, "get_report_exporter", lambda: exporter)
+    c = TestClient(app)
+    try:
+        r = c.get(f"/v1/reports/{report.report_id}/export", params={"format": "pdf"})
+        assert r.status_code == 200
+        assert r.headers["content-type"] == "application/pdf"
+        assert "attachment" in r.headers["content-disposition"]
+        assert r.content.startswith(b"%PDF")
+
+        assert c.get("/v1/reports/nope/export").status_code == 404
+        bad = c.get(f"/v1/reports/{report.report_id}/export", params={"format": "xls"})
+        assert bad.status_code == 422
+    finally:
+        exporter.shutdown()
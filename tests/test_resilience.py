@@ -0,0 +1,244 @@
+import time
+
+import agno.tools.duckduckgo as agno_ddg
+import agno.tools.yfinance as agno_yf
+import pytest
+from agno.tools import Toolkit
+from agno.tools.duckduckgo import DuckDuckGoTools
+from agno.tools.yfinance import YFinanceTools
+from ddgs.exceptions import DDGSException, RatelimitException, TimeoutException
+from yfinance.exceptions import YFRateLimitError
+
+from tools.resilience import (
+    UNAVAILABLE_PREFIX,
+    CircuitBreaker,
+    ResiliencePolicy,
+    harden_toolkit,
+    is_transient_yfinance_error,
+)
+
+
+class FaultyTools(Toolkit):
+    """Local stub provider with injectable faults."""
+
+    def __init__(self, fail_first=0, delays=(), error_text=False, bad_input=False):
+        self.calls = 0
+        self.fail_first = fail_first
+        self.delays = list(delays)
+        self.error_text = error_text
+        self.bad_input = bad_input
+        super().__init__(name="faulty", tools=[self.get_quote])
+
+    def get_quote(self, symbol: str) -> str:
+        """Return a fake quote for `symbol`."""
+        self.calls += 1
+        if self.delays:
+            time.sleep(self.delays.pop(0))
+        if self.calls <= self.fail_first:
+            if self.error_text:
+                return f"Error fetching quote for {symbol}: boom"
+            if self.bad_input:
+                raise KeyError(f"unknown symbol {symbol}")
+            raise ConnectionError("provider down")
+        return f"{symbol}: 42.0"
+
+
+def _call(toolkit, **kwargs):
+    return toolkit.functions["get_quote"].entrypoint(**kwargs)
+
+
+def _policy(**overrides):
+    params = dict(timeout=0.5, retries=2, backoff_base=0.0, backoff_max=0.0)
+    params.update(overrides)
+    return ResiliencePolicy(**params)
+
+
+def test_retries_recover_from_transient_errors():
+    tk = harden_toolkit(FaultyTools(fail_first=2), policy=_policy(), breaker=CircuitBreaker("t"))
+    assert _call(tk, symbol="AAPL") == "AAPL: 42.0"
+    assert tk.calls == 3
+
+
+def test_in_band_errors_pass_through_without_retry():
+    breaker = CircuitBreaker("t", failure_threshold=1)
+    tk = harden_toolkit(FaultyTools(fail_first=10, error_text=True), policy=_policy(), breaker=breaker)
+    assert _call(tk, symbol="NOPE").startswith("Error fetching quote")
+    assert tk.calls == 1
+    assert breaker.state == "closed"
+
+
+def test_deterministic_exceptions_do_not_trip_breaker():
+    breaker = CircuitBreaker("t", failure_threshold=1)
+    tk = harden_toolkit(FaultyTools(fail_first=10, bad_input=True), policy=_policy(), breaker=breaker)
+    for _ in range(3):
+        assert "KeyError" in _call(tk, symbol="NOPE")
+    assert tk.calls == 3
+    assert breaker.state == "closed"
+
+
+def test_timeout_returns_unavailable_quickly():
+    tk = harden_toolkit(
+        FaultyTools(delays=[2.0]), policy=_policy(timeout=0.1, retries=0), breaker=CircuitBreaker("t")
+    )
+    started = time.monotonic()
+    out = _call(tk, symbol="AAPL")
+    assert out.startswith(UNAVAILABLE_PREFIX)
+    assert "timed out" in out
+    assert time.monotonic() - started < 1.0
+
+
+def test_timeout_is_not_retried():
+    breaker = CircuitBreaker("t")
+    tk = harden_toolkit(
+        FaultyTools(delays=[0.5, 0.0]), policy=_policy(timeout=0.1, retries=2), breaker=breaker
+    )
+    assert "timed out" in _call(tk, symbol="AAPL")
+    assert tk.calls == 1
+
+
+def test_total_budget_caps_retries():
+    tk = harden_toolkit(
+        FaultyTools(fail_first=100, delays=[0.15] * 10),
+        policy=_policy(timeout=1.0, retries=5, budget=0.4),
+        breaker=CircuitBreaker("t", failure_threshold=100),
+    )
+    started = time.monotonic()
+    assert _call(tk, symbol="AAPL").startswith(UNAVAILABLE_PREFIX)
+    assert time.monotonic() - started < 0.7
+    assert tk.calls < 6
+
+
+def test_breaker_opens_and_fails_fast():
+    breaker = CircuitBreaker("t", failure_threshold=2, reset_timeout=60)
+    tk = harden_toolkit(FaultyTools(fail_first=100), policy=_policy(retries=5), breaker=breaker)
+    assert _call(tk, symbol="AAPL").startswith(UNAVAILABLE_PREFIX)
+    assert breaker.state == "open"
+    calls = tk.calls
+    assert "circuit open" in _call(tk, symbol="AAPL")
+    assert tk.calls == calls  # provider not touched while open
+
+
+def test_breaker_half_open_probe_closes():
+    now = [0.0]
+    breaker = CircuitBreaker("t", failure_threshold=1, reset_timeout=10, clock=lambda: now[0])
+    tk = harden_toolkit(FaultyTools(fail_first=1), policy=_policy(retries=0), breaker=breaker)
+    assert _call(tk, symbol="AAPL").startswith(UNAVAILABLE_PREFIX)
+    assert breaker.state == "open"
+    now[0] = 11.0
+    assert _call(tk, symbol="AAPL") == "AAPL: 42.0"
+    assert breaker.state == "closed"
+
+
+def test_hedged_request_cuts_tail_latency():
+    tk = harden_toolkit(
+        FaultyTools(delays=[1.0, 0.0]),
+        policy=_policy(timeout=2.0, retries=0, hedge_after=0.05),
+        breaker=CircuitBreaker("t"),
+    )
+    started = time.monotonic()
+    assert _call(tk, symbol="AAPL") == "AAPL: 42.0"
+    assert time.monotonic() - started < 0.5
+    assert tk.calls == 2
+
+
+def test_wrapped_tool_keeps_schema():
+    tk = harden_toolkit(FaultyTools(), policy=_policy(), breaker=CircuitBreaker("t"))
+    fn = tk.functions["get_quote"].model_copy(deep=True)
+    fn.process_entrypoint()
+    assert "symbol" in fn.parameters["properties"]
+
+
+CURL_DNS_ERROR = (
+    "Failed to perform, curl: (6) Could not resolve host: query2.finance.yahoo.com. "
+    "See https://curl.se/libcurl/c/libcurl-errors.html first for more details."
+)
+
+
+def _fake_ticker(errors):
+    """yf.Ticker stand-in whose `.info` raises the queued exceptions, then succeeds."""
+
+    class FakeTicker:
+        calls = 0
+
+        def __init__(self, symbol):
+            FakeTicker.calls += 1  # one Ticker per tool call
+
+        @property
+        def info(self):
+            if errors:
+                raise errors.pop(0)
+            return {"regularMarketPrice": 42.0}
+
+    return FakeTicker
+
+
+@pytest.mark.parametrize(
+    "error,transient",
+    [
+        (YFRateLimitError(), True),
+        (Exception(CURL_DNS_ERROR), True),
+        (Exception("HTTP Error 503: Service Unavailable"), True),
+        (KeyError("regularMarketPrice"), False),
+        (Exception("HTTP Error 404: Not Found"), False),
+    ],
+)
+def test_yfinance_error_strings_classified(monkeypatch, error, transient):
+    monkeypatch.setattr(agno_yf.yf, "Ticker", _fake_ticker([error]))
+    result = YFinanceTools().get_current_stock_price("AAPL")
+    assert result.startswith("Error fetching current price for AAPL")
+    assert is_transient_yfinance_error(result) is transient
+
+
+def test_yfinance_rate_limit_retried_and_trips_breaker(monkeypatch):
+    ticker = _fake_ticker([YFRateLimitError(), Exception(CURL_DNS_ERROR)])
+    monkeypatch.setattr(agno_yf.yf, "Ticker", ticker)
+    policy = _policy(is_failure=is_transient_yfinance_error)
+    tk = harden_toolkit(YFinanceTools(), policy=policy, breaker=CircuitBreaker("yf"))
+    assert tk.functions["get_current_stock_price"].entrypoint(symbol="AAPL") == "42.0000"
+    assert ticker.calls == 3
+
+    breaker = CircuitBreaker("yf", failure_threshold=2, reset_timeout=60)
+    monkeypatch.setattr(agno_yf.yf, "Ticker", _fake_ticker([YFRateLimitError()] * 10))
+    tk = harden_toolkit(YFinanceTools(), policy=policy, breaker=breaker)
+    out = tk.functions["get_current_stock_price"].entrypoint(symbol="AAPL")
+    assert out.startswith(UNAVAILABLE_PREFIX) and "Too Many Requests" in out
+    assert breaker.state == "open"
+
+
+def _fake_ddgs(errors):
+    class FakeDDGS:
+        calls = 0
+
+        def __init__(self, **kwargs):
+            pass
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def text(self, query, **kwargs):
+            FakeDDGS.calls += 1
+            if errors:
+                raise errors.pop(0)
+            return [{"title": "ok", "href": "https://example.com", "body": query}]
+
+    return FakeDDGS
+
+
+def test_ddgs_rate_limits_and_timeouts_are_transient(monkeypatch):
+    ddgs = _fake_ddgs([RatelimitException("202 Ratelimit"), TimeoutException("timed out")])
+    monkeypatch.setattr(agno_ddg, "DDGS", ddgs)
+    tk = harden_toolkit(DuckDuckGoTools(), policy=_policy(), breaker=CircuitBreaker("ddg"))
+    assert "example.com" in tk.functions["duckduckgo_search"].entrypoint(query="petrobras")
+    assert ddgs.calls == 3
+
+
+def test_ddgs_no_results_is_not_retried(monkeypatch):
+    ddgs = _fake_ddgs([DDGSException("No results found.")] * 3)
+    monkeypatch.setattr(agno_ddg, "DDGS", ddgs)
+    breaker = CircuitBreaker("ddg", failure_threshold=1)
+    tk = harden_toolkit(DuckDuckGoTools(), policy=_policy(), breaker=breaker)
+    assert "No results found" in tk.functions["duckduckgo_search"].entrypoint(query="zzzz")
+    assert ddgs.calls == 1 and breaker.state == "closed"
@@ -0,0 +1,114 @@
+import time
+
+import pytest
+
+from apps.api.routers import analyze
+from core.config import get_settings
+from core.report_store import ReportStore
+from core.semantic_cache import SemanticCache, embed_prompt
+
+DEFAULT = "Full equity deep-dive with catalysts, risks, and valuation hooks."
+
+# (stored prompt, incoming prompt) pairs that ask for the same report
+PARAPHRASES = [
+    ("Full deep-dive with catalysts and risks", "deep dive incl. risks & catalysts"),
+    (DEFAULT, "deep dive: catalysts, risks and valuation hooks"),
+    (DEFAULT, "Give me a full deep dive with catalyst, risk and valuation hook"),
+    ("Valuation and dividend outlook", "dividend outlook and valuation"),
+    ("FX risk exposure", "foreign exchange risk exposure"),
+    ("Analyze the company's debt and leverage", "debt & leverage analysis"),
+    ("Earnings preview for next quarter", "next quarter earnings preview please"),
+    ("Complete deep dive with catalysts, risks and valuation", "deep-dive: valuation, risks, catalysts"),
+]
+
+# Pairs with different intent that must never share a report
+DISTINCT = [
+    (DEFAULT, "FX risk exposure"),
+    (DEFAULT, "dividend outlook"),
+    ("FX risk exposure", "credit risk exposure"),
+    ("Valuation and dividend outlook", "Earnings preview for next quarter"),
+    ("ESG and governance risks", "regulatory risks"),
+    ("Q3 earnings recap", "Q4 earnings preview"),
+    ("Full deep-dive with catalysts and risks", "risks only"),
+    ("management quality and capital allocation", "peer comparison on valuation multiples"),
+]
+
+
+class Clock:
+    def __init__(self):
+        self.now = time.time()
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ReportStore(str(tmp_path / "reports.db"))
+
+
+def _cache(store, clock=None):
+    return SemanticCache(store, threshold=0.8, ttl_seconds=3600, clock=clock or Clock())
+
+
+def test_embedding_is_deterministic_and_normalized():
+    v = embed_prompt(DEFAULT)
+    assert abs(float(v @ v) - 1.0) < 1e-5
+    assert (v == embed_prompt(DEFAULT)).all()
+
+
+def test_paraphrase_hit_rate(store):
+    hits = 0
+    for i, (stored, incoming) in enumerate(PARAPHRASES):
+        cache = _cache(store)
+        cache.add(store.save(ticker=f"T{i}", prompt=stored, content_markdown="report"))
+        hits += cache.lookup(f"T{i}", incoming) is not None
+    assert hits / len(PARAPHRASES) >= 0.9
+
+
+def test_no_false_hits(store):
+    for i, (stored, incoming) in enumerate(DISTINCT):
+        cache = _cache(store)
+        cache.add(store.save(ticker=f"D{i}", prompt=stored, content_markdown="report"))
+        assert cache.lookup(f"D{i}", incoming) is None, (stored, incoming)
+
+
+def test_partitioned_by_ticker_and_expires(store):
+    clock = Clock()
+    cache = _cache(store, clock)
+    cache.add(store.save(ticker="AAPL", prompt=DEFAULT, content_markdown="aapl report"))
+    assert cache.lookup("MSFT", DEFAULT) is None
+    assert cache.lookup("AAPL", DEFAULT).report.content_markdown == "aapl report"
+
+    clock.now += 3601
+    assert cache.lookup("AAPL", DEFAULT) is None
+
+
+def test_hydrates_from_store_after_restart(store):
+    saved = store.save(ticker="AAPL", prompt=DEFAULT, content_markdown="aapl report")
+    fresh = SemanticCache(store, threshold=0.8, ttl_seconds=3600)
+    assert fresh.lookup("AAPL", "deep dive with risks, catalysts & valuation hooks").report == saved
+
+
+def test_analyze_serves_similar_prompt_from_cache(api_client, report_store, monkeypatch):
+    store, calls, c = report_store, api_client.calls, api_client
+    cache = _cache(store)
+    monkeypatch.setattr(get_settings(), "SEMANTIC_CACHE_ENABLED", True)
+    monkeypatch.setattr(analyze, "get_semantic_cache", lambda: cache)
+
+    first = c.post("/v1/analyze", json={"ticker": "AAPL", "prompt": "Full deep-dive with catalysts and risks"})
+    assert first.status_code == 200 and first.json()["cached"] is False
+    second = c.post("/v1/analyze", json={"ticker": "AAPL", "prompt": "deep dive incl. risks & catalysts"})
+    assert second.status_code == 200
+    body = second.json()
+    assert body["cached"] is True
+    assert body["session_id"] != first.json()["session_id"]  # never another client's session
+    assert body["report_id"] != first.json()["report_id"]
+    assert "Served from a report generated" in body["content_markdown"]
+    assert "Full deep-dive" not in body["content_markdown"]  # original prompt not echoed
+    assert store.get(body["report_id"]).meta["served_from"] == first.json()["report_id"]
+    assert len(calls) == 1
+
+    # Served copies are never cache candidates themselves (no stacked notes)
+    third = c.post("/v1/analyze", json={"ticker": "AAPL", "prompt": "deep dive with risks and catalysts"})
+    assert third.json()["content_markdown"].count("Served from a report generated") == 1
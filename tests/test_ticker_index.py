@@ -0,0 +1,135 @@
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from apps.api.main import app
+from apps.api.routers import analyze
+from core import guardrails
+from core.config import get_settings
+from core.guardrails import ensure_known_ticker, resolve_known_ticker, validate_ticker
+from core.ticker_index import ListingCache, TickerIndex, get_ticker_index, yahoo_symbol_candidates
+
+
+def test_bundled_index_loads():
+    index = get_ticker_index()
+    assert len(index) > 100
+    assert "BBAS3.SA" in index
+
+
+def test_prefix_and_name_search():
+    index = get_ticker_index()
+    assert index.search("PETR")[0].symbol.startswith("PETR")
+    symbols = [r.symbol for r in index.search("banco do brasil")]
+    assert "BBAS3.SA" in symbols
+
+
+def test_fuzzy_search_fixes_typos():
+    assert get_ticker_index().search("APPL")[0].symbol == "AAPL"
+
+
+def test_adr_mapping_in_context():
+    index = get_ticker_index()
+    assert index.get("VALE3.SA").adr_pair == "VALE"
+    assert "ADR/local pair: VALE on NYSE" in index.context_for("VALE3.SA")
+
+
+def test_require_unknown_suggests():
+    with pytest.raises(ValueError, match="Did you mean"):
+        get_ticker_index().require("BBAS4.SA")
+
+
+def test_load_refreshed_file(tmp_path):
+    f = tmp_path / "tickers.csv"
+    f.write_text("symbol,name,exchange,country,sector,industry,adr_pair\nxyz,Xyz Corp,NYSE,US,,,\n")
+    index = TickerIndex.load(f)
+    assert index.get("XYZ").name == "Xyz Corp"
+
+
+def test_search_endpoint():
+    r = TestClient(app).get("/v1/tickers/search", params={"q": "itau", "limit": 5})
+    assert r.status_code == 200
+    assert "ITUB4.SA" in [t["symbol"] for t in r.json()["results"]]
+
+
+def test_share_class_spellings():
+    assert validate_ticker("brk-b") == "BRK-B"
+    assert yahoo_symbol_candidates("BRK.B") == ["BRK.B", "BRK-B"]
+    assert yahoo_symbol_candidates("BBAS3.SA") == ["BBAS3.SA"]
+
+
+def test_index_miss_checked_with_provider(monkeypatch):
+    listed = {"BRK.B": "BRK-B", "F": "F", "UBER": "UBER"}
+    monkeypatch.setattr(guardrails, "provider_listing", lambda t: listed.get(t))
+    assert ensure_known_ticker("BRK.B") == "BRK-B"
+    assert ensure_known_ticker("F") == "F"
+    with pytest.raises(ValueError, match="Unknown ticker"):
+        ensure_known_ticker("ZZZZ9.SA")
+
+
+def test_provider_outage_does_not_reject(monkeypatch):
+    def down(ticker):
+        raise ConnectionError("provider down")
+
+    monkeypatch.setattr(guardrails, "provider_listing", down)
+    assert ensure_known_ticker("UBER") == "UBER"
+
+
+def test_listing_misses_expire():
+    now = [0.0]
+    answers = {"NEWCO": [None, "NEWCO"], "F": ["F"]}
+    lookups = []
+
+    def lookup(symbol):
+        lookups.append(symbol)
+        return answers[symbol].pop(0)
+
+    cache = ListingCache(lookup, negative_ttl=60, clock=lambda: now[0])
+    assert cache.get("NEWCO") is None and cache.get("F") == "F"
+    assert cache.get("NEWCO") is None and cache.get("F") == "F"
+    assert lookups == ["NEWCO", "F"]
+
+    now[0] = 61  # the IPO is listed now; the miss is re-checked, the hit is kept
+    assert cache.get("NEWCO") == "NEWCO" and cache.get("F") == "F"
+    assert lookups == ["NEWCO", "F", "NEWCO"]
+
+
+def test_provider_check_does_not_block_event_loop(monkeypatch):
+    def slow(ticker):
+        time.sleep(0.5)
+        return ticker
+
+    monkeypatch.setattr(guardrails, "provider_listing", slow)
+    monkeypatch.setattr(get_settings(), "TICKER_VERIFY_TIMEOUT_SECONDS", 0.1)
+
+    async def scenario():
+        ticks = 0
+
+        async def heartbeat():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        beat = asyncio.create_task(heartbeat())
+        started = time.monotonic()
+        ticker = await resolve_known_ticker("UBER")
+        elapsed = time.monotonic() - started
+        beat.cancel()
+        return ticker, elapsed, ticks
+
+    ticker, elapsed, ticks = asyncio.run(scenario())
+    assert ticker == "UBER"  # accepted unverified past the time limit
+    assert elapsed < 0.3 and ticks >= 5
+
+
+def test_unknown_ticker_rejected_before_llm(monkeypatch):
+    async def boom(message, session_id=None):
+        raise AssertionError("team must not run for unknown tickers")
+
+    monkeypatch.setattr(analyze, "_call_team", boom)
+    monkeypatch.setattr(guardrails, "provider_listing", lambda t: None)
+    r = TestClient(app).post("/v1/analyze", json={"ticker": "ZZZZ9.SA"})
+    assert r.status_code == 422
+    assert "Unknown ticker" in str(r.json()["detail"])
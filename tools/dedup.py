@@ -0,0 +1,201 @@
+# tools/dedup.py
+"""
+Near-Duplicate News Collapsing
+
+Purpose:
+- The same wire story is often syndicated by several outlets. Sending every copy to the
+  LLM costs tokens and latency without adding information.
+- Search/news results are clustered by content similarity (word shingles + MinHash);
+  each cluster keeps one representative from the most authoritative source, and the
+  other copies are listed as corroborating citations (title, URL, source only).
+- Tokens saved are recorded on the active run (`core.run_stats`) and logged.
+
+Key Components:
+- minhash_signatures: Vectorized MinHash signatures for a batch of texts.
+- cluster_near_duplicates: Union-find clustering on estimated Jaccard similarity.
+- dedupe_results: Collapse a list of search/news result dicts.
+- dedupe_toolkit: Apply collapsing to the JSON output of search toolkits (e.g., DuckDuckGo).
+"""
+
+import hashlib
+import json
+import re
+from functools import wraps
+from typing import Any, Callable, Optional
+from urllib.parse import urlparse
+
+import numpy as np
+from agno.tools import Toolkit
+from loguru import logger
+
+from core.config import get_settings
+from core.guardrails import estimate_tokens
+from core.run_stats import record
+from tools.wrappers import wrap_toolkit
+
+SHINGLE_SIZE = 3
+NUM_PERM = 64
+_MERSENNE_PRIME = (1 << 31) - 1  # keeps a*x+b inside int64
+_rng = np.random.default_rng(20240229)  # fixed seed → stable signatures across processes
+_PERM_A = _rng.integers(1, _MERSENNE_PRIME, size=NUM_PERM, dtype=np.int64)
+_PERM_B = _rng.integers(0, _MERSENNE_PRIME, size=NUM_PERM, dtype=np.int64)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_URL_KEYS = ("url", "href", "link")
+_TEXT_KEYS = ("title", "body", "snippet", "excerpt")
+
+
+def _shingles(text: str) -> np.ndarray:
+    """Hashed word shingles (31-bit ints) of the normalized text."""
+    words = _TOKEN_RE.findall(text.lower())
+    if len(words) >= SHINGLE_SIZE:
+        grams = {" ".join(words[i : i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+    else:
+        grams = set(words) or {""}
+    return np.fromiter(
+        (
+            int.from_bytes(hashlib.blake2b(g.encode(), digest_size=8).digest(), "little") & _MERSENNE_PRIME
+            for g in grams
+        ),
+        dtype=np.int64,
+    )
+
+
+def minhash_signatures(texts: list[str]) -> np.ndarray:
+    """
+    Compute MinHash signatures.
+
+    Returns:
+        np.ndarray: Shape (len(texts), NUM_PERM); matching positions estimate Jaccard.
+    """
+    sigs = np.empty((len(texts), NUM_PERM), dtype=np.int64)
+    for i, text in enumerate(texts):
+        x = _shingles(text)
+        sigs[i] = ((np.outer(_PERM_A, x) + _PERM_B[:, None]) % _MERSENNE_PRIME).min(axis=1)
+    return sigs
+
+
+def cluster_near_duplicates(texts: list[str], threshold: float) -> list[list[int]]:
+    """
+    Group indices of near-duplicate texts.
+
+    Args:
+        texts: Documents to compare.
+        threshold: Minimum estimated Jaccard similarity to merge two documents.
+
+    Returns:
+        list[list[int]]: Clusters in order of first appearance.
+    """
+    n = len(texts)
+    if n < 2:
+        return [[i] for i in range(n)]
+    sigs = minhash_signatures(texts)
+    sim = (sigs[:, None, :] == sigs[None, :, :]).mean(axis=2)
+
+    parent = list(range(n))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j in zip(*np.nonzero(np.triu(sim >= threshold, k=1))):
+        parent[find(int(j))] = find(int(i))
+
+    clusters: dict[int, list[int]] = {}
+    for i in range(n):
+        clusters.setdefault(find(i), []).append(i)
+    return list(clusters.values())
+
+
+def _url(item: dict) -> str:
+    return next((str(item[k]) for k in _URL_KEYS if item.get(k)), "")
+
+
+def _authority(item: dict, allowed: list[str]) -> int:
+    """Rank of the item's domain in ALLOWED_WEB_DOMAINS (lower = more authoritative)."""
+    host = urlparse(_url(item)).netloc.lower()
+    for rank, dom in enumerate(allowed):
+        if host == dom or host.endswith("." + dom):
+            return rank
+    return len(allowed)
+
+
+def dedupe_results(items: list[dict], threshold: Optional[float] = None) -> list[dict]:
+    """
+    Collapse near-duplicate search/news results.
+
+    Each cluster keeps the item from the most authoritative allowed domain (ties: the
+    longer snippet, then the earlier result) and lists the rest under `corroborated_by`.
+
+    Args:
+        items: Result dicts (DuckDuckGo text or news format).
+        threshold: Similarity threshold; defaults to DEDUP_SIMILARITY_THRESHOLD.
+
+    Returns:
+        list[dict]: Representatives in original order of their clusters.
+    """
+    if len(items) < 2:
+        return items
+    settings = get_settings()
+    threshold = settings.DEDUP_SIMILARITY_THRESHOLD if threshold is None else threshold
+    allowed = [d.strip().lower() for d in settings.ALLOWED_WEB_DOMAINS.split(",") if d.strip()]
+
+    texts = [" ".join(str(it.get(k) or "") for k in _TEXT_KEYS) for it in items]
+    out = []
+    for cluster in cluster_near_duplicates(texts, threshold):
+        ranked = sorted(
+            cluster, key=lambda i: (_authority(items[i], allowed), -len(texts[i]), i)
+        )
+        keep = dict(items[ranked[0]])
+        if len(ranked) > 1:
+            keep["corroborated_by"] = [
+                {
+                    "title": items[i].get("title"),
+                    "url": _url(items[i]),
+                    "source": items[i].get("source") or urlparse(_url(items[i])).netloc,
+                }
+                for i in ranked[1:]
+            ]
+        out.append((min(cluster), keep))
+    return [keep for _, keep in sorted(out, key=lambda p: p[0])]
+
+
+def dedupe_json(payload: Any) -> Any:
+    """
+    Deduplicate a JSON-encoded list of results; other payloads pass through unchanged.
+
+    Records `dedup_tokens_saved` and `dedup_items_collapsed` on the active run.
+    """
+    if not isinstance(payload, str):
+        return payload
+    try:
+        items = json.loads(payload)
+    except ValueError:
+        return payload
+    if not isinstance(items, list) or not all(isinstance(i, dict) for i in items):
+        return payload
+
+    kept = dedupe_results(items)
+    if len(kept) == len(items):
+        return payload
+    result = json.dumps(kept, indent=2)
+    saved = estimate_tokens(payload) - estimate_tokens(result)
+    record("dedup_items_collapsed", len(items) - len(kept))
+    record("dedup_tokens_saved", max(0, saved))
+    logger.debug(f"Dedup collapsed {len(items) - len(kept)} of {len(items)} results (~{saved} tokens)")
+    return result
+
+
+def _dedupe_wrapper(name: str, fn: Callable[..., Any]) -> Callable[..., Any]:
+    @wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        return dedupe_json(fn(*args, **kwargs))
+
+    return wrapper
+
+
+def dedupe_toolkit(toolkit: Toolkit) -> Toolkit:
+    """Collapse near-duplicate results returned by every function of a search toolkit."""
+    return wrap_toolkit(toolkit, _dedupe_wrapper)
@@ -0,0 +1,402 @@
+# tools/fundamentals.py
+"""
+Fundamentals Engine
+
+Purpose:
+- Compute valuation, profitability, cash-flow and leverage ratios deterministically
+  (NumPy/pandas) instead of asking the LLM to do arithmetic on raw tool output.
+- Emit a ready-made markdown table that agents cite verbatim.
+- Work on many tickers per call: prices come from one bulk `yf.download`, statements
+  are fetched concurrently, and all ratios are computed column-wise in one pass.
+
+Currencies:
+- Statements are in the company's reporting currency (`financialCurrency`); prices are in
+  the listing's trading currency (an ADR trades in USD on a TWD/BRL/CNY reporter, LSE
+  lines are quoted in pence). Market cap is Yahoo's quoted `marketCap` (which reflects
+  ADR ratios) converted into the reporting currency at the latest FX rate, so every
+  valuation ratio compares like with like. When no FX rate is available the
+  cross-currency rows are reported as n/a rather than mixing currencies.
+
+Key Components:
+- load_statements: Latest annual statement line items + share count for one symbol.
+- download_closes: Bulk 1-year daily closes for several symbols.
+- load_fx_rates: Latest FX rates for currency pairs (one bulk download).
+- normalize_currency: Map minor-unit quote currencies (GBp, ZAc, ILA) to ISO codes.
+- compute_fundamentals: Vectorized metrics DataFrame (one row per symbol).
+- fundamentals_markdown: Render the metrics as a markdown table.
+- FundamentalsTools: Agno toolkit exposing `get_fundamentals_table`.
+"""
+
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Callable, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+from agno.tools import Toolkit
+from loguru import logger
+
+from core.config import get_settings
+from tools.finance_tools import normalize_ticker
+from tools.resilience import TRANSIENT_ERRORS
+
+# Raw statement fields (row labels as returned by yfinance) → engine column names
+_STATEMENT_FIELDS = {
+    "income_stmt": {
+        "Total Revenue": "revenue",
+        "Gross Profit": "gross_profit",
+        "Operating Income": "operating_income",
+        "Net Income": "net_income",
+        "EBITDA": "ebitda",
+    },
+    "cashflow": {
+        "Operating Cash Flow": "operating_cash_flow",
+        "Capital Expenditure": "capex",
+    },
+    "balance_sheet": {
+        "Total Debt": "total_debt",
+        "Cash And Cash Equivalents": "cash",
+        "Stockholders Equity": "equity",
+        "Ordinary Shares Number": "shares",
+    },
+}
+# Text columns: reporting currency (statements) and trading currency (prices)
+CURRENCY_COLUMNS = ["currency", "price_currency"]
+RAW_COLUMNS = (
+    [col for fields in _STATEMENT_FIELDS.values() for col in fields.values()]
+    + ["quoted_market_cap"]
+    + CURRENCY_COLUMNS
+)
+
+# Yahoo quotes some venues in minor units: code → (ISO currency, factor to major unit)
+_MINOR_UNITS = {
+    "GBp": ("GBP", 0.01),
+    "GBX": ("GBP", 0.01),
+    "ZAc": ("ZAR", 0.01),
+    "ZAC": ("ZAR", 0.01),
+    "ILA": ("ILS", 0.01),
+}
+
+StatementLoader = Callable[[str], dict]
+PriceLoader = Callable[[list[str]], pd.DataFrame]
+FxLoader = Callable[[list[tuple[str, str]]], dict[tuple[str, str], float]]
+
+
+def normalize_currency(code: Optional[str]) -> tuple[str, float]:
+    """
+    Normalize a Yahoo currency code.
+
+    Returns:
+        tuple[str, float]: ISO code and the factor converting quoted amounts into it
+        (e.g., "GBp" → ("GBP", 0.01)); ("", 1.0) when unknown.
+    """
+    code = (code or "").strip() if isinstance(code, str) else ""
+    if code in _MINOR_UNITS:
+        return _MINOR_UNITS[code]
+    return code.upper(), 1.0
+
+
+def load_statements(symbol: str) -> dict:
+    """
+    Fetch the latest annual statement values for `symbol` from yfinance.
+
+    Returns:
+        dict: Engine column name → value (missing items are NaN); `currency` is the
+        reporting currency, `price_currency` the trading currency and
+        `quoted_market_cap` Yahoo's market cap in the trading currency.
+    """
+    ticker = yf.Ticker(symbol)
+    row: dict = {}
+    for attr, fields in _STATEMENT_FIELDS.items():
+        try:
+            frame = getattr(ticker, attr)
+        except Exception:
+            frame = None
+        latest = (
+            frame.iloc[:, 0] if isinstance(frame, pd.DataFrame) and not frame.empty else pd.Series(dtype=float)
+        )
+        for label, col in fields.items():
+            row[col] = latest.get(label, np.nan)
+    try:
+        info = ticker.info or {}
+    except Exception:
+        info = {}
+    row["currency"] = info.get("financialCurrency") or ""
+    row["price_currency"] = info.get("currency") or ""
+    row["quoted_market_cap"] = info.get("marketCap") or np.nan
+    if not row["price_currency"]:
+        try:
+            row["price_currency"] = ticker.fast_info.get("currency") or ""
+        except Exception:
+            pass
+    return row
+
+
+def download_closes(symbols: list[str], period: str = "1y") -> pd.DataFrame:
+    """
+    Bulk-download daily closes for all `symbols` in a single request.
+
+    Returns:
+        pd.DataFrame: Index = dates, one column per symbol.
+    """
+    data = yf.download(symbols, period=period, auto_adjust=False, progress=False, threads=True)
+    if data is None or data.empty:
+        return pd.DataFrame(columns=symbols, dtype=float)
+    closes = data["Close"]
+    if isinstance(closes, pd.Series):  # single ticker without a MultiIndex
+        closes = closes.to_frame(symbols[0])
+    return closes.reindex(columns=symbols)
+
+
+def load_fx_rates(pairs: list[tuple[str, str]]) -> dict[tuple[str, str], float]:
+    """
+    Latest FX rates for (from, to) currency pairs, in one bulk download.
+
+    Returns:
+        dict: (from, to) → units of `to` per unit of `from`; pairs without a quote are omitted.
+    """
+    if not pairs:
+        return {}
+    symbols = [f"{a}{b}=X" for a, b in pairs]
+    last = download_closes(symbols, period="5d").ffill().iloc[-1:]
+    rates = {}
+    for pair, sym in zip(pairs, symbols):
+        value = last[sym].iloc[0] if not last.empty else np.nan
+        if pd.notna(value) and value > 0:
+            rates[pair] = float(value)
+    return rates
+
+
+def fetch_statements(
+    symbols: list[str],
+    loader: StatementLoader = load_statements,
+    timeout: Optional[float] = None,
+) -> pd.DataFrame:
+    """
+    Load statements for all symbols concurrently into a raw DataFrame.
+
+    Each symbol is fetched independently: one that fails, or is still loading when
+    `timeout` (default: STATEMENT_FETCH_TIMEOUT_SECONDS) expires, gets an all-NaN row
+    instead of failing or stalling the whole group.
+    """
+    timeout = get_settings().STATEMENT_FETCH_TIMEOUT_SECONDS if timeout is None else timeout
+
+    def safe(symbol: str) -> dict:
+        try:
+            return loader(symbol)
+        except Exception:
+            return {}
+
+    pool = ThreadPoolExecutor(max_workers=min(8, max(1, len(symbols))), thread_name_prefix="statements")
+    futures = [pool.submit(safe, symbol) for symbol in symbols]
+    wait(futures, timeout=timeout)
+    # Don't wait for stragglers; their threads finish in the background
+    pool.shutdown(wait=False, cancel_futures=True)
+
+    rows = []
+    for symbol, fut in zip(symbols, futures):
+        if fut.done() and not fut.cancelled():
+            rows.append(fut.result())
+        else:
+            logger.warning(f"Statements for {symbol} not fetched within {timeout:g}s")
+            rows.append({})
+    return pd.DataFrame(rows, index=symbols).reindex(columns=RAW_COLUMNS)
+
+
+def _safe_div(num: pd.Series, den: pd.Series) -> pd.Series:
+    """Element-wise division with NaN for zero/missing denominators."""
+    den = den.where(den != 0)
+    return (num / den).replace([np.inf, -np.inf], np.nan)
+
+
+def compute_fundamentals(
+    symbols: Iterable[str],
+    statements: Optional[pd.DataFrame] = None,
+    closes: Optional[pd.DataFrame] = None,
+    statement_loader: StatementLoader = load_statements,
+    price_loader: PriceLoader = download_closes,
+    fx_loader: FxLoader = load_fx_rates,
+) -> pd.DataFrame:
+    """
+    Compute fundamentals for several tickers in one vectorized pass.
+
+    Args:
+        symbols: Tickers to analyze.
+        statements: Optional pre-fetched raw statements (see `fetch_statements`).
+        closes: Optional pre-fetched daily closes (see `download_closes`).
+        statement_loader / price_loader / fx_loader: Data sources (injectable for tests
+            and batch runs).
+
+    Returns:
+        pd.DataFrame: One row per symbol with price and 52-week range (trading currency),
+        market cap, EV, P/E, EV/EBITDA, margins, FCF, FCF yield and leverage ratios
+        (reporting currency).
+    """
+    symbols = list(dict.fromkeys(normalize_ticker(s) for s in symbols if s.strip()))
+    raw = statements if statements is not None else fetch_statements(symbols, statement_loader)
+    raw = raw.reindex(index=symbols, columns=RAW_COLUMNS)
+    px = closes if closes is not None else price_loader(symbols)
+    px = px.reindex(columns=symbols).astype(float)
+
+    num = raw.drop(columns=CURRENCY_COLUMNS).apply(pd.to_numeric, errors="coerce")
+    out = pd.DataFrame(index=symbols)
+
+    # Currencies: statements in the reporting currency, prices in the trading currency
+    reporting = raw["currency"].map(lambda c: normalize_currency(c)[0])
+    quoted = raw["price_currency"].map(normalize_currency)
+    trading = quoted.map(lambda q: q[0]).where(lambda t: t != "", reporting)
+    unit = quoted.map(lambda q: q[1]).astype(float)
+    reporting = reporting.where(reporting != "", trading)
+    out["currency"] = reporting
+    out["price_currency"] = trading
+
+    pairs = sorted({(t, r) for t, r in zip(trading, reporting) if t and r and t != r})
+    rates = fx_loader(pairs) if pairs else {}
+    fx = pd.Series(
+        [1.0 if t == r else rates.get((t, r), np.nan) for t, r in zip(trading, reporting)],
+        index=symbols,
+    )
+
+    # Price history (column-wise over the whole panel), in major units of the trading currency
+    px = px.mul(unit, axis=1)
+    out["price"] = px.ffill().iloc[-1] if not px.empty else np.nan
+    out["high_52w"] = px.max()
+    out["low_52w"] = px.min()
+    out["pct_from_high"] = _safe_div(out["price"], out["high_52w"]) - 1
+
+    # Valuation: Yahoo's market cap accounts for ADR ratios; price × statement shares is
+    # only a fallback when the listing trades in the reporting currency
+    computed_cap = out["price"] * num["shares"]
+    quoted_cap = num["quoted_market_cap"]
+    # Minor-unit listings may report the cap in minor units too
+    in_minor_units = (unit != 1) & (_safe_div(quoted_cap, computed_cap) > 50)
+    quoted_cap = quoted_cap.where(~in_minor_units, quoted_cap * unit)
+    trading_cap = quoted_cap.fillna(computed_cap.where(trading == reporting))
+    out["market_cap"] = trading_cap * fx
+    out["enterprise_value"] = out["market_cap"] + num["total_debt"].fillna(0) - num["cash"].fillna(0)
+    # P/E is not meaningful for loss-making companies
+    out["pe"] = _safe_div(out["market_cap"], num["net_income"].where(num["net_income"] > 0))
+    out["ev_ebitda"] = _safe_div(out["enterprise_value"], num["ebitda"].where(num["ebitda"] > 0))
+
+    # Profitability
+    out["revenue"] = num["revenue"]
+    out["gross_margin"] = _safe_div(num["gross_profit"], num["revenue"])
+    out["operating_margin"] = _safe_div(num["operating_income"], num["revenue"])
+    out["net_margin"] = _safe_div(num["net_income"], num["revenue"])
+
+    # Cash flow (yfinance reports capex as a negative number)
+    out["fcf"] = num["operating_cash_flow"] - num["capex"].abs()
+    out["fcf_yield"] = _safe_div(out["fcf"], out["market_cap"])
+
+    # Leverage
+    out["net_debt"] = num["total_debt"] - num["cash"]
+    out["net_debt_ebitda"] = _safe_div(out["net_debt"], num["ebitda"].where(num["ebitda"] > 0))
+    out["debt_equity"] = _safe_div(num["total_debt"], num["equity"].where(num["equity"] > 0))
+    return out
+
+
+# Display rows: (column, label, formatter kind)
+_DISPLAY_ROWS = [
+    ("price", "Price", "num"),
+    ("high_52w", "52w High", "num"),
+    ("low_52w", "52w Low", "num"),
+    ("pct_from_high", "% from 52w High", "pct"),
+    ("market_cap", "Market Cap", "money"),
+    ("enterprise_value", "Enterprise Value", "money"),
+    ("pe", "P/E", "multiple"),
+    ("ev_ebitda", "EV/EBITDA", "multiple"),
+    ("revenue", "Revenue", "money"),
+    ("gross_margin", "Gross Margin", "pct"),
+    ("operating_margin", "Operating Margin", "pct"),
+    ("net_margin", "Net Margin", "pct"),
+    ("fcf", "Free Cash Flow", "money"),
+    ("fcf_yield", "FCF Yield", "pct"),
+    ("net_debt_ebitda", "Net Debt/EBITDA", "multiple"),
+    ("debt_equity", "Debt/Equity", "multiple"),
+]
+
+
+def format_value(value: float, kind: str) -> str:
+    """Format one metric for display; missing values render as 'n/a'."""
+    if value is None or pd.isna(value):
+        return "n/a"
+    if kind == "pct":
+        return f"{value * 100:.1f}%"
+    if kind == "multiple":
+        return f"{value:.1f}x"
+    if kind == "money":
+        for size, suffix in ((1e12, "T"), (1e9, "B"), (1e6, "M")):
+            if abs(value) >= size:
+                return f"{value / size:.2f}{suffix}"
+        return f"{value:,.0f}"
+    return f"{value:,.2f}"
+
+
+def markdown_table(header: list[str], rows: list[list[str]]) -> str:
+    """Render a simple GitHub-flavored markdown table."""
+    lines = ["| " + " | ".join(header) + " |", "|" + "|".join("---" for _ in header) + "|"]
+    lines += ["| " + " | ".join(r) + " |" for r in rows]
+    return "\n".join(lines)
+
+
+def fundamentals_markdown(metrics: pd.DataFrame) -> str:
+    """
+    Render `compute_fundamentals` output as a metrics × tickers markdown table.
+
+    Prices are in the trading currency and all other monetary values in the reporting
+    currency; the header shows both when they differ.
+    """
+
+    def label(sym: str, reporting: str, trading: str) -> str:
+        if reporting and trading and reporting != trading:
+            return f"{sym} (price {trading}; financials {reporting})"
+        return f"{sym} ({reporting or trading})" if reporting or trading else sym
+
+    header = ["Metric"] + [
+        label(sym, rep_cur, trd_cur)
+        for sym, rep_cur, trd_cur in zip(metrics.index, metrics["currency"], metrics["price_currency"])
+    ]
+    rows = [
+        [label] + [format_value(v, kind) for v in metrics[col]]
+        for col, label, kind in _DISPLAY_ROWS
+    ]
+    return markdown_table(header, rows)
+
+
+class FundamentalsTools(Toolkit):
+    """
+    Agno toolkit exposing the deterministic fundamentals engine.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(name="fundamentals_tools", tools=[self.get_fundamentals_table], **kwargs)
+
+    def get_fundamentals_table(self, symbols: str) -> str:
+        """
+        Use this function to get a precomputed fundamentals table for one or more tickers.
+        It returns price, 52-week high/low, market cap, EV, P/E, EV/EBITDA, margins, free
+        cash flow, FCF yield and leverage, computed from the latest annual statements.
+        Cite these numbers as-is instead of recomputing them.
+
+        Args:
+            symbols (str): Comma-separated tickers, e.g. "BBAS3.SA" or "ITUB4.SA,BBDC4.SA".
+
+        Returns:
+            str: A markdown table (metrics × tickers) or an error message.
+        """
+        tickers = [s for s in symbols.split(",") if s.strip()]
+        if not tickers:
+            return "Error: no symbols provided"
+        try:
+            metrics = compute_fundamentals(tickers)
+        except TRANSIENT_ERRORS:
+            raise  # let the resilience layer retry / count it
+        except Exception as e:
+            return f"Error computing fundamentals for {symbols}: {e}"
+        if metrics.drop(columns=CURRENCY_COLUMNS).isna().all(axis=None):
+            return f"Could not fetch fundamentals data for {symbols}"
+        return (
+            fundamentals_markdown(metrics)
+            + "\n\nSource: Yahoo Finance statements (latest annual) and 1y daily closes; "
+            "computed deterministically."
+        )
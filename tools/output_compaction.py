@@ -0,0 +1,333 @@
+# tools/output_compaction.py
+"""
+Tool Output Compaction
+
+Purpose:
+- Some YFinance tools return full price histories, raw statement dumps and the complete
+  `info` dict as JSON. That text goes straight into the model context and is paid for
+  again on every later turn.
+- Oversized tool results are replaced by a compact JSON summary under a token budget:
+    * Price histories → OHLC summary (return, range, volume, volatility) plus bars
+      resampled to weekly / monthly / quarterly, whichever fits.
+    * Financial statements → key line items for the latest periods.
+    * Quote/info dicts → an allow-list of analysis-relevant fields.
+    * Other JSON lists/dicts → leading items only.
+- The untouched payload is kept in a bounded in-memory store; the summary carries a
+  `full_output_ref` that an agent can pass to `get_full_tool_output` when it really
+  needs the raw data.
+
+Key Components:
+- compact_tool_output: Pure payload → compact payload (or unchanged when within budget).
+- ToolOutputStore / get_tool_output_store: Bounded store of full payloads by reference.
+- compact_toolkit: Apply compaction to every function of a toolkit (e.g., YFinanceTools).
+- FullToolOutputTools: Agno toolkit exposing `get_full_tool_output`.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from functools import lru_cache, wraps
+from typing import Any, Callable, Optional
+
+import numpy as np
+import pandas as pd
+from agno.tools import Toolkit
+
+from core.config import get_settings
+from core.guardrails import CHARS_PER_TOKEN, estimate_tokens
+from core.run_stats import record
+from tools.wrappers import wrap_toolkit
+
+# Resampling candidates from finest to coarsest (pandas offset aliases)
+_RESAMPLE_RULES = (("W-FRI", "weekly"), ("ME", "monthly"), ("QE", "quarterly"))
+_MAX_BARS = 26
+_MAX_PERIODS = 4
+_MAX_ITEMS = 10
+
+# Statement line items worth keeping (income statement, balance sheet, cash flow)
+STATEMENT_FIELDS = (
+    "Total Revenue",
+    "Gross Profit",
+    "Operating Income",
+    "EBITDA",
+    "Normalized EBITDA",
+    "Pretax Income",
+    "Tax Provision",
+    "Net Income",
+    "Net Income Common Stockholders",
+    "Diluted EPS",
+    "Interest Expense",
+    "Total Assets",
+    "Total Liabilities Net Minority Interest",
+    "Stockholders Equity",
+    "Total Debt",
+    "Net Debt",
+    "Cash And Cash Equivalents",
+    "Operating Cash Flow",
+    "Capital Expenditure",
+    "Free Cash Flow",
+)
+
+# Quote/info fields worth keeping from `Ticker.info`
+INFO_FIELDS = (
+    "symbol",
+    "shortName",
+    "longName",
+    "exchange",
+    "currency",
+    "financialCurrency",
+    "sector",
+    "industry",
+    "country",
+    "currentPrice",
+    "previousClose",
+    "marketCap",
+    "enterpriseValue",
+    "trailingPE",
+    "forwardPE",
+    "priceToBook",
+    "enterpriseToEbitda",
+    "enterpriseToRevenue",
+    "trailingEps",
+    "forwardEps",
+    "dividendYield",
+    "payoutRatio",
+    "beta",
+    "fiftyTwoWeekHigh",
+    "fiftyTwoWeekLow",
+    "fiftyDayAverage",
+    "twoHundredDayAverage",
+    "profitMargins",
+    "operatingMargins",
+    "grossMargins",
+    "ebitdaMargins",
+    "returnOnEquity",
+    "returnOnAssets",
+    "revenueGrowth",
+    "earningsGrowth",
+    "totalCash",
+    "totalDebt",
+    "debtToEquity",
+    "freeCashflow",
+    "operatingCashflow",
+    "recommendationKey",
+    "targetMeanPrice",
+    "numberOfAnalystOpinions",
+)
+
+
+class ToolOutputStore:
+    """
+    Bounded LRU of full tool payloads, addressed by a short content hash.
+    """
+
+    def __init__(self, max_items: int = 64):
+        self.max_items = max(1, max_items)
+        self._items: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, payload: str) -> str:
+        """Store `payload` and return its reference."""
+        ref = hashlib.blake2b(payload.encode("utf-8"), digest_size=6).hexdigest()
+        with self._lock:
+            self._items[ref] = payload
+            self._items.move_to_end(ref)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+        return ref
+
+    def get(self, ref: str) -> Optional[str]:
+        """Full payload for `ref`, or None when unknown or evicted."""
+        with self._lock:
+            return self._items.get(ref.strip())
+
+
+@lru_cache
+def get_tool_output_store() -> ToolOutputStore:
+    """Process-wide store of full tool payloads."""
+    return ToolOutputStore(get_settings().TOOL_OUTPUT_REF_CACHE_SIZE)
+
+
+def _is_epoch_key(key: Any) -> bool:
+    return isinstance(key, str) and key.isdigit() and 9 <= len(key) <= 13
+
+
+def _date(ms_key: str) -> str:
+    return pd.to_datetime(int(ms_key), unit="ms" if len(ms_key) > 10 else "s").strftime("%Y-%m-%d")
+
+
+def _num(value: Any, digits: int = 4) -> Any:
+    if value is None or (isinstance(value, float) and not np.isfinite(value)):
+        return None
+    return round(float(value), digits) if isinstance(value, (int, float, np.number)) else value
+
+
+def _price_history(data: dict, budget: int) -> dict:
+    """OHLC summary plus resampled bars for a {epoch_ms: {Open, High, Low, Close, ...}} payload."""
+    frame = pd.DataFrame.from_dict(data, orient="index")
+    frame.index = pd.to_datetime(frame.index.astype("int64"), unit="ms")
+    frame = frame.sort_index().apply(pd.to_numeric, errors="coerce")
+    close = frame["Close"].dropna()
+    high = frame.get("High", close)
+    low = frame.get("Low", close)
+    summary = {
+        "start": f"{frame.index[0]:%Y-%m-%d}",
+        "end": f"{frame.index[-1]:%Y-%m-%d}",
+        "sessions": int(len(frame)),
+        "first_close": _num(close.iloc[0]),
+        "last_close": _num(close.iloc[-1]),
+        "change_pct": _num((close.iloc[-1] / close.iloc[0] - 1) * 100, 2) if close.iloc[0] else None,
+        "period_high": {"value": _num(high.max()), "date": f"{high.idxmax():%Y-%m-%d}"},
+        "period_low": {"value": _num(low.min()), "date": f"{low.idxmin():%Y-%m-%d}"},
+        "ann_volatility_pct": _num(close.pct_change().std() * np.sqrt(252) * 100, 2),
+    }
+    if "Volume" in frame:
+        summary["avg_volume"] = _num(frame["Volume"].mean(), 0)
+    if "Dividends" in frame and frame["Dividends"].fillna(0).sum():
+        summary["dividends_total"] = _num(frame["Dividends"].sum())
+
+    out: dict[str, Any] = {"kind": "price_history", "summary": summary}
+    aggregations = {c: a for c, a in (("Open", "first"), ("High", "max"), ("Low", "min"), ("Close", "last"), ("Volume", "sum")) if c in frame}
+    for rule, label in _RESAMPLE_RULES:
+        bars = frame.resample(rule).agg(aggregations).dropna(subset=["Close"])
+        rows = [
+            {"date": f"{ts:%Y-%m-%d}", **{c.lower(): _num(v, 0 if c == "Volume" else 4) for c, v in row.items()}}
+            for ts, row in bars.iterrows()
+        ]
+        candidate = {**out, "resampled": {"frequency": label, "bars": rows}}
+        if len(rows) <= _MAX_BARS and estimate_tokens(json.dumps(candidate)) <= budget:
+            return candidate
+    return out
+
+
+def _statement(data: dict) -> dict:
+    """Key line items for the latest periods of a {line_item: {epoch_ms: value}} payload."""
+    periods = sorted({k for row in data.values() for k in row}, reverse=True)[:_MAX_PERIODS]
+    items = [f for f in STATEMENT_FIELDS if f in data] or list(data)[:_MAX_ITEMS * 2]
+    return {
+        "kind": "statement",
+        "periods": [_date(p) for p in periods],
+        "line_items": {f: [_num(data[f].get(p)) for p in periods] for f in items},
+        "omitted_line_items": len(data) - len(items),
+    }
+
+
+def _info(data: dict) -> dict:
+    """Allow-listed quote/info fields of a flat `Ticker.info` style dict."""
+    kept = {k: data[k] for k in INFO_FIELDS if data.get(k) is not None}
+    return {"kind": "quote_info", "fields": kept, "omitted_fields": len(data) - len(kept)}
+
+
+def _generic(data: Any) -> dict:
+    if isinstance(data, list):
+        return {"kind": "list", "items": data[:_MAX_ITEMS], "omitted_items": max(0, len(data) - _MAX_ITEMS)}
+    keys = list(data)[:_MAX_ITEMS]
+    return {"kind": "object", "items": {k: data[k] for k in keys}, "omitted_keys": len(data) - len(keys)}
+
+
+def _summarize(data: Any, budget: int) -> Optional[dict]:
+    if isinstance(data, dict) and data:
+        values = list(data.values())
+        if all(_is_epoch_key(k) for k in data) and all(isinstance(v, dict) and "Close" in v for v in values):
+            return _price_history(data, budget)
+        if all(isinstance(v, dict) for v in values) and all(
+            _is_epoch_key(k) for v in values for k in v
+        ):
+            return _statement(data)
+        if sum(not isinstance(v, (dict, list)) for v in values) >= 0.8 * len(values):
+            return _info(data)
+    if isinstance(data, (dict, list)):
+        return _generic(data)
+    return None
+
+
+def compact_tool_output(payload: Any, budget_tokens: Optional[int] = None) -> Any:
+    """
+    Replace an oversized JSON tool result with a compact summary under `budget_tokens`.
+
+    Payloads within budget, non-string results and non-JSON text are returned unchanged.
+    The full payload stays retrievable through the returned `full_output_ref`.
+
+    Args:
+        payload: The tool's return value.
+        budget_tokens: Token cap (defaults to TOOL_OUTPUT_TOKEN_BUDGET).
+
+    Returns:
+        Any: The original payload or a compact JSON string.
+    """
+    budget = budget_tokens or get_settings().TOOL_OUTPUT_TOKEN_BUDGET
+    if not isinstance(payload, str) or estimate_tokens(payload) <= budget:
+        return payload
+    try:
+        data = json.loads(payload)
+    except ValueError:
+        return payload
+
+    try:
+        summary = _summarize(data, budget)
+    except Exception:
+        summary = None  # unexpected shape: fall back to plain truncation
+    ref = get_tool_output_store().put(payload)
+    raw_tokens = estimate_tokens(payload)
+    note = (
+        f"Compacted from ~{raw_tokens} tokens. Call get_full_tool_output(ref=\"{ref}\") "
+        "only if the raw data is required."
+    )
+    result = json.dumps({**(summary or {}), "full_output_ref": ref, "note": note}, default=str)
+    if estimate_tokens(result) > budget:
+        # Hard cap: keep the head of the summary and the reference/note
+        tail = json.dumps({"full_output_ref": ref, "note": note})
+        room = max(0, budget * CHARS_PER_TOKEN - len(tail) - 40)
+        result = json.dumps({"truncated_summary": result[:room], "full_output_ref": ref, "note": note})
+
+    record("tool_tokens_raw", raw_tokens)
+    record("tool_tokens_compacted", estimate_tokens(result))
+    return result
+
+
+def _compaction_wrapper(name: str, fn: Callable[..., Any]) -> Callable[..., Any]:
+    @wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        result = fn(*args, **kwargs)
+        if not get_settings().TOOL_OUTPUT_COMPACTION_ENABLED:
+            return result
+        return compact_tool_output(result)
+
+    return wrapper
+
+
+def compact_toolkit(toolkit: Toolkit) -> Toolkit:
+    """Cap every function result of `toolkit` at the tool-output token budget."""
+    return wrap_toolkit(toolkit, _compaction_wrapper)
+
+
+class FullToolOutputTools(Toolkit):
+    """
+    Agno toolkit returning the raw payload behind a compacted tool result.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(name="tool_output_tools", tools=[self.get_full_tool_output], **kwargs)
+
+    def get_full_tool_output(self, ref: str, offset: int = 0, max_chars: int = 16000) -> str:
+        """
+        Use this function only when a compacted tool result (one with "full_output_ref")
+        lacks a value you explicitly need; it returns the raw payload in pages.
+
+        Args:
+            ref (str): The "full_output_ref" value from the compacted result.
+            offset (int): Character offset to start from (for the next page).
+            max_chars (int): Page size in characters.
+
+        Returns:
+            str: A page of the raw payload, or an error message.
+        """
+        payload = get_tool_output_store().get(ref)
+        if payload is None:
+            return f"Error: unknown or expired tool output reference {ref}"
+        page = payload[offset : offset + max(1, max_chars)]
+        end = offset + len(page)
+        if end < len(payload):
+            page += f"\n[... {len(payload) - end} more characters; call again with offset={end}]"
+        return page
@@ -0,0 +1,216 @@
+# tools/peers.py
+"""
+Peer Comparison
+
+Purpose:
+- Replace N per-peer tool round trips in the "Competitive/sector context" section with
+  one bulk data path and one compact comparison table.
+- Peers are resolved from the local ticker index (same industry, then same sector),
+  preferring the target's own exchange so currencies line up.
+- Prices for the whole group come from a single `yf.download`; key statistics reuse the
+  vectorized fundamentals engine; relative valuation and performance are computed
+  column-wise over the group.
+- yfinance has no bulk key-statistics endpoint, so statements (and quote info) are fetched
+  per ticker, concurrently, each under its own deadline (STATEMENT_FETCH_TIMEOUT_SECONDS,
+  below the tool timeout): a slow or failing peer becomes an n/a row instead of timing
+  out, and retrying, the whole group.
+- Ratios are currency-consistent per ticker (see `tools.fundamentals`), so peers listed
+  in other currencies or as ADRs compare like with like.
+
+Key Components:
+- resolve_peers: Pick peer tickers for a symbol from the reference index.
+- compute_peer_comparison: Metrics + performance DataFrame for target and peers.
+- peer_comparison_markdown: Render the comparison table and premium/discount summary.
+- PeerComparisonTools: Agno toolkit exposing `get_peer_comparison`.
+"""
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from agno.tools import Toolkit
+
+from core.ticker_index import TickerIndex, get_ticker_index
+from tools.finance_tools import normalize_ticker
+from tools.fundamentals import (
+    FxLoader,
+    PriceLoader,
+    StatementLoader,
+    compute_fundamentals,
+    download_closes,
+    format_value,
+    load_fx_rates,
+    load_statements,
+    markdown_table,
+)
+from tools.resilience import TRANSIENT_ERRORS
+
+# Trading-day lookbacks for trailing returns
+_RETURN_WINDOWS = {"ret_1m": 21, "ret_3m": 63, "ret_6m": 126, "ret_1y": 252}
+
+# Comparison columns: (column, label, formatter kind)
+_PEER_COLUMNS = [
+    ("pe", "P/E", "multiple"),
+    ("ev_ebitda", "EV/EBITDA", "multiple"),
+    ("net_margin", "Net Margin", "pct"),
+    ("fcf_yield", "FCF Yield", "pct"),
+    ("net_debt_ebitda", "ND/EBITDA", "multiple"),
+    ("ret_1m", "1M", "pct"),
+    ("ret_3m", "3M", "pct"),
+    ("ret_1y", "1Y", "pct"),
+    ("volatility", "Vol (ann.)", "pct"),
+]
+
+
+def resolve_peers(symbol: str, max_peers: int = 5, index: Optional[TickerIndex] = None) -> list[str]:
+    """
+    Resolve a peer group for `symbol` from the ticker index.
+
+    Rules:
+        - Same industry first, then same sector to fill up to `max_peers`.
+        - The target's own ADR/local pair is excluded (same company).
+        - Only one listing per company (an ADR and its local line count once).
+        - Listings on the target's exchange come first.
+
+    Returns:
+        list[str]: Peer symbols (may be empty when the symbol is unknown).
+    """
+    index = index or get_ticker_index()
+    target = index.get(symbol)
+    if target is None:
+        return []
+
+    taken = {target.symbol, target.adr_pair}
+    peers: list[str] = []
+    for same in ("industry", "sector"):
+        value = getattr(target, same)
+        if not value:
+            continue
+        candidates = sorted(
+            (r for r in index.records() if getattr(r, same) == value),
+            key=lambda r: (r.exchange != target.exchange, r.symbol),
+        )
+        for rec in candidates:
+            if len(peers) >= max_peers:
+                return peers
+            if rec.symbol in taken:
+                continue
+            peers.append(rec.symbol)
+            taken.update({rec.symbol, rec.adr_pair})
+    return peers
+
+
+def price_performance(closes: pd.DataFrame) -> pd.DataFrame:
+    """
+    Trailing returns and annualized volatility for every column of `closes`.
+
+    Returns:
+        pd.DataFrame: One row per symbol with ret_1m/3m/6m/1y and volatility.
+    """
+    px = closes.astype(float).ffill()
+    out = pd.DataFrame(index=closes.columns)
+    if px.empty:
+        for col in list(_RETURN_WINDOWS) + ["volatility"]:
+            out[col] = np.nan
+        return out
+    last = px.iloc[-1]
+    for col, days in _RETURN_WINDOWS.items():
+        # Fall back to the first available close when history is shorter than the window
+        base = px.iloc[max(0, len(px) - 1 - days)]
+        out[col] = (last / base.where(base != 0)) - 1
+    out["volatility"] = px.pct_change(fill_method=None).std() * np.sqrt(252)
+    return out
+
+
+def compute_peer_comparison(
+    symbol: str,
+    peers: Optional[list[str]] = None,
+    statement_loader: StatementLoader = load_statements,
+    price_loader: PriceLoader = download_closes,
+    fx_loader: FxLoader = load_fx_rates,
+) -> pd.DataFrame:
+    """
+    Build the comparison frame for `symbol` and its peers in one bulk pass.
+
+    Args:
+        symbol: Target ticker.
+        peers: Explicit peer list; resolved from the ticker index when omitted.
+        statement_loader / price_loader / fx_loader: Data sources (injectable for tests).
+
+    Returns:
+        pd.DataFrame: Target first, then peers; fundamentals + performance columns.
+    """
+    target = normalize_ticker(symbol)
+    peer_list = [normalize_ticker(p) for p in (peers if peers is not None else resolve_peers(target))]
+    group = list(dict.fromkeys([target] + [p for p in peer_list if p]))
+
+    closes = price_loader(group)  # one bulk download for the whole group
+    metrics = compute_fundamentals(
+        group, closes=closes, statement_loader=statement_loader, fx_loader=fx_loader
+    )
+    return metrics.join(price_performance(closes.reindex(columns=group)))
+
+
+def peer_comparison_markdown(frame: pd.DataFrame) -> str:
+    """
+    Render the comparison table (target in bold, plus a peer-median row) followed by the
+    target's premium/discount to the peer median on P/E and EV/EBITDA.
+    """
+    target = frame.index[0]
+    peers = frame.iloc[1:]
+    median = peers[[c for c, _, _ in _PEER_COLUMNS]].median(numeric_only=True)
+
+    header = ["Ticker"] + [label for _, label, _ in _PEER_COLUMNS]
+    rows = []
+    for sym, row in frame.iterrows():
+        name = f"**{sym}**" if sym == target else sym
+        rows.append([name] + [format_value(row[c], kind) for c, _, kind in _PEER_COLUMNS])
+    rows.append(["Peer median"] + [format_value(median.get(c), kind) for c, _, kind in _PEER_COLUMNS])
+    table = markdown_table(header, rows)
+
+    notes = []
+    for col, label in (("pe", "P/E"), ("ev_ebitda", "EV/EBITDA")):
+        value, med = frame.loc[target, col], median.get(col)
+        if pd.notna(value) and pd.notna(med) and med:
+            gap = value / med - 1
+            notes.append(f"{label} {abs(gap) * 100:.0f}% {'premium' if gap >= 0 else 'discount'}")
+    summary = (
+        f"{target} vs peer median: " + ", ".join(notes) if notes else f"{target} vs peer median: n/a"
+    )
+    return f"{table}\n\n{summary}"
+
+
+class PeerComparisonTools(Toolkit):
+    """
+    Agno toolkit returning a bulk-fetched peer comparison table.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(name="peer_comparison_tools", tools=[self.get_peer_comparison], **kwargs)
+
+    def get_peer_comparison(self, symbol: str, peers: str = "") -> str:
+        """
+        Use this function to get a relative valuation and performance table for a ticker
+        versus its sector peers, in a single call (do not fetch peers one by one).
+
+        Args:
+            symbol (str): The target ticker, e.g. "BBAS3.SA".
+            peers (str): Optional comma-separated peer tickers; resolved automatically if empty.
+
+        Returns:
+            str: A markdown comparison table with a premium/discount summary, or an error message.
+        """
+        peer_list = [p for p in peers.split(",") if p.strip()] or None
+        try:
+            frame = compute_peer_comparison(symbol, peer_list)
+        except TRANSIENT_ERRORS:
+            raise  # let the resilience layer retry / count it
+        except Exception as e:
+            return f"Error building peer comparison for {symbol}: {e}"
+        if len(frame) < 2:
+            return f"Could not resolve a peer group for {symbol}"
+        return (
+            peer_comparison_markdown(frame)
+            + "\n\nSource: Yahoo Finance (bulk 1y daily closes, latest annual statements); "
+            "peers from the local ticker index."
+        )
@@ -0,0 +1,379 @@
+# tools/resilience.py
+"""
+Tool Resilience Layer
+
+Purpose:
+- Keep one slow or flapping data provider (yfinance, DuckDuckGo) from stalling the whole
+  agent loop.
+- Every wrapped tool call gets a hard timeout, retries with jittered exponential backoff,
+  a per-provider circuit breaker and, optionally, a hedged duplicate request.
+- When a provider is unavailable the tool returns an explicit "DATA UNAVAILABLE" string,
+  so the LLM reports a data gap instead of waiting or guessing.
+
+Key Components:
+- CircuitBreaker: closed → open after N consecutive failures → half-open probe after a cooldown.
+- ResiliencePolicy: timeout / retry / backoff / hedging knobs (see `from_settings`).
+- harden_toolkit: Apply a policy and a shared breaker to every function of a Toolkit.
+- TRANSIENT_ERRORS / is_transient_yfinance_error: What counts as a retryable failure.
+
+Notes:
+- Sync tools are executed on a shared thread pool so a timeout can be enforced. A timed-out
+  call cannot be killed; its thread finishes in the background and its result is dropped.
+- Only wrap idempotent reads when hedging is enabled: the duplicate request may also run.
+- Only transient provider errors (raised transport/HTTP exceptions, rate limits, timeouts)
+  are retried and counted by the breaker. Deterministic errors — an unknown symbol, a
+  "no results" search — pass through untouched, so bad input can't open a provider's
+  circuit for every other run.
+- Toolkits that swallow exceptions into strings (agno's YFinanceTools returns
+  "Error fetching ... for AAPL: <exception>") need a policy `is_failure` predicate that
+  recognizes the transient ones; see `is_transient_yfinance_error`.
+- A timed-out attempt is not retried, and every call is bounded by `budget` seconds in
+  total (attempts plus backoff), so a tool never outlives the run's time limit.
+"""
+
+import contextvars
+import random
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from functools import wraps
+from typing import Any, Callable, Optional
+
+import httpx
+from agno.tools import Toolkit
+from ddgs.exceptions import RatelimitException, TimeoutException
+from loguru import logger
+from yfinance.exceptions import YFRateLimitError
+
+from core.config import get_settings
+from tools.wrappers import wrap_toolkit
+
+UNAVAILABLE_PREFIX = "DATA UNAVAILABLE"
+
+# Shared worker pool for tool calls (sized for hedged duplicates across concurrent runs)
+_EXECUTOR = ThreadPoolExecutor(max_workers=32, thread_name_prefix="tool-call")
+
+
+# Raised errors worth retrying: network/HTTP failures (requests and curl_cffi errors are
+# OSError subclasses), httpx transport/status errors and provider rate limits / timeouts
+# (DDGS raises its own, which are not OSErrors)
+TRANSIENT_ERRORS: tuple[type[BaseException], ...] = (
+    OSError,
+    httpx.TransportError,
+    httpx.HTTPStatusError,
+    YFRateLimitError,
+    RatelimitException,
+    TimeoutException,
+)
+
+# Exception text (as embedded in YFinanceTools' "Error ..." strings) of transient failures:
+# rate limits, curl/requests network errors, timeouts and 429/5xx responses
+_TRANSIENT_TEXT_RE = re.compile(
+    r"Too Many Requests|Rate ?limit|curl: \(\d+\)|Failed to perform|timed? ?out"
+    r"|Connection (?:aborted|refused|reset|error)|Max retries exceeded|Could not resolve host"
+    r"|HTTP Error (?:429|5\d\d)|\b5\d\d (?:Server Error|Bad Gateway|Service Unavailable)",
+    re.IGNORECASE,
+)
+
+
+def is_transient_error(exc: BaseException) -> bool:
+    """True for provider/transport errors that may succeed on retry (timeouts included)."""
+    return isinstance(exc, TRANSIENT_ERRORS)
+
+
+def never_failure(result: Any) -> bool:
+    """
+    Default in-band failure predicate: returned values are never failures.
+
+    Toolkits that report bad input as a string (e.g., "Error fetching ... for symbol XYZ")
+    are answering deterministically; retrying cannot help and must not trip the breaker.
+    """
+    return False
+
+
+def is_transient_yfinance_error(result: Any) -> bool:
+    """
+    In-band failure predicate for agno's YFinanceTools.
+
+    Every YFinanceTools function catches its exceptions and returns
+    "Error fetching <what> for <symbol>: <exception>". Network and rate-limit errors are
+    transient failures; anything else (unknown symbol, missing field) is a real answer.
+    """
+    return (
+        isinstance(result, str)
+        and result.startswith(("Error fetching", "Error getting"))
+        and _TRANSIENT_TEXT_RE.search(result) is not None
+    )
+
+
+def unavailable_message(tool_name: str, reason: str) -> str:
+    """Build the tool result the LLM sees when data cannot be fetched."""
+    return (
+        f"{UNAVAILABLE_PREFIX}: `{tool_name}` failed ({reason}). "
+        "Do not retry or estimate this value; report it under Data Gaps."
+    )
+
+
+class CircuitBreaker:
+    """
+    Per-provider circuit breaker.
+
+    States:
+        closed: calls flow normally; consecutive failures are counted.
+        open: calls fail fast until `reset_timeout` seconds have elapsed.
+        half_open: a single probe call is allowed; success closes, failure re-opens.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        """Current breaker state: 'closed', 'open' or 'half_open'."""
+        return self._state
+
+    def allow(self) -> bool:
+        """Return True if a call may proceed (may transition open → half_open)."""
+        with self._lock:
+            if self._state == "closed":
+                return True
+            if self._state == "open":
+                if self._clock() - self._opened_at < self.reset_timeout:
+                    return False
+                self._state = "half_open"
+                self._probing = True
+                return True
+            # half_open: only one probe at a time
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self) -> None:
+        """Close the breaker and reset the failure count."""
+        with self._lock:
+            self._state = "closed"
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        """Count a failure; open the breaker at the threshold or after a failed probe."""
+        with self._lock:
+            self._failures += 1
+            if self._state == "half_open" or self._failures >= self.failure_threshold:
+                if self._state != "open":
+                    logger.warning(f"Circuit breaker '{self.name}' opened")
+                self._state = "open"
+                self._opened_at = self._clock()
+                self._probing = False
+
+
+class ResiliencePolicy:
+    """
+    Knobs for a resilient tool call.
+
+    Attributes:
+        timeout: Hard limit (seconds) for one attempt, hedged duplicate included.
+        retries: Extra attempts after a transient (raised) failure; never after a timeout.
+        budget: Total time limit (seconds) for one call, attempts and backoff included.
+        backoff_base / backoff_max: Full-jitter exponential backoff bounds (seconds).
+        hedge_after: Send a duplicate request if no answer after this many seconds
+            (None or 0 disables hedging).
+        is_failure: Predicate flagging in-band results that should count as transient
+            failures (none by default).
+    """
+
+    def __init__(
+        self,
+        timeout: float = 15.0,
+        retries: int = 2,
+        budget: Optional[float] = None,
+        backoff_base: float = 0.5,
+        backoff_max: float = 4.0,
+        hedge_after: Optional[float] = None,
+        is_failure: Callable[[Any], bool] = never_failure,
+    ):
+        self.timeout = timeout
+        self.retries = retries
+        self.budget = budget or timeout * (retries + 1)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge_after = hedge_after or None
+        self.is_failure = is_failure
+
+    @classmethod
+    def from_settings(cls, **overrides: Any) -> "ResiliencePolicy":
+        """Build the default policy from application settings (`overrides` win)."""
+        s = get_settings()
+        params: dict[str, Any] = dict(
+            timeout=s.TOOL_TIMEOUT_SECONDS,
+            retries=s.TOOL_MAX_RETRIES,
+            budget=s.TOOL_CALL_BUDGET_SECONDS,
+            backoff_base=s.TOOL_BACKOFF_BASE_SECONDS,
+            backoff_max=s.TOOL_BACKOFF_MAX_SECONDS,
+            hedge_after=s.TOOL_HEDGE_AFTER_SECONDS,
+        )
+        params.update(overrides)
+        return cls(**params)
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter backoff delay before retry number `attempt` (1-based)."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+
+
+def _submit(fn: Callable[..., Any], args: tuple, kwargs: dict) -> "Future[Any]":
+    # Each submission needs its own context copy (a Context can't be entered twice at once)
+    ctx = contextvars.copy_context()
+    return _EXECUTOR.submit(ctx.run, fn, *args, **kwargs)
+
+
+def _attempt(
+    fn: Callable[..., Any], args: tuple, kwargs: dict, policy: ResiliencePolicy, timeout: float
+) -> Any:
+    """
+    Run one (possibly hedged) attempt within `timeout` seconds.
+
+    Returns the first successful result; if every copy failed, returns the last in-band
+    failure or raises the last exception.
+
+    Raises:
+        TimeoutError: When no copy finished in time.
+    """
+    deadline = time.monotonic() + timeout
+    pending = {_submit(fn, args, kwargs)}
+
+    if policy.hedge_after and policy.hedge_after < timeout:
+        done, _ = wait(pending, timeout=policy.hedge_after)
+        if not done:
+            logger.debug(f"Hedging slow tool call {getattr(fn, '__name__', fn)}")
+            pending.add(_submit(fn, args, kwargs))
+
+    failed_result: Any = None
+    error: Optional[BaseException] = None
+    while pending:
+        remaining = deadline - time.monotonic()
+        done, pending = wait(pending, timeout=max(0.0, remaining), return_when=FIRST_COMPLETED)
+        if not done:
+            break
+        for fut in done:
+            exc = fut.exception()
+            if exc is not None:
+                error = exc
+                continue
+            result = fut.result()
+            if policy.is_failure(result):
+                failed_result = result
+                continue
+            for other in pending:
+                other.cancel()
+            return result
+
+    if not done and pending:
+        for other in pending:
+            other.cancel()
+        raise TimeoutError(f"timed out after {timeout:g}s")
+    if failed_result is not None:
+        return failed_result
+    assert error is not None
+    raise error
+
+
+def resilient_call(
+    tool_name: str,
+    fn: Callable[..., Any],
+    policy: ResiliencePolicy,
+    breaker: CircuitBreaker,
+) -> Callable[..., Any]:
+    """
+    Wrap `fn` with timeout, retries, hedging and the shared circuit breaker.
+
+    Returns:
+        A sync callable with the same signature that never raises for provider errors;
+        it returns the tool result or an `UNAVAILABLE_PREFIX` message.
+    """
+
+    @wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        if not breaker.allow():
+            return unavailable_message(tool_name, f"provider '{breaker.name}' is failing; circuit open")
+
+        deadline = time.monotonic() + policy.budget
+        reason = "unknown error"
+        for attempt in range(policy.retries + 1):
+            if attempt:
+                delay = min(policy.backoff(attempt), deadline - time.monotonic())
+                if delay > 0:
+                    time.sleep(delay)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                reason = f"time budget of {policy.budget:g}s exhausted"
+                break
+            timed_out = False
+            try:
+                result = _attempt(fn, args, kwargs, policy, min(policy.timeout, remaining))
+            except TimeoutError as e:
+                reason = str(e) or "timed out"
+                timed_out = True
+            except Exception as e:
+                reason = f"{type(e).__name__}: {e}"
+                if not is_transient_error(e):
+                    # Deterministic error (bad input, parsing): the provider answered
+                    breaker.record_success()
+                    logger.info(f"Tool {tool_name} failed without retry: {reason}")
+                    return unavailable_message(tool_name, reason)
+            else:
+                if not policy.is_failure(result):
+                    breaker.record_success()
+                    return result
+                reason = str(result)[:200]
+
+            breaker.record_failure()
+            logger.warning(f"Tool {tool_name} attempt {attempt + 1} failed: {reason}")
+            # A slow provider won't get faster on retry; don't multiply the wait
+            if timed_out or breaker.state == "open":
+                break
+
+        return unavailable_message(tool_name, reason)
+
+    return wrapper
+
+
+def harden_toolkit(
+    toolkit: Toolkit,
+    policy: Optional[ResiliencePolicy] = None,
+    breaker: Optional[CircuitBreaker] = None,
+) -> Toolkit:
+    """
+    Make every function of `toolkit` resilient, sharing one breaker per provider.
+
+    Args:
+        toolkit: Toolkit to wrap in place (e.g., YFinanceTools()).
+        policy: Call policy; defaults to `ResiliencePolicy.from_settings()`.
+        breaker: Circuit breaker; defaults to one named after the toolkit.
+
+    Returns:
+        Toolkit: The same toolkit, ready to pass to an Agent.
+    """
+    s = get_settings()
+    policy = policy or ResiliencePolicy.from_settings()
+    breaker = breaker or CircuitBreaker(
+        toolkit.name,
+        failure_threshold=s.TOOL_BREAKER_FAILURE_THRESHOLD,
+        reset_timeout=s.TOOL_BREAKER_RESET_SECONDS,
+    )
+    return wrap_toolkit(toolkit, lambda name, fn: resilient_call(name, fn, policy, breaker))
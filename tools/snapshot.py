@@ -0,0 +1,76 @@
+# tools/snapshot.py
+"""
+Metrics-Only Snapshot
+
+Purpose:
+- Serve the "snapshot" analysis depth without any model call: listing reference, the
+  deterministic fundamentals table and the peer comparison, built from one bulk
+  price download for the whole peer group.
+- Used directly by the API (not exposed to agents), and as the floor the load-aware
+  depth policy degrades to.
+
+Key Components:
+- build_snapshot: Markdown snapshot for one ticker.
+"""
+
+from datetime import datetime, timezone
+from typing import Optional
+
+from core.ticker_index import get_ticker_index
+from tools.finance_tools import normalize_ticker
+from tools.fundamentals import (
+    CURRENCY_COLUMNS,
+    PriceLoader,
+    StatementLoader,
+    download_closes,
+    fundamentals_markdown,
+    load_statements,
+)
+from tools.peers import compute_peer_comparison, peer_comparison_markdown
+
+
+def build_snapshot(
+    symbol: str,
+    peers: Optional[list[str]] = None,
+    statement_loader: StatementLoader = load_statements,
+    price_loader: PriceLoader = download_closes,
+) -> str:
+    """
+    Build a metrics-only snapshot report (no narrative, no LLM).
+
+    Args:
+        symbol: Target ticker.
+        peers: Explicit peer list; resolved from the ticker index when omitted.
+        statement_loader / price_loader: Data sources (injectable for tests).
+
+    Returns:
+        str: Markdown with listing, key metrics and (when peers resolve) the peer table.
+    """
+    symbol = normalize_ticker(symbol)
+    as_of = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
+    parts = [f"# {symbol} — Snapshot", f"_Metrics only, as of {as_of}; no narrative analysis._"]
+    listing = get_ticker_index().context_for(symbol)
+    if listing:
+        parts.append(f"**Listing:** {listing}")
+
+    # The snapshot is the floor of the depth policy: data failures degrade, never raise
+    try:
+        frame = compute_peer_comparison(
+            symbol, peers, statement_loader=statement_loader, price_loader=price_loader
+        )
+    except Exception as e:
+        parts.append(f"## Key metrics\nDATA UNAVAILABLE: market data could not be fetched ({e}).")
+        return "\n\n".join(parts)
+
+    metrics = frame.iloc[[0]]
+    if metrics.drop(columns=CURRENCY_COLUMNS).isna().all(axis=None):
+        parts.append("## Key metrics\nDATA UNAVAILABLE: fundamentals could not be fetched.")
+    else:
+        parts.append("## Key metrics\n" + fundamentals_markdown(metrics))
+    if len(frame) > 1:
+        parts.append("## Peers\n" + peer_comparison_markdown(frame))
+    parts.append(
+        "Source: Yahoo Finance (latest annual statements, bulk 1y daily closes); "
+        "peers from the local ticker index."
+    )
+    return "\n\n".join(parts)
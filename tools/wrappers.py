@@ -0,0 +1,45 @@
+# tools/wrappers.py
+"""
+Toolkit Wrapping Helpers
+
+Purpose:
+- Decorate the functions registered on an Agno `Toolkit` in place, without subclassing
+  each third-party toolkit.
+- Wrapped entrypoints keep their name, docstring and signature, so the JSON schema the
+  model sees is unchanged.
+
+Usage:
+    from tools.wrappers import wrap_toolkit
+    wrap_toolkit(YFinanceTools(), my_decorator)
+"""
+
+from typing import Any, Callable, Iterable, Optional
+
+from agno.tools import Toolkit
+
+# A decorator receives (tool_name, entrypoint) and returns the replacement callable.
+ToolDecorator = Callable[[str, Callable[..., Any]], Callable[..., Any]]
+
+
+def wrap_toolkit(
+    toolkit: Toolkit,
+    decorator: ToolDecorator,
+    names: Optional[Iterable[str]] = None,
+) -> Toolkit:
+    """
+    Replace each registered function's entrypoint with `decorator(name, entrypoint)`.
+
+    Args:
+        toolkit: A toolkit whose functions are already registered.
+        decorator: Factory producing the wrapped callable for a given tool.
+        names: Optional subset of tool names to wrap (default: all).
+
+    Returns:
+        Toolkit: The same toolkit instance, for fluent use in agent definitions.
+    """
+    selected = set(names) if names is not None else None
+    for name, function in toolkit.functions.items():
+        if function.entrypoint is None or (selected is not None and name not in selected):
+            continue
+        function.entrypoint = decorator(name, function.entrypoint)
+    return toolkit